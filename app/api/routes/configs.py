@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from app.core.responses import payload_response
 from app.services.config_service import config_service
 
 router = APIRouter()
@@ -11,5 +12,5 @@ async def get_config_file(repo: str, file_path: str):
     return config
 
 @router.get("/highlight-css")
-async def get_highlight_css():
-    return {"css": config_service.get_highlight_css()}
+async def get_highlight_css(request: Request):
+    return payload_response(request, config_service.highlight_css_payload, max_age=86400)
@@ -1,34 +1,50 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 
+from app.core.github_client import github_client
+from app.core.responses import payload_response
 from app.services.github_service import github_service
 
 router = APIRouter()
 
 
 @router.get("/repos")
-async def get_all_repos():
-    return await github_service.get_all_repos()
+async def get_all_repos(request: Request):
+    repos = await github_service.get_all_repos()
+    return payload_response(request, github_service.encode("repos", repos))
 
 
 @router.get("/dotfiles")
-async def get_dotfiles_repos():
-    return await github_service.get_dotfiles_repos()
+async def get_dotfiles_repos(request: Request):
+    repos = await github_service.get_dotfiles_repos()
+    return payload_response(request, github_service.encode("dotfiles", repos))
 
 
 @router.get("/repo/{repo:path}")
-async def get_repo_info(repo: str):
-    return await github_service.get_repo_stats(repo)
+async def get_repo_info(repo: str, request: Request):
+    info = await github_service.get_repo_stats(repo)
+    return payload_response(request, github_service.encode(("repo", repo), info))
 
 
 @router.get("/readme/{platform}")
-async def get_readme(platform: str):
+async def get_readme(platform: str, request: Request):
     readme = await github_service.get_readme(platform)
     if not readme:
         raise HTTPException(status_code=404, detail=f"README not found for {platform}")
-    return {"content": readme}
+    payload = github_service.encode(("readme", platform), {"content": readme})
+    return payload_response(request, payload)
 
 
 @router.get("/changelog/{repo:path}")
-async def get_changelog(repo: str):
+async def get_changelog(repo: str, request: Request):
     changelog = await github_service.get_changelog(repo)
-    return changelog
+    return payload_response(request, github_service.encode(("changelog", repo), changelog))
+
+
+@router.get("/cache")
+async def get_cache_stats():
+    return github_client.cache.stats()
+
+
+@router.get("/rate-limit")
+async def get_rate_limit():
+    return github_client.rate_limit.stats()
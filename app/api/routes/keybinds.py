@@ -1,17 +1,30 @@
 from __future__ import annotations
 from typing import List
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from app.core.responses import payload_response
 from app.services.keybind_service import keybind_service
-from app.models.keybind import Keybind, Platform
+from app.services.refresh_service import refresh_service
+from app.models.compact import KeybindRecord
+from app.models.keybind import Keybind, KeyboardLayout, Platform
 
 router = APIRouter()
 
+def to_models(records: List[KeybindRecord]) -> List[Keybind]:
+    return [kb.to_model() for kb in records]
+
 @router.get("/{platform}", response_model=List[Keybind])
-async def get_keybinds(platform: Platform):
-    keybinds = await keybind_service.get_keybinds(platform)
-    if not keybinds:
+async def get_keybinds(platform: Platform, request: Request):
+    payload = await keybind_service.get_keybinds_payload(platform)
+    if payload is None:
+        raise HTTPException(status_code=404, detail=f"No keybinds found for {platform}")
+    return payload_response(request, payload)
+
+@router.get("/{platform}/layout", response_model=KeyboardLayout)
+async def get_keyboard_layout(platform: Platform, request: Request):
+    payload = await keybind_service.get_layout_payload(platform)
+    if payload is None:
         raise HTTPException(status_code=404, detail=f"No keybinds found for {platform}")
-    return keybinds
+    return payload_response(request, payload)
 
 @router.get("/{platform}/categories")
 async def get_categories(platform: Platform) -> List[str]:
@@ -19,9 +32,23 @@ async def get_categories(platform: Platform) -> List[str]:
 
 @router.get("/{platform}/category/{category}", response_model=List[Keybind])
 async def get_keybinds_by_category(platform: Platform, category: str):
-    return await keybind_service.get_keybinds_by_category(platform, category)
+    return to_models(await keybind_service.get_keybinds_by_category(platform, category))
+
+@router.get("/{platform}/key/{key}", response_model=List[Keybind])
+async def get_keybinds_by_key(platform: Platform, key: str):
+    return to_models(await keybind_service.get_keybinds_by_key(platform, key))
+
+@router.get("/{platform}/modifiers/{combo}", response_model=List[Keybind])
+async def get_keybinds_by_modifiers(platform: Platform, combo: str):
+    return to_models(await keybind_service.get_keybinds_by_modifiers(platform, combo))
+
+@router.get("/{platform}/lookup/{combo:path}", response_model=List[Keybind])
+async def lookup_keybind(platform: Platform, combo: str):
+    """What does e.g. `cmd+shift+h` do? Modifier order and aliases don't matter."""
+    return to_models(await keybind_service.lookup(platform, combo))
 
 @router.post("/refresh")
 async def refresh_cache():
-    keybind_service.clear_cache()
-    return {"status": "cache cleared"}
+    # the current data keeps being served until the background refresh swaps in new data
+    refresh_service.trigger()
+    return {"status": "refresh scheduled"}
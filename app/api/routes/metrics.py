@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from typing import Iterable, List
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.core.cache_backend import cache_backend
+from app.core.github_client import github_client
+from app.core.metrics import CONTENT_TYPE, Counter, Gauge, Metric, registry
+from app.core.pages import page_cache
+from app.services.config_service import config_service
+from app.services.github_service import github_service
+from app.services.keybind_service import keybind_service
+from app.services.refresh_service import refresh_service
+from app.services.snapshot_service import snapshot_service
+from app.services.thumbnail_service import thumbnail_service
+
+router = APIRouter()
+
+
+@registry.collector
+def collect_caches() -> Iterable[Metric]:
+    hits = Counter("portfolio_cache_hits_total", "Lookups answered by a cache.", ("cache",))
+    misses = Counter("portfolio_cache_misses_total", "Lookups a cache couldn't answer.", ("cache",))
+    ratio = Gauge("portfolio_cache_hit_ratio", "Hits over lookups since start.", ("cache",))
+    entries = Gauge("portfolio_cache_entries", "Entries currently held.", ("cache",))
+
+    github = github_client.cache.stats()
+    highlight = config_service.stats()
+    pages = page_cache.stats()
+    backend = cache_backend.stats()
+    keybinds = keybind_service.stats()
+    snapshots = snapshot_service.stats()
+    counts = {
+        # a 304 revalidation is served from the cache too
+        "github_response": (github["hits"] + github["revalidated"], github["misses"]),
+        "highlight": (highlight["hits"], highlight["misses"]),
+        "pages": (pages["hits"], pages["misses"]),
+        "shared_backend": (backend["hits"], backend["misses"]),
+        "keybind_parse": (keybinds["reused"], keybinds["parsed"]),
+        "snapshot_reads": (snapshots["reads"], snapshots["fallbacks"]),
+    }
+    for cache, (hit, miss) in counts.items():
+        hits.inc(cache, amount=hit)
+        misses.inc(cache, amount=miss)
+        ratio.set(hit / (hit + miss) if hit + miss else 0.0, cache)
+    entries.set(github["size"], "github_response")
+    entries.set(highlight["size"], "highlight")
+    entries.set(pages["entries"], "pages")
+    entries.set(github_service.stats()["cached"], "github_values")
+    return [hits, misses, ratio, entries]
+
+
+@registry.collector
+def collect_rate_limit() -> Iterable[Metric]:
+    stats = github_client.rate_limit.stats()
+    remaining = Gauge(
+        "portfolio_github_rate_limit_remaining", "Requests left in the window.", ("resource",)
+    )
+    limit = Gauge("portfolio_github_rate_limit_limit", "Window size.", ("resource",))
+    reset = Gauge(
+        "portfolio_github_rate_limit_reset_seconds", "Seconds until the window resets.",
+        ("resource",),
+    )
+    for resource, budget in stats["resources"].items():
+        if budget["remaining"] is not None:
+            remaining.set(budget["remaining"], resource)
+        if budget["limit"] is not None:
+            limit.set(budget["limit"], resource)
+        if budget["reset_in"] is not None:
+            reset.set(budget["reset_in"], resource)
+    reserve = Gauge(
+        "portfolio_github_rate_limit_reserve", "Budget background refreshes leave for visitors."
+    )
+    reserve.set(stats["reserve"])
+    blocked = Gauge(
+        "portfolio_github_blocked_seconds", "Seconds left in a backoff GitHub asked for."
+    )
+    blocked.set(stats["blocked_for"])
+    deferred = Counter(
+        "portfolio_github_deferred_total", "Calls skipped to protect the budget; stale data served."
+    )
+    deferred.inc(amount=stats["deferred"])
+    retries = Counter("portfolio_github_retries_total", "Retries after secondary rate limits.")
+    retries.inc(amount=stats["retries"])
+    limited = Counter("portfolio_github_rate_limited_total", "Rate-limited responses received.")
+    limited.inc(amount=stats["rate_limited"])
+    return [remaining, limit, reset, reserve, blocked, deferred, retries, limited]
+
+
+@registry.collector
+def collect_work() -> Iterable[Metric]:
+    in_flight = Gauge(
+        "portfolio_single_flight_in_flight",
+        "Distinct loads in progress that concurrent callers are waiting on.",
+        ("flight",),
+    )
+    flights = {
+        "keybinds": keybind_service.stats()["single_flight"],
+        "github": github_service.stats()["single_flight"],
+    }
+    for name, stats in flights.items():
+        in_flight.set(stats["in_flight"], name)
+    thumbnails = Gauge(
+        "portfolio_thumbnails_pending", "Gallery items waiting for thumbnails."
+    )
+    thumbnails.set(thumbnail_service.stats()["pending"])
+
+    refresh = refresh_service.stats()
+    runs = Counter("portfolio_refresh_runs_total", "Refresh runs that went to GitHub.")
+    runs.inc(amount=refresh["runs"])
+    failures = Counter("portfolio_refresh_failures_total", "Refresh jobs that raised.")
+    failures.inc(amount=refresh["failures"])
+    metrics: List[Metric] = [in_flight, thumbnails, runs, failures]
+    if refresh["last_duration"] is not None:
+        duration = Gauge(
+            "portfolio_refresh_last_duration_seconds", "Duration of the last refresh run."
+        )
+        duration.set(refresh["last_duration"])
+        metrics.append(duration)
+    return metrics
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    return Response(registry.render(), media_type=CONTENT_TYPE)
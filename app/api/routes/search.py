@@ -0,0 +1,18 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Query
+
+from app.services.search_service import search_service
+
+router = APIRouter()
+
+
+@router.get("")
+async def search(
+    q: str = Query(..., min_length=1),
+    kind: Optional[Literal["keybind", "config", "readme"]] = None,
+    platform: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+):
+    return search_service.search(q, kind=kind, platform=platform, page=page, per_page=per_page)
@@ -0,0 +1,33 @@
+from fastapi import APIRouter
+
+from app.core.cache_backend import cache_backend, refresh_invalidations
+from app.core.github_client import github_client
+from app.core.pages import page_cache
+from app.services.config_service import config_service
+from app.services.gallery_service import gallery_service
+from app.services.github_service import github_service
+from app.services.keybind_service import keybind_service
+from app.services.refresh_service import refresh_service
+from app.services.search_service import search_service
+from app.services.snapshot_service import snapshot_service
+from app.services.thumbnail_service import thumbnail_service
+
+router = APIRouter()
+
+
+@router.get("")
+async def get_stats():
+    return {
+        "cache_backend": {**cache_backend.stats(), **refresh_invalidations.stats()},
+        "github_cache": github_client.cache.stats(),
+        "github_rate_limit": github_client.rate_limit.stats(),
+        "gallery": gallery_service.stats(),
+        "github": github_service.stats(),
+        "highlight": config_service.stats(),
+        "keybinds": keybind_service.stats(),
+        "pages": page_cache.stats(),
+        "refresh": refresh_service.stats(),
+        "search": search_service.stats(),
+        "snapshots": snapshot_service.stats(),
+        "thumbnails": thumbnail_service.stats(),
+    }
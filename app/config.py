@@ -1,7 +1,7 @@
 from __future__ import annotations
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Literal, Optional, Dict, List
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -12,11 +12,106 @@ class Settings(BaseSettings):
     github_token: Optional[str] = None
     github_username: str = "duma799"
     github_cache_ttl: int = 3600
+    github_cache_max_entries: int = 512
+
+    # shared http client
+    github_api_url: str = "https://api.github.com"
+    github_raw_url: str = "https://raw.githubusercontent.com"
+    github_http2: bool = True
+    github_timeout: float = 10.0
+    github_connect_timeout: float = 5.0
+    github_max_connections: int = 20
+    github_max_keepalive: int = 10
+    github_keepalive_expiry: float = 30.0
+
+    # fan-out of upstream calls
+    github_concurrency: int = 8
+    github_call_timeout: float = 15.0
+
+    # requests left in the hourly budget that background refreshes won't touch
+    github_rate_limit_reserve: int = 100
+    github_background_concurrency: int = 4
+    # secondary rate limits: retries with jittered exponential backoff
+    github_retry_attempts: int = 3
+    github_retry_base_delay: float = 1.0
+    # longest single wait before giving up and serving stale data
+    github_retry_max_wait: float = 3.0
+    github_background_retry_max_wait: float = 10.0
+
+    highlight_cache_size: int = 128
+    api_cache_max_age: int = 60
+
+    # dynamic responses smaller than this go out uncompressed
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 5
+    # unhashed /static files; content-hashed builds in static/dist are immutable
+    static_max_age: int = 3600
+
+    gallery_dir: str = "static/images/gallery"
+    gallery_page_size: int = 24
+    # seconds between directory mtime checks
+    gallery_check_interval: float = 2.0
+
+    # resized gallery images, written by the CPU pool and served from /static
+    thumbnail_dir: str = "static/thumbs"
+    thumbnail_url: str = "/static/thumbs"
+    thumbnail_widths: List[int] = [320, 640, 1280]
+    thumbnail_formats: List[str] = ["avif", "webp"]
+    thumbnail_concurrency: int = 2
+
+    page_cache_size: int = 256
+    # pages tagged with upstream data re-render in the background once this old, so they
+    # follow the data even when no refresh runs
+    page_tagged_ttl: int = 3600
+    # render every page into the cache at startup instead of on first visit
+    page_prerender: bool = True
+
+    # pool for highlighting and keybind parsing; size 0 runs inline on the event loop
+    cpu_pool_kind: Literal["thread", "process"] = "process"
+    cpu_pool_size: int = 4
+
+    # background refresh of dotfiles data
+    refresh_enabled: bool = True
+    refresh_interval: int = 900
 
     repos: Dict[str, str] = {
         "hyprland": "duma799/hyprduma-config",
         "yabai": "duma799/yabaduma-config",
     }
+    # config files per platform that are refreshed in the background and searchable
+    # the files the config browser lists, per platform
+    config_files: Dict[str, List[str]] = {
+        "hyprland": [
+            "hyprland.conf",
+            "KEYBINDS.md",
+            "kitty/kitty.conf",
+            "waybar/config",
+            "waybar/style.css",
+            "pywal.sh",
+        ],
+        "yabai": [
+            "yabairc",
+            "skhdrc",
+            "bordersrc",
+            "sketchybar/sketchybarrc",
+            "sketchybar/colors.sh",
+            "reload-theme.py",
+            "Keybinds.md",
+        ],
+    }
+
+    # whole-repo snapshots for settings.repos, stored under data_dir/snapshots
+    snapshot_enabled: bool = True
+    snapshot_max_file_size: int = 2 * 1024 * 1024
+    # commits kept per repo; older trees and unreferenced files are pruned
+    snapshot_keep: int = 2
+
+    # "sqlite" shares loaded data between `uvicorn --workers N` processes via data_dir/cache.db
+    cache_backend: Literal["memory", "sqlite"] = "memory"
+    # seconds between checks for invalidations made by other workers
+    cache_sync_interval: float = 2.0
+    cache_max_entries: int = 1024
 
     base_dir: Path = Path(__file__).parent.parent
     data_dir: Path = base_dir / "data"
@@ -0,0 +1,309 @@
+"""Cache backends the services share data through.
+
+Services keep decoded objects (keybind indexes, models) in their own
+in-process tier. When the backend is shared between processes they also
+mirror plain JSON into it, so a value one worker loaded from GitHub is
+reused by the others, and bump a per-namespace generation so the other
+workers drop their in-process copies after a refresh.
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import orjson
+
+from app.config import get_settings
+from app.core.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class CacheBackend(ABC):
+    # whether other processes see what this one stores
+    shared = False
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    @abstractmethod
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        """The stored JSON value, or None."""
+
+    @abstractmethod
+    async def set(self, namespace: str, key: str, value: Any) -> None:
+        """Store a JSON-serialisable value."""
+
+    @abstractmethod
+    async def generation(self, namespace: str) -> int:
+        """Counter bumped whenever the namespace's data was replaced wholesale."""
+
+    @abstractmethod
+    async def bump(self, namespace: str) -> int:
+        """Tell every process to drop its in-process copies of ``namespace``."""
+
+    @abstractmethod
+    async def acquire(self, name: str, ttl: float) -> bool:
+        """Take or renew a lease so only one process runs a periodic job."""
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "shared": self.shared,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class MemoryBackend(CacheBackend):
+    """Single-process backend; leases are always granted."""
+
+    def __init__(self, max_entries: int):
+        super().__init__()
+        self.max_entries = max_entries
+        self._namespaces: Dict[str, LRUCache[Any]] = {}
+        self._generations: Dict[str, int] = {}
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        entries = self._namespaces.get(namespace)
+        value = entries.get(key) if entries is not None else None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, namespace: str, key: str, value: Any) -> None:
+        entries = self._namespaces.get(namespace)
+        if entries is None:
+            entries = self._namespaces[namespace] = LRUCache(self.max_entries)
+        entries.set(key, value)
+
+    async def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    async def bump(self, namespace: str) -> int:
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        return self._generations[namespace]
+
+    async def acquire(self, name: str, ttl: float) -> bool:
+        return True
+
+
+class SQLiteBackend(CacheBackend):
+    """Backend in one SQLite file shared by every worker on the host.
+
+    WAL mode lets readers in all workers proceed while one writes. Calls are
+    short and run in a worker thread over a single connection.
+    """
+
+    shared = True
+
+    def __init__(self, path: Path, max_entries: int):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    async def start(self) -> None:
+        if self._conn is None:
+            await asyncio.to_thread(self._open)
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            );
+            CREATE TABLE IF NOT EXISTS cache_generations (
+                namespace TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS cache_leases (
+                name TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            """
+        )
+        self._conn = conn
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            await asyncio.to_thread(conn.close)
+
+    def _run(self, sql: str, params: tuple = ()) -> list:
+        if self._conn is None:
+            return []
+        with self._lock:
+            try:
+                return self._conn.execute(sql, params).fetchall()
+            except sqlite3.Error:
+                # a locked or broken cache file degrades to cache misses
+                return []
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        rows = await asyncio.to_thread(
+            self._run,
+            "SELECT value FROM cache_entries WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        )
+        if not rows:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return orjson.loads(rows[0][0])
+
+    async def set(self, namespace: str, key: str, value: Any) -> None:
+        await asyncio.to_thread(
+            self._run,
+            "INSERT INTO cache_entries VALUES (?, ?, ?, ?) ON CONFLICT (namespace, key) "
+            "DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+            (namespace, key, orjson.dumps(value), time.time()),
+        )
+
+    async def generation(self, namespace: str) -> int:
+        rows = await asyncio.to_thread(
+            self._run,
+            "SELECT generation FROM cache_generations WHERE namespace = ?",
+            (namespace,),
+        )
+        return rows[0][0] if rows else 0
+
+    async def bump(self, namespace: str) -> int:
+        await asyncio.to_thread(self._prune)
+        rows = await asyncio.to_thread(
+            self._run,
+            "INSERT INTO cache_generations VALUES (?, 1) ON CONFLICT (namespace) "
+            "DO UPDATE SET generation = generation + 1 RETURNING generation",
+            (namespace,),
+        )
+        return rows[0][0] if rows else 0
+
+    def _prune(self) -> None:
+        """Keep the `max_entries` most recently written entries per namespace."""
+        self._run(
+            "DELETE FROM cache_entries WHERE rowid IN (SELECT rowid FROM ("
+            "SELECT rowid, ROW_NUMBER() OVER ("
+            "PARTITION BY namespace ORDER BY updated_at DESC) AS position "
+            "FROM cache_entries) WHERE position > ?)",
+            (self.max_entries,),
+        )
+
+    async def acquire(self, name: str, ttl: float) -> bool:
+        now = time.time()
+        rows = await asyncio.to_thread(
+            self._run,
+            "INSERT INTO cache_leases VALUES (?, ?, ?) ON CONFLICT (name) "
+            "DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE cache_leases.owner = excluded.owner OR cache_leases.expires_at < ? "
+            "RETURNING owner",
+            (name, self.owner, now + ttl, now),
+        )
+        return bool(rows)
+
+
+class Invalidations:
+    """Tells every worker sharing the backend that the refreshed data changed.
+
+    Each process polls the namespace's generation every `cache_sync_interval`
+    seconds and runs the subscribed callbacks when another process bumped it.
+    With a process-local backend there is nobody to tell and nothing runs.
+    """
+
+    def __init__(self, backend: CacheBackend, namespace: str):
+        self.backend = backend
+        self.namespace = namespace
+        self._callbacks: List[Callable[[], Any]] = []
+        self._seen: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.received = 0
+
+    def subscribe(self, callback: Callable[[], Any]) -> None:
+        self._callbacks.append(callback)
+
+    async def start(self) -> None:
+        if self.backend.shared and self._task is None:
+            self._seen = await self.backend.generation(self.namespace)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def publish(self) -> None:
+        # our own copies are already current
+        self._seen = await self.backend.bump(self.namespace)
+        self.published += 1
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.cache_sync_interval)
+            await self.poll()
+
+    async def poll(self) -> None:
+        current = await self.backend.generation(self.namespace)
+        if current == self._seen:
+            return
+        self._seen = current
+        self.received += 1
+        for callback in self._callbacks:
+            try:
+                result = callback()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("invalidation callback %r failed", callback)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "watching": self._task is not None,
+            "published": self.published,
+            "received": self.received,
+        }
+
+
+def create_backend() -> CacheBackend:
+    if settings.cache_backend == "sqlite":
+        return SQLiteBackend(settings.data_dir / "cache.db", settings.cache_max_entries)
+    return MemoryBackend(settings.cache_max_entries)
+
+
+cache_backend = create_backend()
+# bumped after every refresh run
+refresh_invalidations = Invalidations(cache_backend, "refresh")
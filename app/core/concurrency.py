@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, TypeVar
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+
+async def gather_limited(
+    aws: Iterable[Awaitable[T]],
+    limit: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> List[Optional[T]]:
+    """Await everything concurrently, at most `limit` at a time.
+
+    Results keep the input order; a call that times out yields None instead of
+    failing the whole batch.
+    """
+    semaphore = asyncio.Semaphore(limit or settings.github_concurrency)
+    timeout = timeout if timeout is not None else settings.github_call_timeout
+
+    async def run(aw: Awaitable[T]) -> Optional[T]:
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(aw, timeout)
+            except asyncio.TimeoutError:
+                return None
+
+    return await asyncio.gather(*(run(aw) for aw in aws))
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key onto one in-flight awaitable."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.collapsed = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is not None:
+            self.collapsed += 1
+        else:
+            task = self._launch(key, fn)
+        # shielded so a disconnecting caller doesn't cancel the fetch for everyone else
+        return await asyncio.shield(task)
+
+    def start(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> None:
+        """Run ``fn`` in the background unless a call for ``key`` is already in flight."""
+        if key in self._inflight:
+            return
+        self.calls += 1
+        self._launch(key, fn).add_done_callback(lambda task: self._log_failure(key, task))
+
+    def _launch(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    @staticmethod
+    def _log_failure(key: Hashable, task: asyncio.Future) -> None:
+        # nobody awaits a background call, so its error would otherwise go unreported
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("background call %r failed", key, exc_info=task.exception())
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "collapsed": self.collapsed,
+            "in_flight": len(self._inflight),
+        }
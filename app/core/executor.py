@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from app.config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+
+class CPUPool:
+    """Runs CPU-bound work (highlighting, parsing) off the event loop.
+
+    `settings.cpu_pool_kind` picks threads or processes; a size of 0 runs the
+    work inline, which is mostly useful for comparing against the pool.
+    """
+
+    def __init__(self):
+        self._executor: Optional[Executor] = None
+
+    def start(self) -> None:
+        if self._executor is None and settings.cpu_pool_size > 0:
+            if settings.cpu_pool_kind == "process":
+                # workers start lazily, after the loop's threads exist, so never fork this process
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context(
+                    "forkserver" if "forkserver" in methods else "spawn"
+                )
+                self._executor = ProcessPoolExecutor(
+                    max_workers=settings.cpu_pool_size, mp_context=context
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.cpu_pool_size, thread_name_prefix="cpu"
+                )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        self.start()
+        if self._executor is None:
+            return fn(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+
+cpu_pool = CPUPool()
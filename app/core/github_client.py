@@ -1,87 +1,239 @@
 from __future__ import annotations
 
+import asyncio
 import re
-from typing import Any, Dict, List, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 
 import httpx
 
 from app.config import get_settings
+from app.core.cache import ResponseCache
+from app.core.concurrency import gather_limited
+from app.core.metrics import github_duration, github_in_flight, github_responses
+from app.core.rate_limit import RateLimiter, background, current_priority
 
 settings = get_settings()
 
+_revalidate: ContextVar[bool] = ContextVar("github_revalidate", default=False)
+
+# /repos/{owner}/{repo}[/{endpoint}...] and /users/{user}/{endpoint}
+_API_ENDPOINT = re.compile(r"/(?:repos/[^/]+/[^/]+(?:/(?P<repo>\w+))?|users/[^/]+/(?P<user>\w+))")
 
-class GitHubClient:
-    BASE_URL = "https://api.github.com"
-    RAW_URL = "https://raw.githubusercontent.com"
 
+class GitHubClient:
     def __init__(self):
+        self.base_url = settings.github_api_url.rstrip("/")
+        self.raw_url = settings.github_raw_url.rstrip("/")
         self.headers = {"Accept": "application/vnd.github.v3+json"}
         if settings.github_token:
             self.headers["Authorization"] = f"token {settings.github_token}"
+        self._client: Optional[httpx.AsyncClient] = None
+        self.cache = ResponseCache(settings.github_cache_ttl, settings.github_cache_max_entries)
+        self.rate_limit = RateLimiter("token" if settings.github_token else "anonymous")
+        self.background = background
 
-    async def get_raw_file(self, repo: str, path: str, branch: str = "main") -> Optional[str]:
-        url = f"{self.RAW_URL}/{repo}/{branch}/{path}"
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers=self.headers)
-            if resp.status_code == 200:
-                return resp.text
+    async def start(self) -> None:
+        if self._client is None:
+            self._client = self._build_client()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # created lazily so the client also works outside the app lifespan (scripts, shell)
+        if self._client is None:
+            self._client = self._build_client()
+        return self._client
+
+    @contextmanager
+    def revalidating(self) -> Iterator[None]:
+        """Treat cached responses as stale inside the block, so they get a conditional request."""
+        token = _revalidate.set(True)
+        try:
+            yield
+        finally:
+            _revalidate.reset(token)
+
+    def _build_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            headers=self.headers,
+            http2=settings.github_http2,
+            timeout=httpx.Timeout(
+                settings.github_timeout, connect=settings.github_connect_timeout
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.github_max_connections,
+                max_keepalive_connections=settings.github_max_keepalive,
+                keepalive_expiry=settings.github_keepalive_expiry,
+            ),
+        )
+
+    async def _fetch(
+        self, url: str, params: Optional[Dict[str, Any]] = None, as_json: bool = True
+    ) -> Any:
+        key = (url, tuple(sorted(params.items())) if params else ())
+        entry = self.cache.lookup(key)
+        if entry and entry.is_fresh and not _revalidate.get():
+            self.cache.hits += 1
+            return entry.data
+
+        headers = entry.validators() if entry else {}
+        priority = current_priority()
+        # raw.githubusercontent.com isn't part of the API rate limit
+        limited = url.startswith(self.base_url)
+        if limited and not self.rate_limit.admit(priority, conditional=bool(headers)):
+            self.rate_limit.deferred += 1
+            return entry.data if entry else None
+
+        endpoint = self.endpoint(url)
+        attempt = 0
+        while True:
+            try:
+                async with self.rate_limit.slot(priority):
+                    resp = await self._timed_get(endpoint, url, params, headers)
+            except httpx.TransportError:
+                # serve the stale copy rather than nothing while GitHub is unreachable
+                return entry.data if entry else None
+            if not limited:
+                break
+            self.rate_limit.update(resp.headers)
+            delay = self.rate_limit.retry_delay(resp.status_code, resp.headers, attempt, priority)
+            if delay is None:
+                break
+            attempt += 1
+            await asyncio.sleep(delay)
+
+        if resp.status_code == 304 and entry:
+            # conditional hits don't count against the rate limit
+            self.cache.refresh(key)
+            return entry.data
+
+        self.cache.misses += 1
+        if resp.status_code == 200:
+            data = resp.json() if as_json else resp.text
+            self.cache.store(
+                key, data, resp.headers.get("etag"), resp.headers.get("last-modified")
+            )
+            return data
+        if resp.status_code == 404:
+            self.cache.store(key, None)
             return None
+        # rate limited or failing upstream: an old answer beats an empty page
+        return entry.data if entry else None
+
+    async def _timed_get(
+        self, endpoint: str, url: str, params: Optional[Dict[str, Any]], headers: Dict[str, str]
+    ) -> httpx.Response:
+        github_in_flight.inc()
+        try:
+            with github_duration.time(endpoint):
+                resp = await self.client.get(url, params=params, headers=headers)
+        except httpx.TransportError:
+            github_responses.inc(endpoint, "error")
+            raise
+        finally:
+            github_in_flight.dec()
+        github_responses.inc(endpoint, str(resp.status_code))
+        return resp
+
+    def endpoint(self, url: str) -> str:
+        """Low-cardinality name for an upstream URL, used as a metrics label."""
+        if url.startswith(self.raw_url):
+            return "raw"
+        match = _API_ENDPOINT.match(url, len(self.base_url))
+        if match is None:
+            return "other"
+        if match["user"]:
+            return f"user_{match['user']}"
+        return match["repo"] or "repo"
+
+    async def get_raw_file(self, repo: str, path: str, branch: str = "main") -> Optional[str]:
+        return await self._fetch(f"{self.raw_url}/{repo}/{branch}/{path}", as_json=False)
+
+    async def iter_raw_lines(
+        self, repo: str, path: str, branch: str = "main"
+    ) -> AsyncIterator[str]:
+        """Stream a raw file line by line, e.g. into `parser.aparse_iter`; not cached."""
+        try:
+            async with self.client.stream("GET", f"{self.raw_url}/{repo}/{branch}/{path}") as resp:
+                if resp.status_code != 200:
+                    return
+                async for line in resp.aiter_lines():
+                    yield line
+        except httpx.TransportError:
+            return
+
+    async def download_tarball(self, repo: str, ref: str, dest: Path) -> bool:
+        """Stream the repo archive at ``ref`` into ``dest``; one API call, not cached."""
+        priority = current_priority()
+        if not self.rate_limit.admit(priority):
+            self.rate_limit.deferred += 1
+            return False
+        url = f"{self.base_url}/repos/{repo}/tarball/{ref}"
+        github_in_flight.inc()
+        try:
+            async with self.rate_limit.slot(priority):
+                with github_duration.time("tarball"):
+                    async with self.client.stream("GET", url, follow_redirects=True) as resp:
+                        # the API answers with a redirect to codeload; its headers carry the budget
+                        api_response = resp.history[0] if resp.history else resp
+                        self.rate_limit.update(api_response.headers)
+                        github_responses.inc("tarball", str(resp.status_code))
+                        if resp.status_code != 200:
+                            return False
+                        with dest.open("wb") as f:
+                            async for chunk in resp.aiter_bytes():
+                                f.write(chunk)
+        except httpx.TransportError:
+            github_responses.inc("tarball", "error")
+            return False
+        finally:
+            github_in_flight.dec()
+        return True
 
     async def get_repo_info(self, repo: str) -> Optional[Dict[str, Any]]:
-        url = f"{self.BASE_URL}/repos/{repo}"
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers=self.headers)
-            if resp.status_code == 200:
-                return resp.json()
-            return None
+        return await self._fetch(f"{self.base_url}/repos/{repo}")
 
     async def get_repo_contents(
         self, repo: str, path: str = "", branch: str = "main"
     ) -> Optional[List[Dict]]:
-        url = f"{self.BASE_URL}/repos/{repo}/contents/{path}"
-        params = {"ref": branch}
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers=self.headers, params=params)
-            if resp.status_code == 200:
-                return resp.json()
-            return None
+        url = f"{self.base_url}/repos/{repo}/contents/{path}"
+        return await self._fetch(url, params={"ref": branch})
 
     async def get_user_repos(self, username: str) -> Optional[List[Dict]]:
-        url = f"{self.BASE_URL}/users/{username}/repos"
-        params = {"sort": "updated", "per_page": 100}
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers=self.headers, params=params)
-            if resp.status_code == 200:
-                return resp.json()
-            return None
+        url = f"{self.base_url}/users/{username}/repos"
+        return await self._fetch(url, params={"sort": "updated", "per_page": 100})
+
+    async def get_head_sha(self, repo: str) -> Optional[str]:
+        commits = await self.get_commits(repo, per_page=1)
+        return commits[0].get("sha") if commits else None
 
     async def get_readme(self, repo: str) -> Optional[str]:
-        for branch in ["main", "master"]:
-            content = await self.get_raw_file(repo, "README.md", branch)
+        branches = ["main", "master"]
+        contents = await gather_limited(
+            self.get_raw_file(repo, "README.md", branch) for branch in branches
+        )
+        for branch, content in zip(branches, contents):
             if content:
                 return self._fix_relative_urls(content, repo, branch)
         return None
 
     async def get_releases(self, repo: str, per_page: int = 10) -> Optional[List[Dict]]:
-        url = f"{self.BASE_URL}/repos/{repo}/releases"
-        params = {"per_page": per_page}
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers=self.headers, params=params)
-            if resp.status_code == 200:
-                return resp.json()
-            return None
+        url = f"{self.base_url}/repos/{repo}/releases"
+        return await self._fetch(url, params={"per_page": per_page})
 
     async def get_commits(self, repo: str, per_page: int = 10) -> Optional[List[Dict]]:
-        url = f"{self.BASE_URL}/repos/{repo}/commits"
-        params = {"per_page": per_page}
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers=self.headers, params=params)
-            if resp.status_code == 200:
-                return resp.json()
-            return None
+        url = f"{self.base_url}/repos/{repo}/commits"
+        return await self._fetch(url, params={"per_page": per_page})
 
     def _fix_relative_urls(self, content: str, repo: str, branch: str) -> str:
-        raw_base = f"{self.RAW_URL}/{repo}/{branch}"
+        raw_base = f"{self.raw_url}/{repo}/{branch}"
 
         # fix markdown images
         def replace_md_image(match):
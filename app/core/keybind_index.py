@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.responses import JSONPayload
+from app.models.compact import KeybindRecord
+from app.parsers.base import BaseKeybindParser
+
+MODIFIER_ORDER = {"cmd": 0, "ctrl": 1, "opt": 2, "shift": 3}
+# aliases and the canonical names the API hands out ("opt" is no alias of anything)
+MODIFIER_NAMES = frozenset(BaseKeybindParser.MODIFIER_MAP) | frozenset(
+    BaseKeybindParser.MODIFIER_MAP.values()
+)
+
+
+def modifier_combo(modifiers: Iterable[str]) -> str:
+    """Canonical, order-independent spelling of a modifier set, e.g. "cmd+shift"."""
+    mods = {BaseKeybindParser.MODIFIER_MAP.get(m.casefold(), m.casefold()) for m in modifiers}
+    return "+".join(sorted(mods, key=lambda m: (MODIFIER_ORDER.get(m, len(MODIFIER_ORDER)), m)))
+
+
+def normalize_key(key: str) -> str:
+    key = key.strip().casefold()
+    return BaseKeybindParser.KEY_MAP.get(key, key)
+
+
+def parse_combo(combo: str) -> Tuple[str, Optional[str]]:
+    """Split "cmd+shift+h" into ("cmd+shift", "h"); the key is None for modifiers only."""
+    parts = [p.strip() for p in combo.split("+") if p.strip()]
+    modifiers = [p for p in parts if p.casefold() in MODIFIER_NAMES]
+    keys = [p for p in parts if p.casefold() not in MODIFIER_NAMES]
+    return modifier_combo(modifiers), normalize_key(keys[-1]) if keys else None
+
+
+class KeybindIndex:
+    """Lookup tables over one platform's keybinds, built once per data refresh."""
+
+    def __init__(self, keybinds: List[KeybindRecord]):
+        self.keybinds = keybinds
+        self.categories: List[str] = []
+        self.by_category: Dict[str, List[KeybindRecord]] = {}
+        self.by_key: Dict[str, List[KeybindRecord]] = {}
+        self.by_modifiers: Dict[str, List[KeybindRecord]] = {}
+        self.by_combo: Dict[Tuple[str, str], List[KeybindRecord]] = {}
+
+        for kb in keybinds:
+            category = kb.category.casefold()
+            if category not in self.by_category:
+                self.categories.append(kb.category)
+            key = normalize_key(kb.key)
+            mods = modifier_combo(kb.modifiers)
+            self.by_category.setdefault(category, []).append(kb)
+            self.by_key.setdefault(key, []).append(kb)
+            self.by_modifiers.setdefault(mods, []).append(kb)
+            self.by_combo.setdefault((mods, key), []).append(kb)
+
+    @cached_property
+    def payload(self) -> JSONPayload:
+        """The full keybind list, encoded once per refresh."""
+        return JSONPayload(self.keybinds)
+
+    def category(self, name: str) -> List[KeybindRecord]:
+        return self.by_category.get(name.casefold(), [])
+
+    def key(self, key: str) -> List[KeybindRecord]:
+        return self.by_key.get(normalize_key(key), [])
+
+    def modifiers(self, combo: str) -> List[KeybindRecord]:
+        return self.by_modifiers.get(parse_combo(combo)[0], [])
+
+    def lookup(self, combo: str) -> List[KeybindRecord]:
+        mods, key = parse_combo(combo)
+        if key is None:
+            return self.by_modifiers.get(mods, [])
+        return self.by_combo.get((mods, key), [])
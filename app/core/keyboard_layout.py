@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+from app.core.keybind_index import modifier_combo, normalize_key
+from app.models.compact import KeybindRecord
+from app.models.keybind import KeyboardLayout, KeyMapping, Platform
+
+# (code, label, width, is_modifier); mirrors the keyboard drawn by static/js/keyboard.js
+Key = Tuple[str, str, float, bool]
+
+ROWS: List[List[Key]] = [
+    [("esc", "Esc", 1, False)]
+    + [(f"f{i}", f"F{i}", 1, False) for i in range(1, 13)]
+    + [("del", "Del", 1, False)],
+    [("backtick", "`", 1, False)]
+    + [(str(i % 10), str(i % 10), 1, False) for i in range(1, 11)]
+    + [("minus", "-", 1, False), ("equals", "=", 1, False), ("backspace", "Bksp", 1.75, False)],
+    [("tab", "Tab", 1.25, False)]
+    + [(c, c.upper(), 1, False) for c in "qwertyuiop"]
+    + [("[", "[", 1, False), ("]", "]", 1, False), ("\\", "\\", 1, False)],
+    [("caps", "Caps", 1.75, False)]
+    + [(c, c.upper(), 1, False) for c in "asdfghjkl"]
+    + [(";", ";", 1, False), ("quote", '"', 1, False), ("enter", "Enter", 1.75, False)],
+    [("shift", "Shift", 2.25, True)]
+    + [(c, c.upper(), 1, False) for c in "zxcvbnm"]
+    + [(",", ",", 1, False), (".", ".", 1, False), ("/", "/", 1, False)]
+    + [("shift-r", "Shift", 2.25, True)],
+    [
+        ("fn", "fn", 1.25, False),
+        ("ctrl", "Ctrl", 1.25, True),
+        ("opt", "Opt", 1.25, True),
+        ("cmd", "Cmd", 1.25, True),
+        ("space", "", 6, False),
+        ("cmd-r", "Cmd", 1.25, True),
+        ("opt-r", "Opt", 1.25, True),
+    ],
+    [("left", "←", 1, False), ("up", "↑", 1, False), ("down", "↓", 1, False),
+     ("right", "→", 1, False)],
+]
+
+# key names the parsers emit that are spelled differently on the drawn keyboard
+KEY_ALIASES: Dict[str, str] = {
+    "grave": "backtick", "`": "backtick",
+    "-": "minus", "=": "equals", "equal": "equals",
+    "'": "quote", "apostrophe": "quote",
+    "bracketleft": "[", "bracketright": "]", "backslash": "\\",
+    "semicolon": ";", "comma": ",", "period": ".", "slash": "/",
+    "capslock": "caps", "delete": "del",
+}
+
+
+def key_code(key: str) -> str:
+    key = normalize_key(key)
+    return KEY_ALIASES.get(key, key)
+
+
+def build_layout(platform: Platform, keybinds: List[KeybindRecord]) -> KeyboardLayout:
+    """Attach every keybind to the key it is bound to, grouped by modifier layer."""
+    by_code: Dict[str, List[KeybindRecord]] = {}
+    layers: Dict[str, List[str]] = {}
+    categories: List[str] = []
+    for kb in keybinds:
+        code = key_code(kb.key)
+        by_code.setdefault(code, []).append(kb)
+        layer = layers.setdefault(modifier_combo(kb.modifiers), [])
+        if code not in layer:
+            layer.append(code)
+        if kb.category not in categories:
+            categories.append(kb.category)
+
+    drawn = set()
+    rows = []
+    for row_index, row in enumerate(ROWS):
+        mappings = []
+        for position, (code, label, width, is_modifier) in enumerate(row):
+            drawn.add(code)
+            mappings.append(
+                KeyMapping.model_construct(
+                    key_code=code,
+                    display=label,
+                    row=row_index,
+                    position=position,
+                    width=width,
+                    is_modifier=is_modifier,
+                    keybinds=[kb.to_model() for kb in by_code.get(code, ())],
+                )
+            )
+        rows.append(mappings)
+
+    unmapped = [
+        kb.to_model() for code, binds in by_code.items() if code not in drawn for kb in binds
+    ]
+    return KeyboardLayout.model_construct(
+        platform=platform, rows=rows, layers=layers, categories=categories, unmapped=unmapped
+    )
@@ -0,0 +1,259 @@
+"""Process-local metrics rendered in the Prometheus text format.
+
+Recording is a dict lookup and a couple of additions on the event loop, so
+instrumented paths stay cheap. Numbers the services already keep (cache
+hits, rate-limit budget) aren't counted twice: collectors read them from
+the services' stats() when /metrics is scraped.
+
+Each worker keeps its own registry; with `--workers N` scrape every worker
+(or run one) to see everything.
+"""
+from __future__ import annotations
+
+import math
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+# seconds; from a cached lookup up to a slow GitHub call
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = Tuple[str, ...]
+M = TypeVar("M", bound="Metric")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Labels, values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Labels = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+
+    @abstractmethod
+    def lines(self) -> Iterator[str]:
+        """The sample lines, without the HELP and TYPE header."""
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self.lines()
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Labels = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Labels, float] = {}
+        if not labels:
+            self._values[()] = 0.0
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def lines(self) -> Iterator[str]:
+        for values, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: Labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> _Timer:
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Labels = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+        # per label set: a count per bucket (not cumulative), one for +Inf, then the sum
+        self._series: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def time(self, *labels: str) -> _Timer:
+        return _Timer(self, labels)
+
+    def lines(self) -> Iterator[str]:
+        for values, series in self._series.items():
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, math.inf), series):
+                cumulative += count
+                le = _format_labels(self.labels, values, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{le} {_format_value(cumulative)}"
+            label_str = _format_labels(self.labels, values)
+            yield f"{self.name}_sum{label_str} {_format_value(series[-1])}"
+            yield f"{self.name}_count{label_str} {_format_value(cumulative)}"
+
+
+Collector = Callable[[], Iterable[Metric]]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._collectors: List[Collector] = []
+
+    def register(self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, collect: Collector) -> Collector:
+        """Add metrics built from existing stats at scrape time."""
+        self._collectors.append(collect)
+        return collect
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            for metric in collect():
+                lines.extend(metric.render())
+        lines.append("")
+        return "\n".join(lines)
+
+
+registry = Registry()
+
+http_in_flight = registry.register(
+    Gauge("portfolio_http_requests_in_flight", "HTTP requests being handled.")
+)
+http_duration = registry.register(
+    Histogram(
+        "portfolio_http_request_duration_seconds",
+        "Time to the end of the response body, by route template.",
+        ("method", "route"),
+    )
+)
+stage_duration = registry.register(
+    Histogram(
+        "portfolio_stage_duration_seconds",
+        "Time spent in one stage of building a response: parse, highlight or render.",
+        ("stage", "name"),
+    )
+)
+github_in_flight = registry.register(
+    Gauge("portfolio_github_requests_in_flight", "Requests to GitHub awaiting a response.")
+)
+github_duration = registry.register(
+    Histogram(
+        "portfolio_github_request_duration_seconds",
+        "Upstream GitHub call time, by endpoint.",
+        ("endpoint",),
+    )
+)
+github_responses = registry.register(
+    Counter(
+        "portfolio_github_responses_total",
+        "GitHub responses by endpoint and status ('error' for transport failures).",
+        ("endpoint", "status"),
+    )
+)
+
+
+def stage(name: str, detail: str) -> _Timer:
+    return stage_duration.time(name, detail)
+
+
+def _route_template(scope: Scope, templates: Dict[int, str]) -> str:
+    route = scope.get("route")
+    path: Optional[str] = getattr(route, "path", None)
+    if path is None:
+        # unmatched paths share one series so scanners can't blow up the label set
+        return "unmatched"
+    # routes live as long as the app, so their ids are stable keys
+    template = templates.get(id(route))
+    if template is None:
+        # routes from an included router only know their path below the router's prefix
+        template = path
+        try:
+            matched = route.url_path_for(route.name, **scope.get("path_params", {}))
+        except Exception:
+            matched = None
+        if matched is not None and scope["path"].endswith(matched):
+            template = scope["path"][: len(scope["path"]) - len(matched)] + path
+        templates[id(route)] = template
+    return template
+
+
+class MetricsMiddleware:
+    """Counts in-flight requests and times each one under its route template."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._templates: Dict[int, str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        http_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            http_in_flight.dec()
+            route = _route_template(scope, self._templates)
+            method = scope["method"] if scope["method"] in HTTP_METHODS else "other"
+            http_duration.observe(time.perf_counter() - started, method, route)
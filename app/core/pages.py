@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from app.config import get_settings
+from app.core.cache import LRUCache
+from app.core.concurrency import SingleFlight, gather_limited
+from app.core.responses import body_etag
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+Renderer = Callable[[], Awaitable[str]]
+
+
+class RenderedPage:
+    __slots__ = ("body", "etag", "rendered_at")
+
+    def __init__(self, html: str):
+        self.body = html.encode()
+        self.etag = body_etag(self.body)
+        self.rendered_at = time.monotonic()
+
+
+class PageCache:
+    """Rendered HTML keyed by route and the params the route actually uses.
+
+    Pages are tagged with the data they depend on; `invalidate(tag)` drops the
+    matching pages and re-renders them in the background, so the next visitor
+    still gets bytes from memory. Tagged pages older than `page_tagged_ttl` are
+    served once more while they re-render the same way.
+    """
+
+    def __init__(self, max_entries: int):
+        self._pages: LRUCache[RenderedPage] = LRUCache(max_entries)
+        # how to rebuild each page; bounded like the pages since keys include URL params
+        self._renderers: LRUCache[Tuple[Renderer, Tuple[str, ...]]] = LRUCache(max_entries)
+        self._flights = SingleFlight()
+        self._warming: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.expired = 0
+
+    async def get(self, key: Hashable, render: Renderer, tags: Iterable[str] = ()) -> RenderedPage:
+        page = self._pages.get(key)
+        if page is not None:
+            self.hits += 1
+            if tags and time.monotonic() - page.rendered_at >= settings.page_tagged_ttl:
+                self.expired += 1
+                self._flights.start(key, lambda: self._render(key, render))
+            return page
+        self.misses += 1
+        self._renderers.set(key, (render, tuple(tags)))
+        return await self._flights.do(key, lambda: self._render(key, render))
+
+    async def _render(self, key: Hashable, render: Renderer) -> RenderedPage:
+        page = RenderedPage(await render())
+        self._pages.set(key, page)
+        return page
+
+    def invalidate(self, tag: Optional[str] = None) -> int:
+        keys = [
+            key for key, (_, tags) in self._renderers.items() if tag is None or tag in tags
+        ]
+        for key in keys:
+            self._pages.pop(key)
+        self.invalidations += 1
+        if keys:
+            self.warm(keys)
+        return len(keys)
+
+    def warm(self, keys: List[Hashable]) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._warming = loop.create_task(self._rerender(keys))
+
+    async def _rerender(self, keys: List[Hashable]) -> None:
+        entries = [(key, self._renderers.get(key)) for key in keys]
+        await gather_limited(
+            self._safe_get(key, *entry) for key, entry in entries if entry is not None
+        )
+
+    async def _safe_get(self, key: Hashable, render: Renderer, tags: Tuple[str, ...]) -> None:
+        try:
+            await self.get(key, render, tags)
+        except Exception:
+            logger.exception("pre-rendering %r failed", key)
+
+    async def prerender(self, pages: Iterable[Tuple[Hashable, Renderer, Iterable[str]]]) -> None:
+        await gather_limited(
+            self._safe_get(key, render, tuple(tags)) for key, render, tags in pages
+        )
+
+    def clear(self) -> None:
+        self._pages.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._pages),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "expired": self.expired,
+        }
+
+
+page_cache = PageCache(settings.page_cache_size)
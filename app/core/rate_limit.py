@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, Iterator, Mapping, Optional
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class Priority(IntEnum):
+    USER = 0
+    BACKGROUND = 1
+
+
+_priority: ContextVar[Priority] = ContextVar("github_priority", default=Priority.USER)
+
+
+@contextmanager
+def background() -> Iterator[None]:
+    """Mark GitHub calls made inside the block as background work."""
+    token = _priority.set(Priority.BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+class Budget:
+    """One rate-limit bucket as reported by the X-RateLimit-* headers."""
+
+    __slots__ = ("limit", "remaining", "used", "reset_at")
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.used: Optional[int] = None
+        self.reset_at: Optional[float] = None
+
+    def exhausted(self, now: float) -> bool:
+        return self.remaining == 0 and self.reset_at is not None and now < self.reset_at
+
+
+class RateLimiter:
+    """Tracks GitHub's rate-limit budget for one token and decides who may spend it.
+
+    User-facing requests always go out unless the budget is exhausted or GitHub asked us
+    to back off. Background requests also stop once the remaining budget drops to
+    `github_rate_limit_reserve`, unless they carry validators (a 304 is free), and run
+    through a smaller pool of slots so they never queue ahead of visitors.
+    """
+
+    def __init__(self, token_label: str):
+        self.token_label = token_label
+        self.budgets: Dict[str, Budget] = {}
+        self.blocked_until = 0.0
+        self._background_slots = asyncio.Semaphore(settings.github_background_concurrency)
+        self.deferred = 0
+        self.retries = 0
+        self.rate_limited = 0
+
+    def budget(self, resource: str = "core") -> Budget:
+        return self.budgets.setdefault(resource, Budget())
+
+    def admit(self, priority: Priority, conditional: bool = False) -> bool:
+        now = time.time()
+        if now < self.blocked_until:
+            return False
+        core = self.budget()
+        if core.exhausted(now):
+            return False
+        if priority is Priority.BACKGROUND and not conditional and core.remaining is not None:
+            return core.remaining > settings.github_rate_limit_reserve
+        return True
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        remaining = headers.get("x-ratelimit-remaining")
+        if remaining is None:
+            return
+        budget = self.budget(headers.get("x-ratelimit-resource", "core"))
+        budget.remaining = int(remaining)
+        budget.limit = _int(headers.get("x-ratelimit-limit"), budget.limit)
+        budget.used = _int(headers.get("x-ratelimit-used"), budget.used)
+        reset = headers.get("x-ratelimit-reset")
+        if reset is not None:
+            budget.reset_at = float(reset)
+
+    def retry_delay(
+        self, status_code: int, headers: Mapping[str, str], attempt: int, priority: Priority
+    ) -> Optional[float]:
+        """Seconds to wait before retrying a rate-limited response, or None to give up."""
+        if not is_rate_limited(status_code, headers):
+            return None
+        self.rate_limited += 1
+        retry_after = _int(headers.get("retry-after"), None)
+        if retry_after is None and headers.get("x-ratelimit-remaining") == "0":
+            # primary limit: nothing to gain before the reset, which `update` recorded
+            return None
+
+        base = settings.github_retry_base_delay * (2**attempt)
+        delay = max(float(retry_after or 0), base) * random.uniform(1.0, 1.5)
+        max_wait = (
+            settings.github_background_retry_max_wait
+            if priority is Priority.BACKGROUND
+            else settings.github_retry_max_wait
+        )
+        if attempt >= settings.github_retry_attempts or delay > max_wait:
+            self.blocked_until = max(self.blocked_until, time.time() + delay)
+            return None
+        self.retries += 1
+        return delay
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority) -> AsyncIterator[None]:
+        if priority is Priority.BACKGROUND:
+            async with self._background_slots:
+                yield
+        else:
+            yield
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "token": self.token_label,
+            "resources": {
+                name: {
+                    "limit": budget.limit,
+                    "remaining": budget.remaining,
+                    "used": budget.used,
+                    "reset_in": max(0.0, budget.reset_at - now) if budget.reset_at else None,
+                }
+                for name, budget in self.budgets.items()
+            },
+            "reserve": settings.github_rate_limit_reserve,
+            "blocked_for": max(0.0, self.blocked_until - now),
+            "deferred": self.deferred,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+        }
+
+
+def is_rate_limited(status_code: int, headers: Mapping[str, str]) -> bool:
+    if status_code == 429:
+        return True
+    return status_code == 403 and (
+        "retry-after" in headers or headers.get("x-ratelimit-remaining") == "0"
+    )
+
+
+def _int(value: Optional[str], default: Optional[int]) -> Optional[int]:
+    try:
+        return int(value) if value is not None else default
+    except ValueError:
+        return default
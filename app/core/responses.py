@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Optional
+
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is not None:
+        return to_dict()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+class JSONPayload:
+    """A response body encoded once, plus the strong ETag derived from it."""
+
+    __slots__ = ("body", "etag")
+
+    def __init__(self, data: Any):
+        self.body = orjson.dumps(data, default=_default)
+        self.etag = body_etag(self.body)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def body_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def cached_response(
+    request: Request, body: bytes, etag: str, media_type: str, cache_control: str
+) -> Response:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=media_type, headers=headers)
+
+
+def payload_response(
+    request: Request, payload: JSONPayload, max_age: Optional[int] = None
+) -> Response:
+    max_age = settings.api_cache_max_age if max_age is None else max_age
+    return cached_response(
+        request, payload.body, payload.etag, "application/json", f"public, max-age={max_age}"
+    )
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import bisect
+import hashlib
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+# score multiplier for a query token that only matches as a prefix of a term
+PREFIX_WEIGHT = 0.5
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.casefold())
+
+
+class SearchDocument:
+    __slots__ = ("id", "kind", "title", "url", "platform", "text", "data", "length")
+
+    def __init__(
+        self,
+        id: str,
+        kind: str,
+        title: str,
+        url: str,
+        platform: Optional[str] = None,
+        text: str = "",
+        data: Optional[Dict[str, Any]] = None,
+    ):
+        self.id = id
+        self.kind = kind
+        self.title = title
+        self.url = url
+        self.platform = platform
+        self.text = text
+        self.data = data
+        self.length = 0
+
+
+class InvertedIndex:
+    """Term -> postings index with per-field weights and prefix matching.
+
+    Documents are grouped by source (e.g. one platform's keybinds, one config
+    file) so a refresh replaces just the sources whose content changed.
+    """
+
+    def __init__(self):
+        self._docs: Dict[str, SearchDocument] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._sources: Dict[str, Tuple[str, Set[str]]] = {}
+        self._terms: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def replace_source(
+        self, source: str, docs: Iterable[Tuple[SearchDocument, Dict[str, float]]]
+    ) -> bool:
+        """Swap the documents of `source`; `docs` pairs each document with {text: weight}.
+
+        Returns False without touching the index when the content is unchanged.
+        """
+        docs = list(docs)
+        digest = hashlib.sha1()
+        for doc, fields in docs:
+            digest.update(doc.id.encode())
+            for text, weight in fields.items():
+                digest.update(f"{weight}:{text}".encode())
+        fingerprint = digest.hexdigest()
+        previous = self._sources.get(source)
+        if previous and previous[0] == fingerprint:
+            return False
+
+        if previous:
+            for doc_id in previous[1]:
+                self._remove(doc_id)
+        for doc, fields in docs:
+            self._add(doc, fields)
+        self._sources[source] = (fingerprint, {doc.id for doc, _ in docs})
+        return True
+
+    def _add(self, doc: SearchDocument, fields: Dict[str, float]) -> None:
+        weights: Dict[str, float] = {}
+        for text, weight in fields.items():
+            for term in tokenize(text):
+                weights[term] = weights.get(term, 0.0) + weight
+        doc.length = sum(weights.values()) or 1.0
+        self._docs[doc.id] = doc
+        self._doc_terms[doc.id] = list(weights)
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._terms = None
+            postings[doc.id] = weight
+
+    def _remove(self, doc_id: str) -> None:
+        self._docs.pop(doc_id, None)
+        for term in self._doc_terms.pop(doc_id, []):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                self._terms = None
+
+    def _expand(self, token: str) -> List[str]:
+        if self._terms is None:
+            self._terms = sorted(self._postings)
+        start = bisect.bisect_left(self._terms, token)
+        end = bisect.bisect_left(self._terms, token + "\uffff", start)
+        return self._terms[start:end]
+
+    def search(
+        self,
+        query: str,
+        kind: Optional[str] = None,
+        platform: Optional[str] = None,
+    ) -> List[Tuple[float, SearchDocument]]:
+        """Every query token must match a term exactly or as a prefix; results by score."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        total = len(self._docs)
+        scores: Optional[Dict[str, float]] = None
+        for token in dict.fromkeys(tokens):
+            token_scores: Dict[str, float] = {}
+            for term in self._expand(token):
+                postings = self._postings[term]
+                idf = math.log(1 + total / len(postings))
+                boost = 1.0 if term == token else PREFIX_WEIGHT
+                for doc_id, weight in postings.items():
+                    # sublinear tf so one huge config doesn't outrank a focused keybind
+                    tf = math.log1p(weight)
+                    score = boost * idf * tf / math.sqrt(self._docs[doc_id].length)
+                    if score > token_scores.get(doc_id, 0.0):
+                        token_scores[doc_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {d: s + token_scores[d] for d, s in scores.items() if d in token_scores}
+            if not scores:
+                return []
+
+        results = []
+        for doc_id, score in scores.items():
+            doc = self._docs[doc_id]
+            if kind is not None and doc.kind != kind:
+                continue
+            if platform is not None and doc.platform != platform:
+                continue
+            results.append((score, doc))
+        results.sort(key=lambda item: (-item[0], item[1].id))
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "documents": len(self._docs),
+            "terms": len(self._postings),
+            "sources": len(self._sources),
+        }
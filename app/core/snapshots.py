@@ -0,0 +1,176 @@
+"""Content-addressed storage for repo snapshots.
+
+Layout under ``root``::
+
+    objects/ab/cdef...      file contents, named by their git blob SHA
+    trees/<repo>/<sha>.json path -> blob SHA for one commit
+    refs/<repo>.json        the commit currently served for a repo
+
+Files shared between commits are stored once, and nothing from an archive is
+ever written under a path taken from the archive itself.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+# objects written or reused this recently are never pruned: a sync in this or another
+# worker may have unpacked them without having written the tree that points at them yet
+PRUNE_GRACE = 3600.0
+
+
+def git_blob_sha(data: bytes) -> str:
+    """The SHA git (and the GitHub trees API) uses for a file with these contents."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def object_path(objects_dir: Path, sha: str) -> Path:
+    return objects_dir / sha[:2] / sha[2:]
+
+
+def unpack_tarball(archive: str, objects_dir: str, max_file_size: int) -> Dict[str, str]:
+    """Store every regular file of a GitHub tarball; returns repo path -> blob SHA.
+
+    Runs in the CPU pool. GitHub wraps the tree in one ``<owner>-<repo>-<sha>/``
+    directory, which is stripped.
+    """
+    objects = Path(objects_dir)
+    files: Dict[str, str] = {}
+    with tarfile.open(archive, "r:*") as tar:
+        for member in tar:
+            if not member.isfile() or member.size > max_file_size:
+                continue
+            _, _, path = member.name.partition("/")
+            if not path:
+                continue
+            extracted = tar.extractfile(member)
+            if extracted is None:
+                continue
+            data = extracted.read()
+            sha = git_blob_sha(data)
+            target = object_path(objects, sha)
+            if target.exists():
+                # reused by this sync; keeps prune's grace period from expiring under it
+                os.utime(target)
+            else:
+                _write_atomic(target, data)
+            files[path] = sha
+    return files
+
+
+def _slug(repo: str) -> str:
+    return repo.replace("/", "__")
+
+
+class Snapshot:
+    """The files of one repo at one commit."""
+
+    __slots__ = ("repo", "sha", "files")
+
+    def __init__(self, repo: str, sha: str, files: Dict[str, str]):
+        self.repo = repo
+        self.sha = sha
+        self.files = files
+
+    def list(self, prefix: str = "") -> List[str]:
+        prefix = prefix.strip("/")
+        if not prefix:
+            return sorted(self.files)
+        return sorted(p for p in self.files if p == prefix or p.startswith(prefix + "/"))
+
+
+class SnapshotStore:
+    def __init__(self, root: Path):
+        self.root = root
+        self.objects = root / "objects"
+
+    def _tree_path(self, repo: str, sha: str) -> Path:
+        return self.root / "trees" / _slug(repo) / f"{sha}.json"
+
+    def _ref_path(self, repo: str) -> Path:
+        return self.root / "refs" / f"{_slug(repo)}.json"
+
+    def read_object(self, sha: str) -> Optional[bytes]:
+        try:
+            return object_path(self.objects, sha).read_bytes()
+        except OSError:
+            return None
+
+    def write_tree(self, snapshot: Snapshot) -> None:
+        body = json.dumps(snapshot.files, sort_keys=True).encode()
+        _write_atomic(self._tree_path(snapshot.repo, snapshot.sha), body)
+
+    def read_tree(self, repo: str, sha: str) -> Optional[Snapshot]:
+        try:
+            files = json.loads(self._tree_path(repo, sha).read_text())
+        except (OSError, ValueError):
+            return None
+        # a tree is only usable if every object it points at survived
+        if not all(object_path(self.objects, blob).exists() for blob in files.values()):
+            return None
+        return Snapshot(repo, sha, files)
+
+    def write_ref(self, repo: str, sha: str) -> None:
+        _write_atomic(self._ref_path(repo), json.dumps({"sha": sha}).encode())
+
+    def read_ref(self, repo: str) -> Optional[str]:
+        try:
+            return json.loads(self._ref_path(repo).read_text()).get("sha")
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def prune(self, repos: Iterable[str], keep: int, grace: float = PRUNE_GRACE) -> int:
+        """Keep the newest ``keep`` trees per repo and drop objects nothing points at.
+
+        Objects touched in the last ``grace`` seconds stay, since syncs running
+        concurrently haven't necessarily written their trees yet.
+        """
+        live: Set[str] = set()
+        for repo in repos:
+            trees = sorted(
+                (self.root / "trees" / _slug(repo)).glob("*.json"),
+                key=lambda p: p.stat().st_mtime,
+                reverse=True,
+            )
+            for stale in trees[keep:]:
+                stale.unlink(missing_ok=True)
+            for tree in trees[:keep]:
+                try:
+                    live.update(json.loads(tree.read_text()).values())
+                except (OSError, ValueError):
+                    continue
+
+        removed = 0
+        if not self.objects.exists():
+            return removed
+        cutoff = time.time() - grace
+        for bucket in self.objects.iterdir():
+            for obj in bucket.iterdir():
+                if bucket.name + obj.name in live or obj.name.startswith(".tmp-"):
+                    continue
+                try:
+                    if obj.stat().st_mtime > cutoff:
+                        continue
+                except OSError:
+                    continue
+                obj.unlink(missing_ok=True)
+                removed += 1
+        return removed
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import stat
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from app.core.compression import brotli, negotiate
+
+STATIC_DIR = Path("static")
+# build output of scripts/build_static.py; every file in it has a content hash in its name
+DIST_DIR = "dist"
+# directories whose file names change with their content
+IMMUTABLE_DIRS = (f"{DIST_DIR}/", "thumbs/")
+MANIFEST = STATIC_DIR / DIST_DIR / "manifest.json"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+# assets worth hashing and precompressing; images are already compressed
+TEXT_SUFFIXES = {".css", ".js", ".svg", ".json", ".html", ".txt", ".map"}
+
+
+@lru_cache(maxsize=1)
+def load_manifest() -> Dict[str, str]:
+    try:
+        return json.loads(MANIFEST.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def static_url(path: str) -> str:
+    """URL for a static asset, preferring its content-hashed build if one exists."""
+    return f"/static/{load_manifest().get(path, path)}"
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    if path.exists() and path.read_bytes() == data:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return True
+
+
+def precompress(path: Path, data: bytes) -> Dict[str, int]:
+    """Write .gz (and .br, with brotli installed) siblings of ``path``; returns their sizes."""
+    # mtime=0 keeps the .gz byte-identical across builds
+    variants = {".gz": gzip.compress(data, 9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    for suffix, body in variants.items():
+        write_if_changed(path.with_name(path.name + suffix), body)
+    return {suffix: len(body) for suffix, body in variants.items()}
+
+
+def build_assets(
+    static_dir: Path = STATIC_DIR, report: Optional[Callable[[str, str, Dict], None]] = None
+) -> Dict[str, str]:
+    """Write content-hashed, precompressed copies of the text assets into static/dist.
+
+    Old builds are left in place so pages cached with their URLs keep working.
+    """
+    dist = static_dir / DIST_DIR
+    manifest = {}
+    for source in sorted(static_dir.rglob("*")):
+        if not source.is_file() or source.suffix not in TEXT_SUFFIXES:
+            continue
+        if dist in source.parents:
+            continue
+        rel = source.relative_to(static_dir)
+        data = source.read_bytes()
+        digest = hashlib.blake2b(data, digest_size=4).hexdigest()
+        hashed = rel.with_name(f"{rel.stem}.{digest}{rel.suffix}")
+        target = dist / hashed
+        write_if_changed(target, data)
+        sizes = precompress(target, data)
+        manifest[rel.as_posix()] = f"{DIST_DIR}/{hashed.as_posix()}"
+        if report is not None:
+            report(rel.as_posix(), hashed.as_posix(), {"": len(data), **sizes})
+
+    body = json.dumps(manifest, indent=2, sort_keys=True) + "\n"
+    write_if_changed(dist / "manifest.json", body.encode())
+    load_manifest.cache_clear()
+    return manifest
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that serves ``.br``/``.gz`` siblings when the client accepts them."""
+
+    def __init__(self, *args, max_age: int = 3600, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_age = max_age
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await self._precompressed(path, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+        immutable = path.startswith(IMMUTABLE_DIRS)
+        response.headers["Cache-Control"] = (
+            IMMUTABLE if immutable else f"public, max-age={self.max_age}"
+        )
+        response.headers.add_vary_header("Accept-Encoding")
+        return response
+
+    async def _precompressed(self, path: str, scope: Scope) -> Optional[Response]:
+        if scope["method"] not in ("GET", "HEAD"):
+            return None
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        # serving a prebuilt .br needs no brotli module at runtime
+        offered = list(_SUFFIXES)
+        while offered:
+            encoding = negotiate(accept, offered)
+            if encoding is None:
+                return None
+            offered.remove(encoding)
+            try:
+                full_path, stat_result = await anyio.to_thread.run_sync(
+                    self.lookup_path, path + _SUFFIXES[encoding]
+                )
+            except (OSError, ValueError):
+                return None
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                continue
+            response = self.file_response(full_path, stat_result, scope)
+            response.headers["Content-Encoding"] = encoding
+            if response.status_code == 304:
+                return response
+            media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            if media_type.startswith("text/"):
+                media_type += "; charset=utf-8"
+            response.headers["Content-Type"] = media_type
+            return response
+        return None
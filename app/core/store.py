@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import DateTime, String, Text, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class StoredResult(Base):
+    __tablename__ = "stored_results"
+
+    kind: Mapped[str] = mapped_column(String(32), primary_key=True)
+    repo: Mapped[str] = mapped_column(String(200), primary_key=True)
+    path: Mapped[str] = mapped_column(String(500), primary_key=True)
+    sha: Mapped[str] = mapped_column(String(64), primary_key=True)
+    payload: Mapped[str] = mapped_column(Text)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+
+class ResultStore:
+    """Parsed GitHub-derived results persisted in SQLite, keyed by repo + path + commit SHA."""
+
+    def __init__(self, database_url: str):
+        self.database_url = database_url
+        self._engine: Optional[AsyncEngine] = None
+        self._sessions: Optional[async_sessionmaker] = None
+
+    async def init(self) -> None:
+        if self._engine is not None:
+            return
+        self._engine = create_async_engine(self.database_url)
+        self._sessions = async_sessionmaker(self._engine, expire_on_commit=False)
+        try:
+            async with self._engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+        except OperationalError:
+            # another worker created the table between our check and our CREATE
+            async with self._engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+    async def close(self) -> None:
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+            self._sessions = None
+
+    async def get(self, kind: str, repo: str, path: str, sha: str) -> Optional[Any]:
+        if self._sessions is None:
+            return None
+        try:
+            async with self._sessions() as session:
+                row = await session.get(StoredResult, (kind, repo, path, sha))
+        except SQLAlchemyError:
+            return None
+        return json.loads(row.payload) if row else None
+
+    async def get_latest(self, kind: str, repo: str, path: str = "") -> Optional[Any]:
+        if self._sessions is None:
+            return None
+        stmt = (
+            select(StoredResult.payload)
+            .where(
+                StoredResult.kind == kind,
+                StoredResult.repo == repo,
+                StoredResult.path == path,
+            )
+            .order_by(StoredResult.updated_at.desc())
+            .limit(1)
+        )
+        try:
+            async with self._sessions() as session:
+                payload = await session.scalar(stmt)
+        except SQLAlchemyError:
+            return None
+        return json.loads(payload) if payload else None
+
+    async def put(self, kind: str, repo: str, path: str, sha: str, payload: Any) -> None:
+        if self._sessions is None:
+            return
+        values = {
+            "kind": kind,
+            "repo": repo,
+            "path": path,
+            "sha": sha,
+            "payload": json.dumps(payload),
+            "updated_at": datetime.now(timezone.utc),
+        }
+        stmt = insert(StoredResult).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["kind", "repo", "path", "sha"],
+            set_={"payload": stmt.excluded.payload, "updated_at": stmt.excluded.updated_at},
+        )
+        try:
+            async with self._sessions() as session:
+                await session.execute(stmt)
+                await session.commit()
+        except SQLAlchemyError:
+            pass
+
+
+result_store = ResultStore(settings.database_url)
@@ -0,0 +1,122 @@
+"""Image resizing for the gallery; runs inside the CPU pool, so everything here is picklable."""
+from __future__ import annotations
+
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+try:
+    from PIL import Image, features
+except ImportError:  # optional: without Pillow only video posters are produced
+    Image = None
+    features = None
+
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp", "jpg": "image/jpeg"}
+_SAVE_OPTIONS = {
+    "avif": {"quality": 55},
+    "webp": {"quality": 80, "method": 4},
+}
+
+
+def supported_formats(requested: List[str]) -> List[str]:
+    if Image is None:
+        return []
+    return [fmt for fmt in requested if fmt == "webp" or features.check(fmt)]
+
+
+def ffmpeg_path() -> Optional[str]:
+    return shutil.which("ffmpeg")
+
+
+def extract_poster(source: Path, target: Path, at: float = 1.0) -> bool:
+    ffmpeg = ffmpeg_path()
+    if ffmpeg is None:
+        return False
+    result = subprocess.run(
+        [
+            ffmpeg, "-loglevel", "error", "-y", "-ss", str(at), "-i", str(source),
+            "-frames:v", "1", "-q:v", "3", str(target),
+        ],
+        capture_output=True,
+        timeout=60,
+    )
+    return result.returncode == 0 and target.exists()
+
+
+def _source_stem(filename: str) -> str:
+    """The ``<stem>-<key>`` part shared by every file rendered for one source."""
+    return filename.rsplit("-", 1)[0]
+
+
+def remove_stale(dest: str, keep: Set[str]) -> int:
+    """Delete rendered files whose source is gone or has changed since."""
+    removed = 0
+    dest_path = Path(dest)
+    if not dest_path.is_dir():
+        return 0
+    for path in dest_path.iterdir():
+        if path.name.startswith(".") or not path.is_file():
+            continue
+        if _source_stem(path.name) not in keep:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def render_variants(
+    source: str,
+    dest: str,
+    key: str,
+    widths: List[int],
+    formats: List[str],
+    is_video: bool = False,
+) -> Dict[str, List]:
+    """Write resized copies of ``source`` into ``dest`` and describe them.
+
+    Files are named ``<stem>-<key>-<width>.<fmt>``; ``key`` changes with the source,
+    so anything already on disk is reused as-is. Returns ``{"sources": [(fmt, width,
+    filename), ...], "poster": filename or None}``; animated images get no sources
+    and ``"animated": True``.
+    """
+    source_path, dest_path = Path(source), Path(dest)
+    dest_path.mkdir(parents=True, exist_ok=True)
+    stem = f"{source_path.stem}-{key}"
+    poster: Optional[str] = None
+
+    if is_video:
+        poster_path = dest_path / f"{stem}-poster.jpg"
+        if not poster_path.exists() and not extract_poster(source_path, poster_path):
+            return {"sources": [], "poster": None}
+        poster = poster_path.name
+        source_path = poster_path
+
+    formats = supported_formats(formats)
+    if not formats:
+        return {"sources": [], "poster": poster}
+
+    variants = []
+    with Image.open(source_path) as image:
+        if getattr(image, "is_animated", False):
+            # a still variant would replace the animation; the original is served instead
+            return {"sources": [], "poster": poster, "animated": True}
+        image.draft("RGB", (max(widths), max(widths)))
+        original_width = image.width
+        # never upscale; the smallest requested width is always produced
+        targets = sorted({min(w, original_width) for w in widths})
+        frame = None
+        for width in targets:
+            for fmt in formats:
+                name = f"{stem}-{width}.{fmt}"
+                target = dest_path / name
+                if not target.exists():
+                    if frame is None:
+                        alpha = image.mode in ("RGBA", "LA", "P")
+                        frame = image.convert("RGBA" if alpha else "RGB")
+                    height = max(1, round(frame.height * width / frame.width))
+                    resized = frame.resize((width, height), Image.LANCZOS)
+                    tmp = target.with_suffix(f".tmp.{fmt}")
+                    resized.save(tmp, format=fmt.upper(), **_SAVE_OPTIONS.get(fmt, {}))
+                    tmp.replace(target)
+                variants.append((fmt, width, name))
+    return {"sources": variants, "poster": poster}
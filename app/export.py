@@ -0,0 +1,219 @@
+"""Export the portfolio as a static site.
+
+Every page and every JSON endpoint the pages call is requested through the app
+itself, so the output matches what the server would send. HTML goes to
+``<route>/index.html`` and JSON to ``<route>.json``, each with .gz (and .br)
+siblings. A file server needs to try ``$uri``, ``$uri.json`` and
+``$uri/index.html`` in that order, e.g. for nginx::
+
+    try_files $uri $uri.json $uri/index.html =404;
+    gzip_static on;
+
+Run it from the project root, like the server::
+
+    python -m app.export [--out site] [--incremental]
+
+With ``--incremental`` the previous export is kept and only files whose content
+changed are rewritten, so mtimes (and rsync/CDN uploads) track real changes. A
+route that fails (GitHub down or rate-limited) keeps its previous file.
+
+The exit status is non-zero if any route failed, unless ``--allow-partial`` is given.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# the export drives the app directly; no background work or startup prerendering
+os.environ.setdefault("REFRESH_ENABLED", "false")
+os.environ.setdefault("PAGE_PRERENDER", "false")
+
+import httpx  # noqa: E402
+
+from app.config import get_settings  # noqa: E402
+from app.core.concurrency import gather_limited  # noqa: E402
+from app.core.static import (  # noqa: E402
+    STATIC_DIR,
+    TEXT_SUFFIXES,
+    build_assets,
+    precompress,
+)
+
+settings = get_settings()
+
+MANIFEST_NAME = ".export-manifest.json"
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+def output_path(route: str, content_type: str) -> str:
+    route = route.strip("/")
+    if content_type.startswith("application/json"):
+        return f"{route}.json"
+    return f"{route}/index.html" if route else "index.html"
+
+
+async def api_routes() -> List[str]:
+    from app.services.github_service import github_service
+
+    routes = ["/api/github/repos", "/api/github/dotfiles", "/api/configs/highlight-css"]
+    for platform, repo in settings.repos.items():
+        routes += [
+            f"/api/keybinds/{platform}",
+            f"/api/keybinds/{platform}/layout",
+            f"/api/keybinds/{platform}/categories",
+            f"/api/github/readme/{platform}",
+            f"/api/github/repo/{repo}",
+            f"/api/github/changelog/{repo}",
+        ]
+        routes += [
+            f"/api/configs/{repo}/file/{path}" for path in settings.config_files.get(platform, [])
+        ]
+    # projects.html loads a changelog for every listed repo
+    for info in await github_service.get_all_repos():
+        routes.append(f"/api/github/changelog/{info.full_name}")
+    return list(dict.fromkeys(routes))
+
+
+def page_routes() -> List[str]:
+    from app.main import all_pages
+    from app.services.gallery_service import gallery_service
+
+    # gallery filters and pages are path URLs, since a file server ignores query strings
+    return [key for key, _, _ in all_pages()] + gallery_service.urls(settings.repos)
+
+
+class Exporter:
+    def __init__(self, out: Path, incremental: bool):
+        self.out = out
+        self.incremental = incremental
+        self.previous: Dict[str, str] = {}
+        self.current: Dict[str, str] = {}
+        self.written = 0
+        self.unchanged = 0
+        self.failed: List[Tuple[str, int]] = []
+
+    def load_manifest(self) -> None:
+        try:
+            self.previous = json.loads((self.out / MANIFEST_NAME).read_text())
+        except (OSError, ValueError):
+            self.previous = {}
+
+    def write(self, rel: str, body: bytes) -> None:
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.current[rel] = digest
+        target = self.out / rel
+        if self.previous.get(rel) == digest and target.exists():
+            self.unchanged += 1
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(body)
+        precompress(target, body)
+        self.written += 1
+
+    def remove_stale(self) -> None:
+        for rel in set(self.previous) - set(self.current):
+            for suffix in ("", *COMPRESSED_SUFFIXES):
+                (self.out / (rel + suffix)).unlink(missing_ok=True)
+
+    def copy_static(self) -> None:
+        for source in sorted(STATIC_DIR.rglob("*")):
+            if not source.is_file() or source.name.endswith(COMPRESSED_SUFFIXES):
+                continue
+            target = self.out / "static" / source.relative_to(STATIC_DIR)
+            stat = source.stat()
+            if target.exists():
+                existing = target.stat()
+                if existing.st_size == stat.st_size and existing.st_mtime_ns == stat.st_mtime_ns:
+                    self.unchanged += 1
+                    continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, target)
+            prebuilt = False
+            for suffix in COMPRESSED_SUFFIXES:
+                variant = source.with_name(source.name + suffix)
+                if variant.exists():
+                    shutil.copy2(variant, target.with_name(target.name + suffix))
+                    prebuilt = True
+            if source.suffix in TEXT_SUFFIXES and not prebuilt:
+                precompress(target, source.read_bytes())
+            self.written += 1
+
+    def keep_previous(self, route: str) -> None:
+        """Keep the last good copy of a route that failed this time."""
+        for content_type in ("application/json", "text/html"):
+            rel = output_path(route, content_type)
+            if rel in self.previous:
+                self.current[rel] = self.previous[rel]
+                self.unchanged += 1
+
+    async def fetch(self, client: httpx.AsyncClient, route: str) -> None:
+        response = await client.get(route)
+        if response.status_code != 200:
+            self.failed.append((route, response.status_code))
+            self.keep_previous(route)
+            return
+        self.write(output_path(route, response.headers.get("content-type", "")), response.content)
+
+    async def run(self) -> None:
+        if self.incremental:
+            self.load_manifest()
+        elif self.out.exists():
+            shutil.rmtree(self.out)
+        self.out.mkdir(parents=True, exist_ok=True)
+
+        # hashed asset URLs must exist before any page is rendered
+        build_assets()
+        from app.main import app
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport,
+                base_url="http://export",
+                headers={"Accept-Encoding": "identity"},
+            ) as client:
+                routes = page_routes() + await api_routes()
+                await gather_limited(
+                    (self.fetch(client, route) for route in routes),
+                    limit=settings.github_concurrency,
+                )
+
+        self.copy_static()
+        if self.incremental:
+            self.remove_stale()
+        (self.out / MANIFEST_NAME).write_text(json.dumps(self.current, indent=2, sort_keys=True))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export the site as static files.")
+    parser.add_argument("--out", default="site", type=Path, help="output directory")
+    parser.add_argument(
+        "--incremental", action="store_true", help="only rewrite files whose content changed"
+    )
+    parser.add_argument(
+        "--allow-partial", action="store_true", help="exit 0 even if some routes failed"
+    )
+    args = parser.parse_args(argv)
+
+    started = time.monotonic()
+    exporter = Exporter(args.out, args.incremental)
+    asyncio.run(exporter.run())
+    print(
+        f"exported to {args.out} in {time.monotonic() - started:.1f}s: "
+        f"{exporter.written} written, {exporter.unchanged} unchanged"
+    )
+    for route, status in exporter.failed:
+        print(f"  skipped {route} ({status})", file=sys.stderr)
+    return 1 if exporter.failed and not args.allow_partial else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,60 @@
+import asyncio
 import os
 from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 
-from app.api.routes import configs, github, keybinds
+from app.api.routes import configs, github, keybinds, search, stats
+from app.api.routes import metrics as metrics_routes
 from app.config import get_settings
+from app.core import metrics
+from app.core.cache_backend import cache_backend, refresh_invalidations
+from app.core.compression import CompressionMiddleware
+from app.core.executor import cpu_pool
+from app.core.github_client import github_client
+from app.core.pages import Renderer, page_cache
+from app.core.responses import cached_response
+from app.core.static import PrecompressedStaticFiles, static_url
+from app.core.store import result_store
+from app.services.gallery_service import gallery_service, gallery_url
 from app.services.github_service import github_service
+from app.services.refresh_service import refresh_service
+from app.services.thumbnail_service import thumbnail_service
 
 settings = get_settings()
+# new, changed or removed gallery files get their thumbnails made or cleaned up
+gallery_service.subscribe(thumbnail_service.sync)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     Path("data").mkdir(exist_ok=True)
+    await cache_backend.start()
+    await refresh_invalidations.start()
+    await github_client.start()
+    cpu_pool.start()
+    await result_store.init()
+    gallery_service.refresh(force=True)
+    await thumbnail_service.start(gallery_service.items())
+    if settings.refresh_enabled:
+        await refresh_service.start()
+    prerender = None
+    if settings.page_prerender:
+        prerender = asyncio.create_task(page_cache.prerender(all_pages()))
     yield
+    if prerender is not None:
+        prerender.cancel()
+    await refresh_service.stop()
+    await refresh_invalidations.stop()
+    await thumbnail_service.stop()
+    await result_store.close()
+    cpu_pool.shutdown()
+    await github_client.close()
+    await cache_backend.close()
 
 
 app = FastAPI(
@@ -24,93 +62,158 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+)
+# added last so it wraps compression and times the whole response
+app.add_middleware(metrics.MetricsMiddleware)
+
+app.mount(
+    "/static",
+    PrecompressedStaticFiles(directory="static", max_age=settings.static_max_age),
+    name="static",
+)
 templates = Jinja2Templates(directory="app/templates")
+templates.env.globals["static_url"] = static_url
+templates.env.globals["gallery_url"] = gallery_url
 
 app.include_router(keybinds.router, prefix="/api/keybinds", tags=["keybinds"])
 app.include_router(configs.router, prefix="/api/configs", tags=["configs"])
 app.include_router(github.router, prefix="/api/github", tags=["github"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
+app.include_router(stats.router, prefix="/api/stats", tags=["stats"])
+app.include_router(metrics_routes.router, tags=["metrics"])
+
+
+def render_template(template: str, **context: Any) -> str:
+    with metrics.stage("render", template):
+        return templates.get_template(template).render(**context)
+
+
+def template_page(template: str, title: str, **context: Any) -> Renderer:
+    async def render() -> str:
+        return render_template(template, title=title, **context)
+
+    return render
+
+
+async def render_home() -> str:
+    dotfiles_repos = await github_service.get_dotfiles_repos()
+    return render_template("index.html", title="Home", dotfiles_repos=dotfiles_repos)
+
+
+PLATFORM_TITLES = {
+    "yabai": "Yabai (macOS)",
+    "hyprland": "Hyprland (Linux)",
+}
+
+# key -> (renderer, tags); tagged pages are re-rendered when that data refreshes
+PAGES: Dict[str, Tuple[Renderer, Tuple[str, ...]]] = {
+    "/": (render_home, ("github",)),
+    "/about": (template_page("partials/about.html", "About"), ()),
+    "/projects": (template_page("projects.html", "Projects"), ()),
+    "/dotfiles": (template_page("dotfiles/index.html", "Dotfiles"), ()),
+    "/dotfiles/keybinds": (template_page("dotfiles/keybinds.html", "Keybinds"), ()),
+    "/dotfiles/configs": (
+        template_page(
+            "dotfiles/configs.html",
+            "Configs",
+            config_files=settings.config_files,
+            repos=settings.repos,
+        ),
+        (),
+    ),
+}
+
+
+def platform_renderer(platform: str) -> Renderer:
+    title = PLATFORM_TITLES.get(platform, platform.capitalize())
+    return template_page("dotfiles/platform.html", title, platform=platform)
+
+
+def all_pages() -> List[Tuple[str, Renderer, Tuple[str, ...]]]:
+    pages = [(key, render, tags) for key, (render, tags) in PAGES.items()]
+    pages += [(f"/dotfiles/{p}", platform_renderer(p), ()) for p in settings.repos]
+    return pages
+
+
+async def page_response(
+    request: Request, key: str, render: Renderer, tags: Tuple[str, ...] = ()
+) -> Response:
+    page = await page_cache.get(key, render, tags)
+    return cached_response(request, page.body, page.etag, "text/html; charset=utf-8", "no-cache")
 
 
 @app.get("/")
 async def home(request: Request):
-    dotfiles_repos = await github_service.get_dotfiles_repos()
-    return templates.TemplateResponse(
-        "index.html", {"request": request, "title": "Home", "dotfiles_repos": dotfiles_repos}
-    )
+    return await page_response(request, "/", *PAGES["/"])
 
 
 @app.get("/about")
 async def about(request: Request):
-    return templates.TemplateResponse("about.html", {"request": request, "title": "About"})
+    return await page_response(request, "/about", *PAGES["/about"])
 
 
 @app.get("/projects")
 async def projects(request: Request):
-    return templates.TemplateResponse("projects.html", {"request": request, "title": "Projects"})
+    return await page_response(request, "/projects", *PAGES["/projects"])
 
 
 @app.get("/dotfiles")
 async def dotfiles(request: Request):
-    return templates.TemplateResponse(
-        "dotfiles/index.html", {"request": request, "title": "Dotfiles"}
-    )
+    return await page_response(request, "/dotfiles", *PAGES["/dotfiles"])
 
 
 @app.get("/dotfiles/keybinds")
 async def keybinds_page(request: Request):
-    return templates.TemplateResponse(
-        "dotfiles/keybinds.html", {"request": request, "title": "Keybinds"}
-    )
+    return await page_response(request, "/dotfiles/keybinds", *PAGES["/dotfiles/keybinds"])
 
 
 @app.get("/dotfiles/configs")
 async def configs_page(request: Request):
-    return templates.TemplateResponse(
-        "dotfiles/configs.html", {"request": request, "title": "Configs"}
-    )
+    return await page_response(request, "/dotfiles/configs", *PAGES["/dotfiles/configs"])
 
 
 @app.get("/dotfiles/{platform}")
 async def platform_page(request: Request, platform: str):
-    platform_titles = {
-        "yabai": "Yabai (macOS)",
-        "hyprland": "Hyprland (Linux)",
-    }
-    title = platform_titles.get(platform, platform.capitalize())
-    return templates.TemplateResponse(
-        "dotfiles/platform.html", {"request": request, "title": title, "platform": platform}
+    # only configured platforms get a cache entry, so made-up paths can't evict real pages
+    if platform not in settings.repos:
+        raise HTTPException(status_code=404, detail=f"Unknown platform {platform}")
+    return await page_response(request, f"/dotfiles/{platform}", platform_renderer(platform))
+
+
+def gallery_response(platform: Optional[str], page: int) -> HTMLResponse:
+    gallery_page = gallery_service.page(platform, page)
+    variants = {item.name: thumbnail_service.variants(item) for item in gallery_page["items"]}
+    html = render_template(
+        "gallery.html",
+        title="Gallery",
+        images=gallery_page["items"],
+        gallery=gallery_page,
+        variants=variants,
     )
+    return HTMLResponse(html)
 
 
 @app.get("/gallery")
-async def gallery(request: Request):
-    gallery_dir = Path("static/images/gallery")
-    images = []
-
-    if gallery_dir.exists():
-        for file in sorted(gallery_dir.iterdir(), key=lambda x: x.stat().st_mtime, reverse=True):
-            if file.suffix.lower() in [".png", ".jpg", ".jpeg", ".webp", ".gif", ".mp4"]:
-                # filename format: platform_title_description.ext
-                name_parts = file.stem.split("_")
-                platform = name_parts[0] if len(name_parts) > 0 else "other"
-                title = (
-                    name_parts[1].replace("-", " ").title() if len(name_parts) > 1 else file.stem
-                )
-                description = (
-                    name_parts[2].replace("-", " ").capitalize() if len(name_parts) > 2 else ""
-                )
-
-                images.append(
-                    {
-                        "url": f"/static/images/gallery/{file.name}",
-                        "title": title,
-                        "description": description,
-                        "platform": platform.lower(),
-                        "is_video": file.suffix.lower() == ".mp4",
-                    }
-                )
-
-    return templates.TemplateResponse(
-        "gallery.html", {"request": request, "title": "Gallery", "images": images}
-    )
+async def gallery(platform: Optional[str] = None, page: int = Query(1, ge=1)):
+    return gallery_response(platform, page)
+
+
+# path forms of the same listing; the pages link to these so static exports can serve them
+@app.get("/gallery/page/{page}")
+async def gallery_paged(page: int):
+    return gallery_response(None, page)
+
+
+@app.get("/gallery/{platform}")
+async def gallery_platform(platform: str):
+    return gallery_response(platform, 1)
+
+
+@app.get("/gallery/{platform}/page/{page}")
+async def gallery_platform_paged(platform: str, page: int):
+    return gallery_response(platform, page)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import sys
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.models.keybind import Keybind
+
+_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _intern_tuple(values: Iterable[str]) -> Tuple[str, ...]:
+    key = tuple(sys.intern(v) for v in values)
+    return _tuples.setdefault(key, key)
+
+
+class KeybindRecord:
+    """Compact in-memory keybind used between the parsers and the API boundary.
+
+    Platform, category, key and modifier tuples are interned, so thousands of
+    binds share one copy of each. Convert with `to_model()` only when building
+    a response.
+    """
+
+    __slots__ = (
+        "platform", "category", "modifiers", "key", "action", "command", "flags",
+    )
+
+    def __init__(
+        self,
+        platform: str,
+        category: str,
+        modifiers: Iterable[str],
+        key: str,
+        action: str,
+        command: Optional[str] = None,
+        flags: Iterable[str] = (),
+    ):
+        self.platform = sys.intern(platform)
+        self.category = sys.intern(category)
+        self.modifiers = _intern_tuple(modifiers)
+        self.key = sys.intern(key)
+        self.action = action
+        self.command = command
+        self.flags = _intern_tuple(flags)
+
+    def __reduce__(self):
+        # rebuild through __init__ so records coming back from the process pool are interned
+        return (
+            KeybindRecord,
+            (
+                self.platform,
+                self.category,
+                self.modifiers,
+                self.key,
+                self.action,
+                self.command,
+                self.flags,
+            ),
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, KeybindRecord):
+            return NotImplemented
+        return self.__reduce__()[1] == other.__reduce__()[1]
+
+    def __hash__(self) -> int:
+        return hash(self.__reduce__()[1])
+
+    def __repr__(self) -> str:
+        return f"KeybindRecord({'+'.join((*self.modifiers, self.key))!r}, {self.action!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "platform": self.platform,
+            "category": self.category,
+            "modifiers": list(self.modifiers),
+            "key": self.key,
+            "action": self.action,
+            "command": self.command,
+            "flags": list(self.flags),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> KeybindRecord:
+        return cls(
+            data["platform"],
+            data["category"],
+            data.get("modifiers", ()),
+            data["key"],
+            data["action"],
+            data.get("command"),
+            data.get("flags", ()),
+        )
+
+    def to_model(self) -> Keybind:
+        return Keybind.model_construct(**self.to_dict())
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List, Literal, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel
 
@@ -14,6 +14,7 @@ class Keybind(BaseModel):
     key: str
     action: str
     command: Optional[str] = None
+    flags: List[str] = []
 
 
 class KeyMapping(BaseModel):
@@ -29,6 +30,11 @@ class KeyMapping(BaseModel):
 class KeyboardLayout(BaseModel):
     platform: Platform
     rows: List[List[KeyMapping]]
+    # modifier combo ("cmd+shift", "" for none) -> key codes bound in that layer
+    layers: Dict[str, List[str]] = {}
+    categories: List[str] = []
+    # binds on keys the drawn keyboard doesn't have (media keys, mouse buttons, ...)
+    unmapped: List[Keybind] = []
 
 
 class ConfigFile(BaseModel):
@@ -57,3 +63,13 @@ class ChangelogEntry(BaseModel):
     date: str
     url: str
     type: Literal["release", "commit"]
+
+
+class GalleryItem(BaseModel):
+    name: str
+    url: str
+    title: str
+    description: str
+    platform: str
+    is_video: bool
+    mtime: float
@@ -1,29 +1,61 @@
 from __future__ import annotations
-from typing import List
+import io
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, List
 from abc import ABC, abstractmethod
-from app.models.keybind import Keybind
+from app.models.compact import KeybindRecord
+
+# part of the key parsed keybinds are stored under; bump whenever any parser's output changes
+PARSER_VERSION = 1
+
+class ParseState:
+    """Per-parse state, so one parser instance can serve concurrent parses."""
+    
+    def __init__(self):
+        self.category = "General"
 
 class BaseKeybindParser(ABC):
+    MODIFIER_MAP = {
+        "alt": "opt", "option": "opt", "lalt": "opt", "ralt": "opt",
+        "ctrl": "ctrl", "control": "ctrl", "lctrl": "ctrl", "rctrl": "ctrl",
+        "shift": "shift", "lshift": "shift", "rshift": "shift",
+        "cmd": "cmd", "super": "cmd", "mod4": "cmd", "command": "cmd",
+        "$mainmod": "cmd", "mainmod": "cmd",
+    }
+    KEY_MAP = {
+        "return": "enter", "escape": "esc", "space": "space",
+        "left": "left", "right": "right", "up": "up", "down": "down",
+        "backspace": "backspace", "tab": "tab", "delete": "del",
+    }
+    
     @abstractmethod
-    def parse(self, content: str) -> List[Keybind]:
-        pass
+    def feed(self, state: ParseState, line: str) -> Iterable[KeybindRecord]:
+        """Consume one line and return the keybinds it completes (usually zero or one)."""
+    
+    def new_state(self, **options: Any) -> ParseState:
+        return ParseState()
+    
+    def parse_iter(self, lines: Iterable[str], **options: Any) -> Iterator[KeybindRecord]:
+        return self.feed_lines(self.new_state(**options), lines)
+    
+    def feed_lines(self, state: ParseState, lines: Iterable[str]) -> Iterator[KeybindRecord]:
+        for line in lines:
+            yield from self.feed(state, line)
+    
+    async def aparse_iter(
+        self, lines: AsyncIterable[str], **options: Any
+    ) -> AsyncIterator[KeybindRecord]:
+        state = self.new_state(**options)
+        async for line in lines:
+            for keybind in self.feed(state, line):
+                yield keybind
+    
+    def parse(self, content: str, **options: Any) -> List[KeybindRecord]:
+        return list(self.parse_iter(io.StringIO(content), **options))
     
     def normalize_modifier(self, mod: str) -> str:
         mod = mod.lower().strip()
-        mappings = {
-            "alt": "opt", "option": "opt", "lalt": "opt", "ralt": "opt",
-            "ctrl": "ctrl", "control": "ctrl", "lctrl": "ctrl", "rctrl": "ctrl",
-            "shift": "shift", "lshift": "shift", "rshift": "shift",
-            "cmd": "cmd", "super": "cmd", "mod4": "cmd", "command": "cmd",
-            "$mainmod": "cmd", "mainmod": "cmd",
-        }
-        return mappings.get(mod, mod)
+        return self.MODIFIER_MAP.get(mod, mod)
     
     def normalize_key(self, key: str) -> str:
         key = key.lower().strip()
-        mappings = {
-            "return": "enter", "escape": "esc", "space": "space",
-            "left": "left", "right": "right", "up": "up", "down": "down",
-            "backspace": "backspace", "tab": "tab", "delete": "del",
-        }
-        return mappings.get(key, key)
+        return self.KEY_MAP.get(key, key)
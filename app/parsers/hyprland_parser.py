@@ -1,91 +1,158 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+import io
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional
 
-from app.models.keybind import Keybind
-from app.parsers.base import BaseKeybindParser
+from app.models.compact import KeybindRecord
+from app.parsers.base import BaseKeybindParser, ParseState
+
+_VARIABLE = re.compile(r"\$(\w+)\s*=\s*(.*)")
+_BIND = re.compile(r"bind([a-z]*)\s*=\s*(.*)")
+_SOURCE = re.compile(r"source\s*=\s*(.+)")
+_SOURCE_LINE = re.compile(r"^[ \t]*source\s*=\s*(.+)$", re.MULTILINE)
+_MOD_SEPARATOR = re.compile(r"[\s_]+")
+_SOURCE_PREFIXES = re.compile(r"^(?:~/|\$HOME/)?(?:\.config/hypr/)?(?:\./)?")
+
+# bind flags that change the shape of the line rather than just its behaviour
+_DESCRIBED_FLAG = "d"
+
+
+class _Variables:
+    """Hyprland variables, substituted in one pass with the longest name winning.
+
+    Hyprland itself replaces longer names first, so `$mainMod` is never read as
+    `$mod` followed by "ainMod" even when both are defined.
+    """
+
+    def __init__(self):
+        self.values: Dict[str, str] = {}
+        self._pattern: Optional[re.Pattern] = None
+
+    def define(self, name: str, value: str) -> None:
+        self.values[name] = self.expand(value)
+        self._pattern = None
+
+    def expand(self, text: str) -> str:
+        if "$" not in text or not self.values:
+            return text
+        if self._pattern is None:
+            names = sorted(self.values, key=len, reverse=True)
+            self._pattern = re.compile(r"\$(" + "|".join(map(re.escape, names)) + ")")
+        return self._pattern.sub(lambda m: self.values[m.group(1)], text)
+
+
+class _HyprlandState(ParseState):
+    def __init__(self, includes: Mapping[str, str], variables: _Variables, depth: int):
+        super().__init__()
+        self.includes = includes
+        self.variables = variables
+        self.depth = depth
 
 
 class HyprlandParser(BaseKeybindParser):
+    MAX_SOURCE_DEPTH = 4
+    ACTIONS = {
+        "killactive": "Close window",
+        "movefocus": "Focus {params}",
+        "movewindow": "Move window {params}",
+        "resizeactive": "Resize window",
+        "resizewindow": "Resize window",
+        "togglefloating": "Toggle floating",
+        "fullscreen": "Toggle fullscreen",
+        "workspace": "Go to workspace {params}",
+        "movetoworkspace": "Move to workspace {params}",
+        "togglesplit": "Toggle split",
+    }
+
     def __init__(self):
         self.platform = "hyprland"
-        self.variables: Dict[str, str] = {}
-
-    def parse(self, content: str) -> List[Keybind]:
-        keybinds = []
-        current_category = "General"
-
-        for line in content.split("\n"):
-            line = line.strip()
-            if not line or line.startswith("#"):
-                if line.startswith("#"):
-                    cat = line.lstrip("#").strip()
-                    if cat and len(cat) < 30:
-                        current_category = cat
-                continue
-
-            if line.startswith("$") and "=" in line:
-                var_name, var_value = line.split("=", 1)
-                self.variables[var_name.strip()] = var_value.strip()
-                continue
-
-            if line.startswith("bind"):
-                keybind = self.parse_bind_line(line, current_category)
+
+    def new_state(
+        self, includes: Optional[Mapping[str, str]] = None, **options: Any
+    ) -> ParseState:
+        """`includes` maps `source =` targets to their already fetched contents."""
+        return _HyprlandState(includes or {}, _Variables(), 0)
+
+    def feed(self, state: _HyprlandState, line: str) -> Iterable[KeybindRecord]:
+        line = line.strip()
+        if not line:
+            return ()
+
+        if line[0] == "#":
+            cat = line.lstrip("#").strip()
+            if cat and len(cat) < 30:
+                state.category = cat
+            return ()
+
+        if line[0] == "$":
+            match = _VARIABLE.match(line)
+            if match:
+                state.variables.define(match.group(1), match.group(2).strip())
+            return ()
+
+        if line.startswith("bind"):
+            match = _BIND.match(line)
+            if match:
+                keybind = self.parse_bind_line(
+                    state.variables.expand(match.group(2)), state.category, match.group(1)
+                )
                 if keybind:
-                    keybinds.append(keybind)
-
-        return keybinds
-
-    def parse_bind_line(self, line: str, category: str) -> Optional[Keybind]:
-        try:
-            _, rest = line.split("=", 1)
-            parts = [p.strip() for p in rest.split(",")]
-            if len(parts) < 3:
-                return None
-
-            mods_str = parts[0]
-            key = parts[1]
-            dispatcher = parts[2]
-            params = ",".join(parts[3:]) if len(parts) > 3 else ""
-
-            mods_str = self.expand_variables(mods_str)
-            modifiers = []
-            for mod in mods_str.split():
-                mod = mod.strip()
-                if mod:
-                    modifiers.append(self.normalize_modifier(mod))
-
-            key = self.normalize_key(key)
-            action = self.dispatcher_to_action(dispatcher, params)
-            command = f"{dispatcher}, {params}" if params else dispatcher
-
-            return Keybind(
-                platform=self.platform,
-                category=category,
-                modifiers=modifiers,
-                key=key,
-                action=action,
-                command=command,
-            )
-        except (ValueError, IndexError):
+                    return (keybind,)
+            return ()
+
+        if line.startswith("source") and state.depth < self.MAX_SOURCE_DEPTH:
+            match = _SOURCE.match(line)
+            included = state.includes.get(match.group(1).strip()) if match else None
+            if included:
+                nested = _HyprlandState(state.includes, state.variables, state.depth + 1)
+                return self.feed_lines(nested, io.StringIO(included))
+
+        return ()
+
+    def parse_bind_line(self, rest: str, category: str, flags: str = "") -> Optional[KeybindRecord]:
+        parts = [p.strip() for p in rest.split(",")]
+        described = _DESCRIBED_FLAG in flags
+        if len(parts) < (4 if described else 3):
             return None
 
-    def expand_variables(self, text: str) -> str:
-        for var, value in self.variables.items():
-            text = text.replace(var, value)
-        return text
+        mods_str, key = parts[0], parts[1]
+        description = parts[2] if described else None
+        dispatcher = parts[3] if described else parts[2]
+        params = ",".join(parts[4 if described else 3:])
+
+        modifiers = [
+            self.normalize_modifier(mod) for mod in _MOD_SEPARATOR.split(mods_str) if mod
+        ]
+        key = self.normalize_key(key)
+        if not key:
+            return None
+
+        return KeybindRecord(
+            platform=self.platform,
+            category=category,
+            modifiers=modifiers,
+            key=key,
+            action=description or self.dispatcher_to_action(dispatcher, params),
+            command=f"{dispatcher}, {params}" if params else dispatcher,
+            flags=flags,
+        )
+
+    @staticmethod
+    def find_sources(content: str) -> List[str]:
+        return [match.group(1).strip() for match in _SOURCE_LINE.finditer(content)]
+
+    @staticmethod
+    def source_to_repo_path(source: str) -> Optional[str]:
+        """Best-effort mapping of a `source =` target onto a path inside the dotfiles repo."""
+        if any(ch in source for ch in "*?["):
+            return None
+        return _SOURCE_PREFIXES.sub("", source, count=1) or None
 
     def dispatcher_to_action(self, dispatcher: str, params: str) -> str:
-        actions = {
-            "exec": f"Run {params.split()[0]}" if params else "Execute",
-            "killactive": "Close window",
-            "movefocus": f"Focus {params}",
-            "movewindow": f"Move window {params}",
-            "resizeactive": "Resize window",
-            "togglefloating": "Toggle floating",
-            "fullscreen": "Toggle fullscreen",
-            "workspace": f"Go to workspace {params}",
-            "movetoworkspace": f"Move to workspace {params}",
-            "togglesplit": "Toggle split",
-        }
-        return actions.get(dispatcher, f"{dispatcher} {params}".strip())
+        if dispatcher == "exec":
+            return f"Run {params.split()[0]}" if params else "Execute"
+        template = self.ACTIONS.get(dispatcher)
+        if template is None:
+            return f"{dispatcher} {params}".strip()
+        return template.format(params=params).strip()
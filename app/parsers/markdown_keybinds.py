@@ -1,37 +1,34 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Iterable, Optional
 
-from app.models.keybind import Keybind
-from app.parsers.base import BaseKeybindParser
+from app.models.compact import KeybindRecord
+from app.parsers.base import BaseKeybindParser, ParseState
 
 
 class MarkdownKeybindParser(BaseKeybindParser):
     def __init__(self, platform: str = "yabai"):
         self.platform = platform
-        self.current_category = "General"
 
-    def parse(self, content: str) -> List[Keybind]:
-        keybinds = []
-        lines = content.split("\n")
+    def feed(self, state: ParseState, line: str) -> Iterable[KeybindRecord]:
+        line = line.strip()
 
-        for line in lines:
-            line = line.strip()
+        if line.startswith("## "):
+            state.category = line[3:].strip()
+            return ()
 
-            if line.startswith("## "):
-                self.current_category = line[3:].strip()
-                continue
+        if line.startswith("|") and "---" not in line:
+            parts = [p.strip() for p in line.split("|")[1:-1]]
+            if len(parts) >= 2 and parts[0].lower() != "keybind":
+                keybind = self.parse_keybind_cell(parts[0], parts[1], state.category)
+                if keybind:
+                    return (keybind,)
 
-            if line.startswith("|") and "---" not in line:
-                parts = [p.strip() for p in line.split("|")[1:-1]]
-                if len(parts) >= 2 and parts[0].lower() != "keybind":
-                    keybind = self.parse_keybind_cell(parts[0], parts[1])
-                    if keybind:
-                        keybinds.append(keybind)
+        return ()
 
-        return keybinds
-
-    def parse_keybind_cell(self, keybind_str: str, action: str) -> Optional[Keybind]:
+    def parse_keybind_cell(
+        self, keybind_str: str, action: str, category: str = "General"
+    ) -> Optional[KeybindRecord]:
         keybind_str = keybind_str.strip()
         if not keybind_str:
             return None
@@ -55,9 +52,9 @@ class MarkdownKeybindParser(BaseKeybindParser):
         if not key:
             return None
 
-        return Keybind(
+        return KeybindRecord(
             platform=self.platform,
-            category=self.current_category,
+            category=category,
             modifiers=modifiers,
             key=key,
             action=action,
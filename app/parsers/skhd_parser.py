@@ -1,35 +1,31 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Iterable, Optional
 
-from app.models.keybind import Keybind
-from app.parsers.base import BaseKeybindParser
+from app.models.compact import KeybindRecord
+from app.parsers.base import BaseKeybindParser, ParseState
 
 
 class SkhdParser(BaseKeybindParser):
     def __init__(self):
         self.platform = "yabai"
 
-    def parse(self, content: str) -> List[Keybind]:
-        keybinds = []
-        current_category = "General"
+    def feed(self, state: ParseState, line: str) -> Iterable[KeybindRecord]:
+        line = line.strip()
+        if not line:
+            return ()
+        if line.startswith("#") and not line.startswith("#!/"):
+            category = line.lstrip("#").strip()
+            if category and not category.startswith("!"):
+                state.category = category
+            return ()
+        if " : " in line and not line.startswith("#"):
+            keybind = self.parse_skhd_line(line, state.category)
+            if keybind:
+                return (keybind,)
+        return ()
 
-        for line in content.split("\n"):
-            line = line.strip()
-            if not line:
-                continue
-            if line.startswith("#") and not line.startswith("#!/"):
-                category = line.lstrip("#").strip()
-                if category and not category.startswith("!"):
-                    current_category = category
-                continue
-            if " : " in line and not line.startswith("#"):
-                keybind = self.parse_skhd_line(line, current_category)
-                if keybind:
-                    keybinds.append(keybind)
-        return keybinds
-
-    def parse_skhd_line(self, line: str, category: str) -> Optional[Keybind]:
+    def parse_skhd_line(self, line: str, category: str) -> Optional[KeybindRecord]:
         try:
             hotkey_part, command = line.split(" : ", 1)
             hotkey_part = hotkey_part.strip()
@@ -45,7 +41,7 @@ class SkhdParser(BaseKeybindParser):
                     modifiers.append(self.normalize_modifier(mod))
             key = self.normalize_key(key.strip())
             action = self.command_to_action(command)
-            return Keybind(
+            return KeybindRecord(
                 platform=self.platform,
                 category=category,
                 modifiers=modifiers,
@@ -1,13 +1,51 @@
 from __future__ import annotations
 
-from typing import Optional
+import hashlib
+from typing import Dict, Optional, Tuple
 
+from pygments import __version__ as pygments_version
 from pygments import highlight
 from pygments.formatters import HtmlFormatter
+from pygments.lexer import Lexer
 from pygments.lexers import get_lexer_by_name, guess_lexer
+from pygments.util import ClassNotFound
 
+from app.config import get_settings
+from app.core import metrics
+from app.core.cache import LRUCache
+from app.core.cache_backend import cache_backend
+from app.core.executor import cpu_pool
 from app.core.github_client import github_client
+from app.core.responses import JSONPayload
+from app.core.store import result_store
 from app.models.keybind import ConfigFile
+from app.services.search_service import search_service
+from app.services.snapshot_service import snapshot_service
+
+settings = get_settings()
+
+# bump whenever the highlighted output changes (formatter options, language mapping);
+# Pygments upgrades change it too, so stored results are keyed by both
+HIGHLIGHT_VERSION = 1
+HIGHLIGHT_TAG = f"v{HIGHLIGHT_VERSION}-{pygments_version}"
+
+# module level so worker processes of the cpu pool build them once on import as well
+_FORMATTER = HtmlFormatter(style="monokai", linenos=True, cssclass="highlight")
+_LEXERS: Dict[str, Lexer] = {}
+
+
+def get_lexer(language: str, code: str) -> Lexer:
+    lexer = _LEXERS.get(language)
+    if lexer is None:
+        try:
+            lexer = _LEXERS[language] = get_lexer_by_name(language)
+        except ClassNotFound:
+            return guess_lexer(code)
+    return lexer
+
+
+def render_highlight(code: str, language: str) -> str:
+    return highlight(code, get_lexer(language, code), _FORMATTER)
 
 
 class ConfigService:
@@ -23,10 +61,63 @@ class ConfigService:
         ".lua": "lua",
     }
 
+    def __init__(self):
+        for language in {*self.LANGUAGE_MAP.values(), "bash", "ini", "text"}:
+            get_lexer(language, "")
+        self._highlighted: LRUCache[str] = LRUCache(settings.highlight_cache_size)
+        self.highlight_hits = 0
+        self.highlight_misses = 0
+        # config files served from the result store because their blob was unchanged
+        self.reused = 0
+        # blob last written to the shared backend per configured file
+        self._shared: Dict[Tuple[str, str], Optional[str]] = {}
+        self.highlight_css = HtmlFormatter(style="monokai").get_style_defs(".highlight")
+        self.highlight_css_payload = JSONPayload({"css": self.highlight_css})
+
+    @staticmethod
+    def _platform(repo: str, path: str) -> Optional[str]:
+        """The platform ``path`` is a configured file of; only those are searched and shared."""
+        for platform, platform_repo in settings.repos.items():
+            if repo == platform_repo and path in settings.config_files.get(platform, []):
+                return platform
+        return None
+
     async def get_config_file(self, repo: str, path: str) -> Optional[ConfigFile]:
-        content = await github_client.get_raw_file(repo, path)
-        if not content:
+        blob, config = await self._load_config_file(repo, path)
+        platform = self._platform(repo, path)
+        if config is not None and platform is not None:
+            search_service.index_config(platform, config)
+            if cache_backend.shared and self._shared.get((repo, path)) != blob:
+                await cache_backend.set(
+                    f"configs-{HIGHLIGHT_TAG}", f"{repo}:{path}", config.model_dump(mode="json")
+                )
+                self._shared[(repo, path)] = blob
+        return config
+
+    async def load_shared(self, repo: str, path: str) -> Optional[ConfigFile]:
+        """A configured file as another worker shared it, without going to GitHub."""
+        platform = self._platform(repo, path)
+        if platform is None:
+            return None
+        stored = await cache_backend.get(f"configs-{HIGHLIGHT_TAG}", f"{repo}:{path}")
+        if stored is None:
             return None
+        config = ConfigFile.model_validate(stored)
+        search_service.index_config(platform, config)
+        return config
+
+    async def _load_config_file(
+        self, repo: str, path: str
+    ) -> Tuple[Optional[str], Optional[ConfigFile]]:
+        sha = await github_client.get_head_sha(repo)
+        # keyed by the file's own blob SHA, so commits touching other files re-highlight nothing
+        blob, content = await snapshot_service.read_blob(repo, path, sha)
+        if not content:
+            return None, None
+        stored = await result_store.get(f"config-{HIGHLIGHT_TAG}", repo, path, blob)
+        if stored is not None:
+            self.reused += 1
+            return blob, ConfigFile.model_validate(stored)
 
         ext = "." + path.split(".")[-1] if "." in path else ""
         language = self.LANGUAGE_MAP.get(ext, "text")
@@ -36,31 +127,63 @@ class ConfigService:
         elif "hyprland" in path:
             language = "ini"
 
-        highlighted = self.highlight_code(content, language)
+        highlighted = await self.highlight_async(content, language)
 
-        return ConfigFile(
+        config = ConfigFile(
             repo=repo,
             path=path,
             content=content,
             highlighted_html=highlighted,
             language=language,
         )
+        await result_store.put(f"config-{HIGHLIGHT_TAG}", repo, path, blob, config.model_dump())
+        return blob, config
 
     def highlight_code(self, code: str, language: str) -> str:
-        try:
-            lexer = get_lexer_by_name(language)
-        except Exception:
-            lexer = guess_lexer(code)
-
-        formatter = HtmlFormatter(
-            style="monokai",
-            linenos=True,
-            cssclass="highlight",
-        )
-        return highlight(code, lexer, formatter)
+        key = (hashlib.sha256(code.encode()).hexdigest(), language)
+        html = self._lookup_highlighted(key)
+        if html is None:
+            with metrics.stage("highlight", language):
+                html = render_highlight(code, language)
+            self._highlighted.set(key, html)
+        return html
+
+    async def highlight_async(self, code: str, language: str) -> str:
+        key = (hashlib.sha256(code.encode()).hexdigest(), language)
+        html = self._lookup_highlighted(key)
+        if html is not None:
+            return html
+        # content-addressed, so entries from other workers never need invalidating
+        shared_key = f"{language}:{key[0]}"
+        if cache_backend.shared:
+            html = await cache_backend.get(f"highlight-{HIGHLIGHT_TAG}", shared_key)
+        if html is None:
+            with metrics.stage("highlight", language):
+                html = await cpu_pool.run(render_highlight, code, language)
+            if cache_backend.shared:
+                await cache_backend.set(f"highlight-{HIGHLIGHT_TAG}", shared_key, html)
+        self._highlighted.set(key, html)
+        return html
+
+    def _lookup_highlighted(self, key: Tuple[str, str]) -> Optional[str]:
+        html = self._highlighted.get(key)
+        if html is None:
+            self.highlight_misses += 1
+        else:
+            self.highlight_hits += 1
+        return html
 
     def get_highlight_css(self) -> str:
-        return HtmlFormatter(style="monokai").get_style_defs(".highlight")
+        return self.highlight_css
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._highlighted),
+            "hits": self.highlight_hits,
+            "misses": self.highlight_misses,
+            "evictions": self._highlighted.evictions,
+            "reused": self.reused,
+        }
 
 
 config_service = ConfigService()
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import math
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.config import get_settings
+from app.models.keybind import GalleryItem
+
+settings = get_settings()
+
+MEDIA_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".mp4"}
+VIDEO_SUFFIXES = {".mp4"}
+
+
+def parse_item(entry: os.DirEntry) -> Optional[GalleryItem]:
+    path = Path(entry.name)
+    suffix = path.suffix.lower()
+    if suffix not in MEDIA_SUFFIXES or not entry.is_file():
+        return None
+    # filename format: platform_title_description.ext
+    name_parts = path.stem.split("_")
+    return GalleryItem(
+        name=entry.name,
+        url=f"/static/images/gallery/{entry.name}",
+        title=name_parts[1].replace("-", " ").title() if len(name_parts) > 1 else path.stem,
+        description=name_parts[2].replace("-", " ").capitalize() if len(name_parts) > 2 else "",
+        platform=name_parts[0].lower(),
+        is_video=suffix in VIDEO_SUFFIXES,
+        mtime=entry.stat().st_mtime,
+    )
+
+
+def gallery_url(platform: Optional[str] = None, page: int = 1) -> str:
+    """Path-only listing URLs, so a static export can serve every filter and page."""
+    url = "/gallery"
+    if platform:
+        url += f"/{platform.lower()}"
+    if page > 1:
+        url += f"/page/{page}"
+    return url
+
+
+class GalleryService:
+    """In-memory index of the gallery directory.
+
+    The index is rebuilt only when a media file is added, removed, renamed or
+    overwritten, judged by one ``scandir`` pass over the names and mtimes. That
+    pass runs at most once per ``check_interval`` seconds, so serving a page
+    never touches the files.
+    """
+
+    def __init__(self, directory: Path, check_interval: float):
+        self.directory = directory
+        self.check_interval = check_interval
+        self._items: List[GalleryItem] = []
+        self._by_platform: Dict[str, List[GalleryItem]] = {}
+        # name -> st_mtime_ns of the files indexed; None while the directory is missing
+        self._signature: Optional[Dict[str, int]] = None
+        self._checked_at = 0.0
+        self._listeners: List[Callable[[List[GalleryItem]], None]] = []
+        self.rebuilds = 0
+
+    def subscribe(self, listener: Callable[[List[GalleryItem]], None]) -> None:
+        """Call ``listener`` with the new items whenever the index is rebuilt."""
+        self._listeners.append(listener)
+
+    def refresh(self, force: bool = False) -> bool:
+        self._checked_at = time.monotonic()
+        try:
+            with os.scandir(self.directory) as it:
+                entries = [
+                    entry
+                    for entry in it
+                    if Path(entry.name).suffix.lower() in MEDIA_SUFFIXES and entry.is_file()
+                ]
+        except OSError:
+            entries = None
+        # the directory's own mtime misses files overwritten in place, so compare each file's
+        signature = None if entries is None else {e.name: e.stat().st_mtime_ns for e in entries}
+        if not force and signature == self._signature:
+            return False
+
+        items = [item for item in map(parse_item, entries or ()) if item]
+        items.sort(key=lambda item: item.mtime, reverse=True)
+
+        by_platform: Dict[str, List[GalleryItem]] = {}
+        for item in items:
+            by_platform.setdefault(item.platform, []).append(item)
+        self._items, self._by_platform, self._signature = items, by_platform, signature
+        self.rebuilds += 1
+        for listener in self._listeners:
+            listener(items)
+        return True
+
+    def _ensure_fresh(self) -> None:
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.refresh()
+
+    def items(self, platform: Optional[str] = None) -> List[GalleryItem]:
+        self._ensure_fresh()
+        if platform:
+            return self._by_platform.get(platform.lower(), [])
+        return self._items
+
+    def page(
+        self, platform: Optional[str] = None, page: int = 1, per_page: Optional[int] = None
+    ) -> Dict[str, Any]:
+        per_page = per_page or settings.gallery_page_size
+        items = self.items(platform)
+        pages = max(1, math.ceil(len(items) / per_page))
+        page = min(max(page, 1), pages)
+        start = (page - 1) * per_page
+        return {
+            "items": items[start : start + per_page],
+            "total": len(items),
+            "page": page,
+            "pages": pages,
+            "per_page": per_page,
+            "platform": platform.lower() if platform else None,
+            "platforms": {name: len(group) for name, group in self._by_platform.items()},
+        }
+
+    def urls(self, platforms: Iterable[str]) -> List[str]:
+        """Every listing page: all items and each platform, one URL per page."""
+        urls: List[str] = []
+        for platform in (None, *platforms):
+            pages = self.page(platform)["pages"]
+            urls += [gallery_url(platform, page) for page in range(1, pages + 1)]
+        return urls
+
+    def stats(self) -> Dict[str, Any]:
+        return {"items": len(self._items), "rebuilds": self.rebuilds}
+
+
+gallery_service = GalleryService(Path(settings.gallery_dir), settings.gallery_check_interval)
@@ -1,21 +1,117 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from pydantic import BaseModel
 
 from app.config import get_settings
+from app.core.cache import LRUCache
+from app.core.cache_backend import cache_backend, refresh_invalidations
+from app.core.concurrency import SingleFlight, gather_limited
 from app.core.github_client import github_client
+from app.core.pages import page_cache
+from app.core.responses import JSONPayload
+from app.core.store import result_store
 from app.models.keybind import ChangelogEntry, RepoInfo
+from app.services.search_service import search_service
 
 settings = get_settings()
 
+# how each kind of value comes back out of a shared cache backend
+_DECODERS: Dict[str, Callable[[Any], Any]] = {
+    "repo_stats": RepoInfo.model_validate,
+    "readme": str,
+    "changelog": lambda entries: [ChangelogEntry.model_validate(e) for e in entries],
+}
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    return value.model_dump(mode="json") if isinstance(value, BaseModel) else value
+
 
 class GitHubService:
+    def __init__(self):
+        self._persisted: Dict[str, RepoInfo] = {}
+        self._flights = SingleFlight()
+        # (last good value, loaded at) per (kind, repo); only replaced by a successful load,
+        # and reloaded in the background once older than the TTL. Bounded because repo
+        # names come straight from request paths.
+        self._cache: LRUCache[Tuple[Any, float]] = LRUCache(settings.github_cache_max_entries)
+        self._payloads: LRUCache[Tuple[Any, JSONPayload]] = LRUCache(
+            settings.github_cache_max_entries
+        )
+        # another worker refreshed; its values are in the backend
+        refresh_invalidations.subscribe(self._cache.clear)
+
+    async def _cached(self, key: Tuple[str, str], load: Callable[[], Awaitable[Any]]) -> Any:
+        cached = self._cache.get(key)
+        if cached is not None:
+            value, loaded_at = cached
+            now = time.monotonic()
+            if now - loaded_at >= settings.github_cache_ttl:
+                # serve the old value while reloading; a failed reload waits another TTL
+                self._cache.set(key, (value, now))
+                self._flights.start(("reload", *key), lambda: self._reload(key, load))
+            return value
+        if cache_backend.shared:
+            value = await self._load_shared(key)
+            if value:
+                return value
+        return await self._reload(key, load)
+
+    async def _load_shared(self, key: Tuple[str, str]) -> Optional[Any]:
+        stored = await cache_backend.get("github", ":".join(key))
+        if not stored:
+            return None
+        value = _DECODERS[key[0]](stored)
+        self._cache.set(key, (value, time.monotonic()))
+        return value
+
+    async def _reload(self, key: Tuple[str, str], load: Callable[[], Awaitable[Any]]) -> Any:
+        value = await self._flights.do(key, load)
+        if value:
+            previous = self._cache.get(key)
+            self._cache.set(key, (value, time.monotonic()))
+            if previous is None or previous[0] != value:
+                # pages rendered from the old value (e.g. an empty repo list) follow along
+                page_cache.invalidate("github")
+            if cache_backend.shared:
+                await cache_backend.set("github", ":".join(key), _to_json(value))
+        cached = self._cache.get(key)
+        return value if cached is None else cached[0]
+
+    def encode(self, key: Hashable, value: Any) -> JSONPayload:
+        """Encode ``value`` once and reuse the bytes and ETag until it changes."""
+        cached = self._payloads.get(key)
+        if cached is not None and (cached[0] is value or cached[0] == value):
+            return cached[1]
+        payload = JSONPayload(value)
+        self._payloads.set(key, (value, payload))
+        return payload
+
+    async def refresh(self, platform: str, repo: str) -> None:
+        await gather_limited(
+            [
+                self._reload(("repo_stats", repo), lambda: self._load_repo_stats(repo)),
+                self._reload(("readme", repo), lambda: self._load_readme(repo)),
+                self._reload(("changelog", repo), lambda: self._load_changelog(repo)),
+            ]
+        )
+
     async def get_repo_stats(self, repo: str) -> Optional[RepoInfo]:
+        return await self._cached(("repo_stats", repo), lambda: self._load_repo_stats(repo))
+
+    async def _load_repo_stats(self, repo: str) -> Optional[RepoInfo]:
         info = await github_client.get_repo_info(repo)
         if not info:
-            return None
+            # stars/forks move independently of commits, so fall back to the last snapshot
+            stored = await result_store.get_latest("repo_info", repo)
+            return RepoInfo.model_validate(stored) if stored else None
 
-        return RepoInfo(
+        stats = RepoInfo(
             name=info.get("name", ""),
             full_name=info.get("full_name", ""),
             description=info.get("description"),
@@ -25,6 +121,10 @@ class GitHubService:
             url=info.get("html_url", ""),
             topics=info.get("topics", []),
         )
+        if self._persisted.get(repo) != stats:
+            await result_store.put("repo_info", repo, "", "latest", stats.model_dump())
+            self._persisted[repo] = stats
+        return stats
 
     async def get_all_repos(self) -> List[RepoInfo]:
         repos = await github_client.get_user_repos(settings.github_username)
@@ -47,20 +147,59 @@ class GitHubService:
         ]
 
     async def get_dotfiles_repos(self) -> Dict[str, RepoInfo]:
-        result = {}
-        for platform, repo in settings.repos.items():
-            info = await self.get_repo_stats(repo)
-            if info:
-                result[platform] = info
-        return result
+        platforms = list(settings.repos)
+        infos = await gather_limited(
+            self.get_repo_stats(settings.repos[platform]) for platform in platforms
+        )
+        return {platform: info for platform, info in zip(platforms, infos) if info}
 
     async def get_readme(self, platform: str) -> Optional[str]:
         repo = settings.repos.get(platform)
         if not repo:
             return None
-        return await github_client.get_readme(repo)
+        readme = await self._cached(("readme", repo), lambda: self._load_readme(repo))
+        if readme:
+            search_service.index_readme(platform, repo, readme)
+        return readme
+
+    async def load_shared_readme(self, platform: str) -> Optional[str]:
+        """The README another worker shared, without going to GitHub."""
+        repo = settings.repos.get(platform)
+        readme = await self._load_shared(("readme", repo)) if repo else None
+        if readme:
+            search_service.index_readme(platform, repo, readme)
+        return readme
+
+    async def _load_readme(self, repo: str) -> Optional[str]:
+        sha = await github_client.get_head_sha(repo)
+        if sha:
+            stored = await result_store.get("readme", repo, "README.md", sha)
+            if stored is not None:
+                return stored
+
+        readme = await github_client.get_readme(repo)
+        if sha and readme:
+            await result_store.put("readme", repo, "README.md", sha, readme)
+        return readme
 
     async def get_changelog(self, repo: str) -> List[ChangelogEntry]:
+        return await self._cached(("changelog", repo), lambda: self._load_changelog(repo))
+
+    async def _load_changelog(self, repo: str) -> List[ChangelogEntry]:
+        sha = await github_client.get_head_sha(repo)
+        if sha:
+            stored = await result_store.get("changelog", repo, "", sha)
+            if stored is not None:
+                return [ChangelogEntry.model_validate(entry) for entry in stored]
+
+        changelog = await self._fetch_changelog(repo)
+        if sha and changelog:
+            await result_store.put(
+                "changelog", repo, "", sha, [entry.model_dump() for entry in changelog]
+            )
+        return changelog
+
+    async def _fetch_changelog(self, repo: str) -> List[ChangelogEntry]:
         # Try releases first
         releases = await github_client.get_releases(repo)
         if releases:
@@ -93,5 +232,12 @@ class GitHubService:
 
         return []
 
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "single_flight": self._flights.stats(),
+            "cached": len(self._cache),
+            "payloads": len(self._payloads),
+        }
+
 
 github_service = GitHubService()
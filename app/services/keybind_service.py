@@ -1,74 +1,294 @@
 from __future__ import annotations
-from typing import Optional, List, Dict
+import hashlib
+import json
+import time
+from typing import Any, Optional, List, Dict, Tuple
+from app.core import metrics
+from app.core.cache_backend import cache_backend, refresh_invalidations
+from app.core.concurrency import SingleFlight, gather_limited
+from app.core.executor import cpu_pool
 from app.core.github_client import github_client
+from app.core.keybind_index import KeybindIndex
+from app.core.keyboard_layout import build_layout
+from app.core.responses import JSONPayload
+from app.core.store import result_store
+from app.services.search_service import search_service
+from app.services.snapshot_service import snapshot_service
 from app.config import get_settings
-from app.models.keybind import Keybind, Platform
+from app.models.compact import KeybindRecord
+from app.models.keybind import Platform
+from app.parsers.base import PARSER_VERSION, BaseKeybindParser
 from app.parsers.markdown_keybinds import MarkdownKeybindParser
 from app.parsers.skhd_parser import SkhdParser
 from app.parsers.hyprland_parser import HyprlandParser
 
 settings = get_settings()
 
+# stored and shared results from an older parser are never read back
+KEYBINDS_KIND = f"keybinds-v{PARSER_VERSION}"
+SOURCES_KIND = f"keybind-sources-v{PARSER_VERSION}"
+
+
+class SourceFiles:
+    """Reads files of one repo at one commit and records the blob SHA of each."""
+
+    def __init__(self, repo: str, sha: Optional[str]):
+        self.repo = repo
+        self.sha = sha
+        # None marks a file that was looked for but doesn't exist
+        self.blobs: Dict[str, Optional[str]] = {}
+
+    async def read(self, path: str) -> Optional[str]:
+        blob, text = await snapshot_service.read_blob(self.repo, path, self.sha)
+        self.blobs[path.strip("/")] = blob
+        return text
+
+    def digest(self) -> str:
+        body = json.dumps(self.blobs, sort_keys=True).encode()
+        return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
 class KeybindService:
     def __init__(self):
         self.md_parser_yabai = MarkdownKeybindParser(platform="yabai")
         self.md_parser_hyprland = MarkdownKeybindParser(platform="hyprland")
         self.skhd_parser = SkhdParser()
         self.hyprland_parser = HyprlandParser()
-        self._cache: Dict[str, List[Keybind]] = {}
+        # the index holds the keybind list too, so a refresh swaps both in one assignment
+        self._cache: Dict[str, KeybindIndex] = {}
+        self._layouts: Dict[str, Tuple[KeybindIndex, JSONPayload]] = {}
+        # digest of the source blobs each cached index was parsed from
+        self._digests: Dict[str, Optional[str]] = {}
+        # when each index was last confirmed current; older than the TTL means check again
+        self._checked: Dict[str, float] = {}
+        self._flights = SingleFlight()
+        refresh_invalidations.subscribe(self._sync_shared)
+        self.parsed = 0
+        self.reused = 0
     
-    async def get_keybinds(self, platform: Platform) -> List[Keybind]:
+    async def get_keybinds(self, platform: Platform) -> List[KeybindRecord]:
+        return (await self.get_index(platform)).keybinds
+    
+    async def get_keybinds_payload(self, platform: Platform) -> Optional[JSONPayload]:
+        index = await self.get_index(platform)
+        return index.payload if index.keybinds else None
+    
+    async def get_layout_payload(self, platform: Platform) -> Optional[JSONPayload]:
+        index = await self.get_index(platform)
+        if not index.keybinds:
+            return None
+        # rebuilt only when a refresh swaps in a new index
+        cached = self._layouts.get(platform)
+        if cached is None or cached[0] is not index:
+            layout = build_layout(platform, index.keybinds)
+            # defaults (empty bind lists, 1u widths, no command) are left for the client to fill
+            cached = (index, JSONPayload(layout.model_dump(mode="json", exclude_defaults=True)))
+            self._layouts[platform] = cached
+        return cached[1]
+    
+    async def get_index(self, platform: Platform) -> KeybindIndex:
         if platform in self._cache:
+            # the background refresh normally re-checks long before this; without it, the
+            # index would never change until a restart. Visitors get the current index
+            # while the check runs, and a failed one isn't retried for another TTL.
+            now = time.monotonic()
+            if now - self._checked.get(platform, 0.0) >= settings.github_cache_ttl:
+                self._checked[platform] = now
+                self._flights.start(("check", platform), lambda: self._refresh_index(platform))
             return self._cache[platform]
-        
+        if cache_backend.shared:
+            # another worker may already have loaded it
+            index = await self.load_shared(platform)
+            if index is not None:
+                return index
+        return await self._refresh_index(platform)
+    
+    async def load_shared(self, platform: Platform) -> Optional[KeybindIndex]:
+        """The keybinds another worker shared, without going to GitHub."""
+        entry = await cache_backend.get(KEYBINDS_KIND, platform)
+        if entry is None:
+            return None
+        if platform in self._cache and entry["digest"] == self._digests.get(platform):
+            # still what the refreshing worker has
+            self._checked[platform] = time.monotonic()
+            return self._cache[platform]
+        return self._install(platform, entry["digest"], entry["keybinds"])
+    
+    async def _sync_shared(self) -> None:
+        """Pick up keybinds another worker refreshed."""
+        for platform in list(self._cache):
+            await self.load_shared(platform)
+    
+    def _install(
+        self, platform: Platform, digest: Optional[str], stored: List[Dict[str, Any]]
+    ) -> KeybindIndex:
+        index = KeybindIndex([KeybindRecord.from_dict(kb) for kb in stored])
+        self._cache[platform] = index
+        self._digests[platform] = digest
+        self._checked[platform] = time.monotonic()
+        search_service.index_keybinds(platform, index.keybinds)
+        return index
+    
+    async def refresh(self, platform: Platform) -> List[KeybindRecord]:
+        return (await self._refresh_index(platform)).keybinds
+    
+    async def _refresh_index(self, platform: Platform) -> KeybindIndex:
+        digest, keybinds = await self._flights.do(
+            platform, lambda: self._load_keybinds(platform)
+        )
+        # keep serving the previous keybinds when GitHub fails or is rate-limited, and keep
+        # the previous index (and its encoded payloads) when no source file changed
+        if keybinds and (platform not in self._cache or self._digests.get(platform) != digest):
+            self._cache[platform] = KeybindIndex(keybinds)
+            self._digests[platform] = digest
+            search_service.index_keybinds(platform, keybinds)
+            if cache_backend.shared:
+                await cache_backend.set(
+                    KEYBINDS_KIND,
+                    platform,
+                    {"digest": digest, "keybinds": [kb.to_dict() for kb in keybinds]},
+                )
+        if keybinds:
+            self._checked[platform] = time.monotonic()
+        return self._cache.get(platform) or KeybindIndex(keybinds)
+    
+    async def _load_keybinds(
+        self, platform: Platform
+    ) -> Tuple[Optional[str], List[KeybindRecord]]:
         keybinds = []
         repo = settings.repos.get(platform)
         if not repo:
-            return []
+            return None, []
+        
+        sha = await github_client.get_head_sha(repo)
+        if sha:
+            digest = await self._unchanged_digest(repo, sha)
+            if digest is not None and self._digests.get(platform) == digest:
+                current = self._cache.get(platform)
+                if current is not None:
+                    self.reused += 1
+                    return digest, current.keybinds
+            if digest is not None:
+                stored = await result_store.get(KEYBINDS_KIND, repo, "", digest)
+                if stored is not None:
+                    self.reused += 1
+                    return digest, [KeybindRecord.from_dict(kb) for kb in stored]
         
+        sources = SourceFiles(repo, sha)
         if platform == "yabai":
-            keybinds = await self._fetch_yabai_keybinds(repo)
+            keybinds = await self._fetch_yabai_keybinds(sources)
         elif platform == "hyprland":
-            keybinds = await self._fetch_hyprland_keybinds(repo)
+            keybinds = await self._fetch_hyprland_keybinds(sources)
+        self.parsed += 1
         
-        self._cache[platform] = keybinds
-        return keybinds
+        digest = sources.digest()
+        if keybinds:
+            await result_store.put(
+                KEYBINDS_KIND, repo, "", digest, [kb.to_dict() for kb in keybinds]
+            )
+            if sha:
+                await result_store.put(
+                    SOURCES_KIND, repo, "", sha, {"files": sources.blobs, "digest": digest}
+                )
+        return digest, keybinds
     
-    async def _fetch_yabai_keybinds(self, repo: str) -> List[Keybind]:
+    async def _unchanged_digest(self, repo: str, sha: str) -> Optional[str]:
+        """Digest of the stored keybinds for ``sha`` if none of their source files changed."""
+        sources = await result_store.get(SOURCES_KIND, repo, "", sha)
+        if sources is None:
+            # a new commit: reuse the last parse if it only touched other files
+            sources = await result_store.get_latest(SOURCES_KIND, repo)
+            if sources is None or not await snapshot_service.unchanged(
+                repo, sha, sources["files"]
+            ):
+                return None
+            await result_store.put(SOURCES_KIND, repo, "", sha, sources)
+        return sources["digest"]
+    
+    async def _parse(
+        self, parser: BaseKeybindParser, content: str, **options: Any
+    ) -> List[KeybindRecord]:
+        # timed from here, so a process pool's dispatch and pickling are included
+        with metrics.stage("parse", type(parser).__name__):
+            return await cpu_pool.run(parser.parse, content, **options)
+    
+    async def _fetch_yabai_keybinds(self, sources: SourceFiles) -> List[KeybindRecord]:
         keybinds = []
         
-        md_content = await github_client.get_raw_file(repo, "Keybinds.md")
+        md_content, skhd_content = await gather_limited(
+            [sources.read("Keybinds.md"), sources.read("skhdrc")]
+        )
         if md_content:
-            keybinds.extend(self.md_parser_yabai.parse(md_content))
+            keybinds.extend(await self._parse(self.md_parser_yabai, md_content))
         
-        skhd_content = await github_client.get_raw_file(repo, "skhdrc")
         if skhd_content and not keybinds:
-            keybinds.extend(self.skhd_parser.parse(skhd_content))
+            keybinds.extend(await self._parse(self.skhd_parser, skhd_content))
         
         return keybinds
     
-    async def _fetch_hyprland_keybinds(self, repo: str) -> List[Keybind]:
+    async def _fetch_hyprland_keybinds(self, sources: SourceFiles) -> List[KeybindRecord]:
         keybinds = []
         
-        md_content = await github_client.get_raw_file(repo, "KEYBINDS.md")
+        md_content, conf_content = await gather_limited(
+            [sources.read("KEYBINDS.md"), sources.read("hyprland.conf")]
+        )
         if md_content:
-            keybinds.extend(self.md_parser_hyprland.parse(md_content))
+            keybinds.extend(await self._parse(self.md_parser_hyprland, md_content))
         
-        conf_content = await github_client.get_raw_file(repo, "hyprland.conf")
         if conf_content and not keybinds:
-            keybinds.extend(self.hyprland_parser.parse(conf_content))
+            includes = await self._fetch_hyprland_sources(sources, conf_content)
+            keybinds.extend(
+                await self._parse(self.hyprland_parser, conf_content, includes=includes)
+            )
         
         return keybinds
     
-    async def get_keybinds_by_category(self, platform: Platform, category: str) -> List[Keybind]:
-        keybinds = await self.get_keybinds(platform)
-        return [kb for kb in keybinds if kb.category.lower() == category.lower()]
+    async def _fetch_hyprland_sources(self, sources: SourceFiles, content: str) -> Dict[str, str]:
+        includes: Dict[str, str] = {}
+        pending = [content]
+        for _ in range(HyprlandParser.MAX_SOURCE_DEPTH):
+            targets = {
+                source: path
+                for text in pending
+                for source in HyprlandParser.find_sources(text)
+                if source not in includes
+                and (path := HyprlandParser.source_to_repo_path(source))
+            }
+            if not targets:
+                break
+            contents = await gather_limited(sources.read(path) for path in targets.values())
+            pending = []
+            for source, text in zip(targets, contents):
+                includes[source] = text or ""
+                if text:
+                    pending.append(text)
+        return includes
+    
+    async def get_keybinds_by_category(
+        self, platform: Platform, category: str
+    ) -> List[KeybindRecord]:
+        return (await self.get_index(platform)).category(category)
     
     async def get_categories(self, platform: Platform) -> List[str]:
-        keybinds = await self.get_keybinds(platform)
-        return list(set(kb.category for kb in keybinds))
+        return (await self.get_index(platform)).categories
+    
+    async def get_keybinds_by_key(self, platform: Platform, key: str) -> List[KeybindRecord]:
+        return (await self.get_index(platform)).key(key)
+    
+    async def get_keybinds_by_modifiers(
+        self, platform: Platform, combo: str
+    ) -> List[KeybindRecord]:
+        return (await self.get_index(platform)).modifiers(combo)
+    
+    async def lookup(self, platform: Platform, combo: str) -> List[KeybindRecord]:
+        return (await self.get_index(platform)).lookup(combo)
     
-    def clear_cache(self):
-        self._cache.clear()
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cached_platforms": sorted(self._cache),
+            "parsed": self.parsed,
+            "reused": self.reused,
+            "single_flight": self._flights.stats(),
+        }
 
 keybind_service = KeybindService()
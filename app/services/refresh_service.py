@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import nullcontext
+from typing import Any, Awaitable, Dict, List, Optional
+
+from app.config import get_settings
+from app.core.cache_backend import cache_backend, refresh_invalidations
+from app.core.concurrency import gather_limited
+from app.core.github_client import github_client
+from app.core.pages import page_cache
+from app.services.config_service import config_service
+from app.services.github_service import github_service
+from app.services.keybind_service import keybind_service
+from app.services.snapshot_service import snapshot_service
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class RefreshService:
+    """Periodically re-fetches everything derived from `settings.repos` in the background.
+
+    Services swap new data in only when a load succeeds, so visitors are always
+    served the previous version instead of waiting on GitHub. The services
+    index what they load for search, so the index follows along.
+
+    With a shared cache backend only the worker holding the "refresh" lease goes
+    to GitHub on schedule; the others follow its runs, re-indexing and
+    re-rendering from the data it shared.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        # a triggered run while the background loop is off
+        self._once: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._forced = False
+        self._follow = False
+        self.runs = 0
+        self.followed = 0
+        self.failures = 0
+        self.last_run: Optional[float] = None
+        self.last_duration: Optional[float] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._once):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._once = None
+
+    def follow(self) -> None:
+        """Another worker refreshed; pick up what it shared without going to GitHub."""
+        if self._wake is not None:
+            self._follow = True
+            self._wake.set()
+
+    def trigger(self) -> None:
+        """Run a refresh now instead of waiting for the next interval."""
+        if self._wake is not None:
+            self._forced = True
+            self._wake.set()
+        elif self._once is None or self._once.done():
+            # background refresh is off; run once, still without making the caller wait
+            self._once = asyncio.create_task(self._guard(self.refresh_all()))
+
+    async def _run(self) -> None:
+        while True:
+            # an explicit trigger runs wherever it was received
+            forced, self._forced = self._forced, False
+            follow, self._follow = self._follow, False
+            if forced or (
+                not follow
+                and await cache_backend.acquire("refresh", settings.refresh_interval * 1.5)
+            ):
+                await self.refresh_all()
+            else:
+                await self.refresh_all(reload=False)
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def refresh_all(self, reload: bool = True) -> None:
+        """Reload everything and share it, or with ``reload=False`` re-index what's shared."""
+        started = time.monotonic()
+        jobs: List[Awaitable[Any]] = []
+        for platform, repo in settings.repos.items():
+            jobs.append(self._guard(self._refresh_keybinds(platform, reload)))
+            jobs.append(self._guard(self._refresh_repo(platform, repo, reload)))
+            for path in settings.config_files.get(platform, []):
+                jobs.append(self._guard(self._refresh_config(repo, path, reload)))
+
+        # following another worker's run must not go back to GitHub for revalidation
+        revalidate = github_client.revalidating() if reload else nullcontext()
+        with revalidate, github_client.background():
+            if reload:
+                # one tarball per changed repo up front; the jobs below then read from disk
+                await gather_limited(
+                    self._guard(snapshot_service.sync(repo))
+                    for repo in set(settings.repos.values())
+                )
+            await gather_limited(jobs, timeout=settings.github_call_timeout * 2)
+        if reload:
+            await refresh_invalidations.publish()
+        page_cache.invalidate("github")
+
+        if reload:
+            self.runs += 1
+            self.last_run = time.time()
+            self.last_duration = time.monotonic() - started
+        else:
+            self.followed += 1
+
+    # the services feed the search index themselves as they load data; without
+    # ``reload`` they only read what the refreshing worker shared
+    async def _refresh_keybinds(self, platform: str, reload: bool) -> None:
+        if reload:
+            await keybind_service.refresh(platform)
+        else:
+            await keybind_service.load_shared(platform)
+
+    async def _refresh_repo(self, platform: str, repo: str, reload: bool) -> None:
+        if reload:
+            await github_service.refresh(platform, repo)
+            await github_service.get_readme(platform)
+        else:
+            await github_service.load_shared_readme(platform)
+
+    async def _refresh_config(self, repo: str, path: str, reload: bool) -> None:
+        if reload:
+            await config_service.get_config_file(repo, path)
+        else:
+            await config_service.load_shared(repo, path)
+
+    async def _guard(self, job: Awaitable[Any]) -> None:
+        try:
+            await job
+        except Exception:
+            # a failed refresh leaves the previous data in place; try again next round
+            logger.exception("refresh job failed")
+            self.failures += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "triggered": self._once is not None and not self._once.done(),
+            "interval": settings.refresh_interval,
+            "runs": self.runs,
+            "followed": self.followed,
+            "failures": self.failures,
+            "last_run": self.last_run,
+            "last_duration": self.last_duration,
+        }
+
+
+refresh_service = RefreshService()
+# subscribed after the services, so their shared data is picked up first
+refresh_invalidations.subscribe(refresh_service.follow)
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.search_index import InvertedIndex, SearchDocument, tokenize
+from app.models.compact import KeybindRecord
+from app.models.keybind import ConfigFile
+
+SNIPPET_LENGTH = 160
+
+
+class SearchService:
+    """Search over whatever the services have loaded; they index data as it arrives."""
+
+    def __init__(self):
+        self.index = InvertedIndex()
+        # the object each source was last indexed from; handing it in again is free
+        self._indexed: Dict[str, Any] = {}
+
+    def _seen(self, source: str, value: Any) -> bool:
+        if self._indexed.get(source) is value:
+            return True
+        self._indexed[source] = value
+        return False
+
+    def index_keybinds(self, platform: str, keybinds: List[KeybindRecord]) -> bool:
+        if self._seen(f"keybinds:{platform}", keybinds):
+            return False
+        docs = []
+        for i, kb in enumerate(keybinds):
+            combo = " ".join([*kb.modifiers, kb.key])
+            doc = SearchDocument(
+                id=f"keybind:{platform}:{i}",
+                kind="keybind",
+                title=kb.action,
+                url=f"/dotfiles/keybinds?platform={platform}",
+                platform=platform,
+                text=" + ".join([*kb.modifiers, kb.key]),
+                data=kb.to_dict(),
+            )
+            fields = {kb.action: 3.0, combo: 3.0, kb.category: 2.0}
+            if kb.command:
+                fields[kb.command] = 1.0
+            docs.append((doc, fields))
+        return self.index.replace_source(f"keybinds:{platform}", docs)
+
+    def index_config(self, platform: Optional[str], config: ConfigFile) -> bool:
+        if self._seen(f"config:{config.repo}:{config.path}", config.content):
+            return False
+        doc = SearchDocument(
+            id=f"config:{config.repo}:{config.path}",
+            kind="config",
+            title=config.path,
+            url=f"/api/configs/{config.repo}/file/{config.path}",
+            platform=platform,
+            text=config.content,
+        )
+        fields = {config.path: 3.0, config.content: 1.0}
+        return self.index.replace_source(doc.id, [(doc, fields)])
+
+    def index_readme(self, platform: str, repo: str, content: str) -> bool:
+        if self._seen(f"readme:{repo}", content):
+            return False
+        doc = SearchDocument(
+            id=f"readme:{repo}",
+            kind="readme",
+            title=f"{repo} README",
+            url=f"/dotfiles/{platform}",
+            platform=platform,
+            text=content,
+        )
+        fields = {repo: 3.0, content: 1.0}
+        return self.index.replace_source(doc.id, [(doc, fields)])
+
+    def search(
+        self,
+        query: str,
+        kind: Optional[str] = None,
+        platform: Optional[str] = None,
+        page: int = 1,
+        per_page: int = 20,
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        matches = self.index.search(query, kind=kind, platform=platform)
+        offset = (page - 1) * per_page
+        tokens = tokenize(query)
+        results = [
+            {
+                "kind": doc.kind,
+                "title": doc.title,
+                "url": doc.url,
+                "platform": doc.platform,
+                "score": round(score, 4),
+                "snippet": doc.text if doc.kind == "keybind" else self._snippet(doc.text, tokens),
+                "keybind": doc.data,
+            }
+            for score, doc in matches[offset : offset + per_page]
+        ]
+        return {
+            "query": query,
+            "total": len(matches),
+            "page": page,
+            "per_page": per_page,
+            "took_ms": round((time.perf_counter() - started) * 1000, 3),
+            "results": results,
+        }
+
+    @staticmethod
+    def _snippet(text: str, tokens: List[str]) -> str:
+        for line in text.splitlines():
+            folded = line.casefold()
+            if any(token in folded for token in tokens):
+                line = line.strip()
+                return line if len(line) <= SNIPPET_LENGTH else line[:SNIPPET_LENGTH] + "..."
+        return text[:SNIPPET_LENGTH].strip()
+
+    def stats(self) -> Dict[str, int]:
+        return self.index.stats()
+
+
+search_service = SearchService()
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import get_settings
+from app.core.concurrency import SingleFlight
+from app.core.executor import cpu_pool
+from app.core.github_client import github_client
+from app.core.snapshots import Snapshot, SnapshotStore, git_blob_sha, unpack_tarball
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class SnapshotService:
+    """Serves file reads for the dotfiles repos from local snapshots.
+
+    Each repo in `settings.repos` is downloaded as one tarball pinned to its head
+    commit and unpacked into a content-addressed store, so reading a dozen config
+    files costs one archive download per commit instead of a request per file.
+    Repos outside `settings.repos`, or a snapshot that can't be downloaded, fall
+    back to per-file raw requests.
+    """
+
+    def __init__(self):
+        self.store = SnapshotStore(settings.data_dir / "snapshots")
+        self._current: Dict[str, Snapshot] = {}
+        # commit whose download failed, per repo; reads fall back to raw until the next sync
+        self._failed: Dict[str, str] = {}
+        self._flights = SingleFlight()
+        self.downloads = 0
+        self.reads = 0
+        self.fallbacks = 0
+
+    def tracks(self, repo: str) -> bool:
+        return settings.snapshot_enabled and repo in settings.repos.values()
+
+    async def snapshot(self, repo: str, sha: Optional[str] = None) -> Optional[Snapshot]:
+        """The snapshot for ``sha`` (syncing it if needed), or the current one if no sha."""
+        if not self.tracks(repo):
+            return None
+        current = self._current.get(repo)
+        if current is None and sha is None:
+            sha = self.store.read_ref(repo) or await github_client.get_head_sha(repo)
+        if sha is None or (current is not None and current.sha == sha):
+            return current
+        if self._failed.get(repo) == sha:
+            return current
+        snapshot = await self._flights.do((repo, sha), lambda: self._sync(repo, sha))
+        # a failed sync keeps serving whatever we had
+        return snapshot or current
+
+    async def sync(self, repo: str) -> Optional[Snapshot]:
+        """Move ``repo`` to its head commit; a no-op while the head is unchanged."""
+        sha = await github_client.get_head_sha(repo)
+        self._failed.pop(repo, None)
+        return await self.snapshot(repo, sha)
+
+    async def _sync(self, repo: str, sha: str) -> Optional[Snapshot]:
+        snapshot = await asyncio.to_thread(self.store.read_tree, repo, sha)
+        if snapshot is None:
+            snapshot = await self._download(repo, sha)
+            if snapshot is None:
+                self._failed[repo] = sha
+                return None
+        self._current[repo] = snapshot
+        await asyncio.to_thread(self._commit, snapshot)
+        return snapshot
+
+    def _commit(self, snapshot: Snapshot) -> None:
+        self.store.write_ref(snapshot.repo, snapshot.sha)
+        self.store.prune(settings.repos.values(), settings.snapshot_keep)
+
+    async def _download(self, repo: str, sha: str) -> Optional[Snapshot]:
+        self.store.objects.mkdir(parents=True, exist_ok=True)
+        # downloaded next to the store so a crash never leaves it in /tmp
+        fd, archive = tempfile.mkstemp(dir=self.store.root, suffix=".tar.gz")
+        os.close(fd)
+        try:
+            if not await github_client.download_tarball(repo, sha, Path(archive)):
+                return None
+            files = await cpu_pool.run(
+                unpack_tarball, archive, str(self.store.objects), settings.snapshot_max_file_size
+            )
+        except Exception:
+            logger.exception("unpacking the %s snapshot at %s failed", repo, sha)
+            return None
+        finally:
+            os.unlink(archive)
+        snapshot = Snapshot(repo, sha, files)
+        await asyncio.to_thread(self.store.write_tree, snapshot)
+        self.downloads += 1
+        return snapshot
+
+    async def read_file(self, repo: str, path: str, sha: Optional[str] = None) -> Optional[str]:
+        """Contents of ``path``; pass the head ``sha`` the caller keys its results by."""
+        return (await self.read_blob(repo, path, sha))[1]
+
+    async def read_blob(
+        self, repo: str, path: str, sha: Optional[str] = None
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """``(blob SHA, contents)`` of ``path``, or ``(None, None)`` if it doesn't exist.
+
+        Files fetched raw get the blob SHA of their contents, so callers can key
+        derived results by it either way.
+        """
+        snapshot = await self.snapshot(repo, sha)
+        if snapshot is None or (sha is not None and snapshot.sha != sha):
+            return await self._read_raw(repo, path)
+        self.reads += 1
+        blob = snapshot.files.get(path.strip("/"))
+        if blob is None:
+            return None, None
+        data = await asyncio.to_thread(self.store.read_object, blob)
+        if data is None:
+            # the object is gone from the store; the file still exists, so read it raw
+            # and let the next read sync a complete snapshot again
+            if self._current.get(repo) is snapshot:
+                del self._current[repo]
+            return await self._read_raw(repo, path)
+        return blob, data.decode("utf-8", errors="replace")
+
+    async def _read_raw(self, repo: str, path: str) -> Tuple[Optional[str], Optional[str]]:
+        self.fallbacks += 1
+        text = await github_client.get_raw_file(repo, path)
+        if text is None:
+            return None, None
+        return git_blob_sha(text.encode("utf-8")), text
+
+    async def unchanged(self, repo: str, sha: str, files: Dict[str, Optional[str]]) -> bool:
+        """Whether every path in ``files`` still has the recorded blob SHA at ``sha``.
+
+        A None blob stands for a file that didn't exist. Without a snapshot at
+        ``sha`` nothing can be checked without fetching, so this is False.
+        """
+        snapshot = await self.snapshot(repo, sha)
+        if snapshot is None or snapshot.sha != sha:
+            return False
+        return all(snapshot.files.get(path) == blob for path, blob in files.items())
+
+    async def list_files(self, repo: str, prefix: str = "") -> Optional[List[str]]:
+        snapshot = await self.snapshot(repo)
+        return snapshot.list(prefix) if snapshot else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "repos": {repo: snap.sha for repo, snap in self._current.items()},
+            "downloads": self.downloads,
+            "reads": self.reads,
+            "fallbacks": self.fallbacks,
+        }
+
+
+snapshot_service = SnapshotService()
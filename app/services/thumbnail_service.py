@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from app.config import get_settings
+from app.core.concurrency import gather_limited
+from app.core.executor import cpu_pool
+from app.core.thumbnails import (
+    MIME_TYPES,
+    ffmpeg_path,
+    remove_stale,
+    render_variants,
+    supported_formats,
+)
+from app.models.keybind import GalleryItem
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# preferred first; <picture> picks the first type the browser supports
+FORMAT_ORDER = ["avif", "webp"]
+
+
+def variant_key(item: GalleryItem) -> str:
+    return hashlib.blake2b(f"{item.name}:{item.mtime}".encode(), digest_size=4).hexdigest()
+
+
+def variant_stem(item: GalleryItem, key: str) -> str:
+    return f"{Path(item.name).stem}-{key}"
+
+
+class ThumbnailService:
+    """Background generation of resized gallery images and video posters.
+
+    Requests never wait on it: `variants()` returns what is ready and queues the rest,
+    and the template falls back to the original file until a variant exists.
+    """
+
+    def __init__(self, source_dir: Path, cache_dir: Path, url_prefix: str):
+        self.source_dir = source_dir
+        self.cache_dir = cache_dir
+        self.url_prefix = url_prefix.rstrip("/")
+        self.formats = [fmt for fmt in FORMAT_ORDER if fmt in settings.thumbnail_formats]
+        self._ready: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, GalleryItem] = {}
+        self._failed: set = set()
+        # animated images keep their original file
+        self._animated: set = set()
+        # <stem>-<key> of every current item; files for anything else get removed
+        self._keep: Optional[Set[str]] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.generated = 0
+        self.removed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(supported_formats(self.formats)) or ffmpeg_path() is not None
+
+    async def start(self, items: List[GalleryItem]) -> None:
+        if self._task is None and self.enabled:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            self.sync(items)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def sync(self, items: List[GalleryItem]) -> None:
+        """Match the gallery: queue new items and drop variants of removed or changed ones."""
+        if self._task is None:
+            return
+        keys = {variant_key(item): item for item in items}
+        self._ready = {key: ready for key, ready in self._ready.items() if key in keys}
+        self._failed &= keys.keys()
+        self._animated &= keys.keys()
+        self._keep = {variant_stem(item, key) for key, item in keys.items()}
+        self._wake.set()
+        self.enqueue(items)
+
+    def enqueue(self, items: List[GalleryItem]) -> None:
+        if self._task is None:
+            return
+        for item in items:
+            key = variant_key(item)
+            if key not in self._ready and key not in self._failed and key not in self._animated:
+                self._pending[key] = item
+        if self._pending:
+            self._wake.set()
+
+    def variants(self, item: GalleryItem) -> Optional[Dict[str, Any]]:
+        key = variant_key(item)
+        ready = self._ready.get(key)
+        if ready is None:
+            self.enqueue([item])
+        return ready
+
+    async def _run(self) -> None:
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            if self._keep is not None:
+                keep, self._keep = self._keep, None
+                self.removed += await asyncio.to_thread(remove_stale, str(self.cache_dir), keep)
+            while self._pending:
+                batch, self._pending = self._pending, {}
+                await gather_limited(
+                    (self._generate(key, item) for key, item in batch.items()),
+                    limit=settings.thumbnail_concurrency,
+                )
+
+    async def _generate(self, key: str, item: GalleryItem) -> None:
+        try:
+            result = await cpu_pool.run(
+                render_variants,
+                str(self.source_dir / item.name),
+                str(self.cache_dir),
+                key,
+                settings.thumbnail_widths,
+                self.formats,
+                item.is_video,
+            )
+        except Exception:
+            logger.exception("thumbnail generation failed for %s", item.name)
+            self._failed.add(key)
+            return
+        if result.get("animated") and not result["poster"]:
+            self._animated.add(key)
+            return
+        if not result["sources"] and not result["poster"]:
+            self._failed.add(key)
+            return
+        self._ready[key] = self._describe(result)
+        self.generated += 1
+
+    def _describe(self, result: Dict[str, List]) -> Dict[str, Any]:
+        by_format: Dict[str, List[str]] = {}
+        for fmt, width, name in result["sources"]:
+            by_format.setdefault(fmt, []).append(f"{self.url_prefix}/{name} {width}w")
+        sources = [
+            {"type": MIME_TYPES[fmt], "srcset": ", ".join(by_format[fmt])}
+            for fmt in FORMAT_ORDER
+            if fmt in by_format
+        ]
+        # the smallest, most widely supported variant is the plain <img src> fallback
+        src = sources[-1]["srcset"].split(" ", 1)[0] if sources else None
+        poster = f"{self.url_prefix}/{result['poster']}" if result["poster"] else None
+        return {"sources": sources, "src": src, "poster": poster}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "ready": len(self._ready),
+            "pending": len(self._pending),
+            "failed": len(self._failed),
+            "animated": len(self._animated),
+            "generated": self.generated,
+            "removed": self.removed,
+        }
+
+
+thumbnail_service = ThumbnailService(
+    Path(settings.gallery_dir), Path(settings.thumbnail_dir), settings.thumbnail_url
+)
@@ -0,0 +1,71 @@
+"""Compare a fresh httpx client per call against the shared GitHubClient pool.
+
+Runs a tiny stub server locally, so no GitHub traffic or token is needed:
+
+    python scripts/bench_github_client.py [requests]
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+
+HOST, PORT = "127.0.0.1", 8765
+os.environ.setdefault("GITHUB_API_URL", f"http://{HOST}:{PORT}")
+os.environ.setdefault("GITHUB_CACHE_TTL", "0")  # measure the transport, not the cache
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.github_client import GitHubClient  # noqa: E402
+
+
+async def stub_app(scope, receive, send):
+    if scope["type"] != "http":
+        return
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": b'{"name": "stub"}'})
+
+
+def start_stub_server() -> None:
+    config = uvicorn.Config(stub_app, host=HOST, port=PORT, log_level="error")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+
+async def main(n: int) -> None:
+    client = GitHubClient()
+    url = f"{client.base_url}/repos/stub/repo"
+
+    start = time.perf_counter()
+    for _ in range(n):
+        async with httpx.AsyncClient() as one_off:
+            await one_off.get(url, headers=client.headers)
+    per_call = (time.perf_counter() - start) / n * 1000
+
+    await client.start()
+    start = time.perf_counter()
+    for _ in range(n):
+        await client.get_repo_info("stub/repo")
+    pooled = (time.perf_counter() - start) / n * 1000
+    await client.close()
+
+    print(f"client per call: {per_call:.3f} ms/request")
+    print(f"shared pool:     {pooled:.3f} ms/request")
+
+
+if __name__ == "__main__":
+    start_stub_server()
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
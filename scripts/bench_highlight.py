@@ -0,0 +1,64 @@
+"""Time ConfigService.highlight_code against the old per-call lexer/formatter setup.
+
+Uses a synthetic hyprland.conf-style file, so it runs offline:
+
+    python scripts/bench_highlight.py [lines] [rounds]
+"""
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+from pygments import highlight
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import get_lexer_by_name
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.config_service import ConfigService  # noqa: E402
+
+
+def synthetic_config(lines: int) -> str:
+    out = ["$mainMod = SUPER", "$terminal = kitty", ""]
+    for i in range(lines):
+        if i % 20 == 0:
+            out.append(f"# Section {i // 20}")
+        out.append(f"bind = $mainMod SHIFT, {i % 10}, movetoworkspace, {i % 10}")
+    return "\n".join(out)
+
+
+def time_per_call(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main(lines: int, rounds: int) -> None:
+    code = synthetic_config(lines)
+    service = ConfigService()
+
+    def old_highlight():
+        formatter = HtmlFormatter(style="monokai", linenos=True, cssclass="highlight")
+        return highlight(code, get_lexer_by_name("ini"), formatter)
+
+    def old_css():
+        return HtmlFormatter(style="monokai").get_style_defs(".highlight")
+
+    print(f"{lines} line config, {rounds} rounds")
+    print(f"highlight, new lexer/formatter: {time_per_call(old_highlight, rounds):9.3f} ms")
+    # the first call renders with the shared lexer/formatter and fills the cache;
+    # timed on its own so the cached figure below is hits only
+    print(f"highlight, first call:          "
+          f"{time_per_call(lambda: service.highlight_code(code, 'ini'), 1):9.3f} ms")
+    print(f"highlight, cached:              "
+          f"{time_per_call(lambda: service.highlight_code(code, 'ini'), rounds):9.3f} ms")
+    print(f"css, regenerated:               {time_per_call(old_css, rounds):9.3f} ms")
+    print(f"css, precomputed:               "
+          f"{time_per_call(service.get_highlight_css, rounds):9.3f} ms")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*(args + [5000, 20][len(args):]))
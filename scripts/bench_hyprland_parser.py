@@ -0,0 +1,49 @@
+"""Throughput of HyprlandParser on a synthetic config.
+
+The config defines many variables, including names that prefix each other
+(`$mod`, `$mod2`, `$modShift`, ...), which is the worst case for substitution:
+
+    python scripts/bench_hyprland_parser.py [lines] [variables]
+"""
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.parsers.hyprland_parser import HyprlandParser  # noqa: E402
+
+
+def synthetic_config(lines: int, variables: int) -> str:
+    names = ["mod"] + [f"mod{i}" for i in range(1, variables)]
+    out = ["$mainMod = SUPER", "$terminal = kitty"]
+    out += [f"${name} = SUPER SHIFT" for name in names]
+    for i in range(lines):
+        if i % 25 == 0:
+            out.append(f"# Section {i // 25}")
+        name = names[i % len(names)]
+        out.append(f"bind = ${name}, {i % 10}, movetoworkspace, {i % 10}")
+        if i % 7 == 0:
+            out.append(f"bindm = $mainMod, mouse:{270 + i % 3}, exec, $terminal")
+    return "\n".join(out)
+
+
+def main(lines: int, variables: int, rounds: int = 5) -> None:
+    content = synthetic_config(lines, variables)
+    parser = HyprlandParser()
+    parser.parse(content)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        keybinds = parser.parse(content)
+    elapsed = (time.perf_counter() - start) / rounds
+
+    print(f"{content.count(chr(10)) + 1} lines, {variables} variables -> {len(keybinds)} binds")
+    print(f"{elapsed * 1000:.1f} ms per parse, {len(keybinds) / elapsed:,.0f} binds/s")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*(args + [10_000, 50][len(args):]))
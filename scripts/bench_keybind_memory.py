@@ -0,0 +1,50 @@
+"""Bytes per keybind: pydantic Keybind models vs the compact KeybindRecord.
+
+    python scripts/bench_keybind_memory.py [count]
+"""
+from __future__ import annotations
+
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.models.compact import KeybindRecord  # noqa: E402
+from app.models.keybind import Keybind  # noqa: E402
+
+CATEGORIES = [f"Category {i}" for i in range(20)]
+MODIFIERS = [["cmd"], ["cmd", "shift"], ["opt"], ["ctrl", "opt"], ["cmd", "ctrl", "shift"]]
+KEYS = list("abcdefghijklmnopqrstuvwxyz0123456789")
+
+
+def synthetic_fields(count: int):
+    # build the strings fresh per bind, like a parser reading them off separate lines
+    for i in range(count):
+        yield dict(
+            platform="".join(["hypr", "land"]),
+            category="".join(CATEGORIES[i % len(CATEGORIES)]),
+            modifiers=["".join(m) for m in MODIFIERS[i % len(MODIFIERS)]],
+            key="".join(KEYS[i % len(KEYS)]),
+            action=f"Move to workspace {i % 10}",
+            command=f"movetoworkspace, {i % 10}",
+        )
+
+
+def measure(factory, count: int) -> float:
+    tracemalloc.start()
+    items = [factory(**fields) for fields in synthetic_fields(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return current / count
+
+
+def main(count: int) -> None:
+    print(f"{count:,} synthetic keybinds")
+    print(f"pydantic Keybind: {measure(Keybind, count):7.1f} bytes/keybind")
+    print(f"KeybindRecord:    {measure(KeybindRecord, count):7.1f} bytes/keybind")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
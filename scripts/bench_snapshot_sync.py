@@ -0,0 +1,134 @@
+"""Compare per-file raw fetches against one tarball snapshot for a dotfiles repo.
+
+Runs a fake GitHub locally (commits, tarball redirect, codeload and raw endpoints)
+with a fixed per-request latency, so no GitHub traffic or token is needed:
+
+    python scripts/bench_snapshot_sync.py [files] [latency_ms]
+"""
+from __future__ import annotations
+
+import asyncio
+import io
+import os
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import uvicorn
+
+HOST, PORT = "127.0.0.1", 8766
+REPO = "bench/dotfiles"
+SHA = "0123456789abcdef0123456789abcdef01234567"
+os.environ.setdefault("GITHUB_API_URL", f"http://{HOST}:{PORT}/api")
+os.environ.setdefault("GITHUB_RAW_URL", f"http://{HOST}:{PORT}/raw")
+os.environ.setdefault("GITHUB_CACHE_TTL", "0")
+os.environ.setdefault("CPU_POOL_SIZE", "0")
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="bench-snapshots-"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import get_settings  # noqa: E402
+from app.core.github_client import github_client  # noqa: E402
+from app.services.snapshot_service import snapshot_service  # noqa: E402
+
+FILES = {}
+ARCHIVE = b""
+LATENCY = 0.0
+requests = {"api": 0, "raw": 0, "codeload": 0}
+
+
+def build_repo(n: int) -> None:
+    global ARCHIVE
+    for i in range(n):
+        FILES[f"hypr/conf/part{i:02d}.conf"] = (f"bind = SUPER, {i}, exec, app{i}\n" * 200).encode()
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        for path, data in FILES.items():
+            info = tarfile.TarInfo(f"bench-dotfiles-{SHA[:7]}/{path}")
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    ARCHIVE = buf.getvalue()
+
+
+async def fake_github(scope, receive, send):
+    if scope["type"] != "http":
+        return
+    await asyncio.sleep(LATENCY)
+    path = scope["path"]
+    status, headers, body = 404, [], b""
+    if path == f"/api/repos/{REPO}/commits":
+        requests["api"] += 1
+        status, body = 200, f'[{{"sha": "{SHA}"}}]'.encode()
+        headers = [(b"content-type", b"application/json")]
+    elif path.startswith(f"/api/repos/{REPO}/tarball/"):
+        requests["api"] += 1
+        status = 302
+        headers = [(b"location", f"http://{HOST}:{PORT}/codeload/{SHA}".encode())]
+    elif path.startswith("/codeload/"):
+        requests["codeload"] += 1
+        status, body = 200, ARCHIVE
+    elif path.startswith(f"/raw/{REPO}/main/"):
+        requests["raw"] += 1
+        data = FILES.get(path[len(f"/raw/{REPO}/main/"):])
+        if data is not None:
+            status, body = 200, data
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+def start_server() -> None:
+    config = uvicorn.Config(fake_github, host=HOST, port=PORT, log_level="error")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+
+def reset() -> dict:
+    counts = dict(requests)
+    for key in requests:
+        requests[key] = 0
+    return counts
+
+
+async def main() -> None:
+    get_settings().repos["bench"] = REPO
+    await github_client.start()
+    paths = sorted(FILES)
+    concurrency = get_settings().github_concurrency
+
+    async def read_all(read) -> float:
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(path):
+            async with semaphore:
+                assert await read(path) == FILES[path].decode()
+
+        await asyncio.gather(*(one(p) for p in paths))
+        return (time.perf_counter() - start) * 1000
+
+    raw = await read_all(lambda p: github_client.get_raw_file(REPO, p))
+    print(f"raw per file:      {raw:7.1f} ms  requests {reset()}")
+
+    start = time.perf_counter()
+    await snapshot_service.sync(REPO)
+    sync = (time.perf_counter() - start) * 1000
+    print(f"snapshot sync:     {sync:7.1f} ms  requests {reset()}  ({len(ARCHIVE)} byte archive)")
+
+    cached = await read_all(lambda p: snapshot_service.read_file(REPO, p, SHA))
+    print(f"snapshot reads:    {cached:7.1f} ms  requests {reset()}")
+
+    start = time.perf_counter()
+    await snapshot_service.sync(REPO)
+    print(f"unchanged head:    {(time.perf_counter() - start) * 1000:7.1f} ms  requests {reset()}")
+    await github_client.close()
+
+
+if __name__ == "__main__":
+    build_repo(int(sys.argv[1]) if len(sys.argv) > 1 else 24)
+    LATENCY = (float(sys.argv[2]) if len(sys.argv) > 2 else 30.0) / 1000
+    start_server()
+    asyncio.run(main())
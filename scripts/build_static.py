@@ -0,0 +1,34 @@
+"""Build content-hashed, precompressed copies of the text assets under static/.
+
+Writes static/dist/<dir>/<name>.<hash><ext> plus .gz (and .br when the brotli
+package is installed) siblings, and a manifest.json that the static_url()
+template helper reads. Old builds are kept so cached pages keep working;
+pass --clean to start from scratch:
+
+    python scripts/build_static.py [--clean]
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from app.core.compression import brotli  # noqa: E402
+from app.core.static import DIST_DIR, STATIC_DIR, build_assets  # noqa: E402
+
+
+def report(source: str, hashed: str, sizes: dict) -> None:
+    print(f"{source:<24} -> {hashed:<32} " + " / ".join(map(str, sizes.values())))
+
+
+if __name__ == "__main__":
+    if "--clean" in sys.argv[1:] and (STATIC_DIR / DIST_DIR).exists():
+        shutil.rmtree(STATIC_DIR / DIST_DIR)
+    if brotli is None:
+        print("brotli not installed; writing .gz variants only")
+    build_assets(report=report)
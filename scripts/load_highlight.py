@@ -0,0 +1,73 @@
+"""Latency of /api/github/* while large configs are highlighted concurrently.
+
+GitHub is replaced with an in-process mock and the highlight cache is disabled,
+so every config request runs Pygments. Compare pool settings with e.g.
+
+    CPU_POOL_SIZE=0 python scripts/load_highlight.py         # inline on the loop
+    CPU_POOL_KIND=thread python scripts/load_highlight.py
+    CPU_POOL_KIND=process python scripts/load_highlight.py
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+os.environ.setdefault("HIGHLIGHT_CACHE_SIZE", "0")
+os.environ.setdefault("REFRESH_ENABLED", "false")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import get_settings  # noqa: E402
+from app.core.executor import cpu_pool  # noqa: E402
+from app.core.github_client import github_client  # noqa: E402
+from app.main import app  # noqa: E402
+
+CONFIG = "\n".join(
+    f"bind = $mainMod SHIFT, {i % 10}, movetoworkspace, {i % 10}" for i in range(5000)
+)
+
+
+def fake_github(request: httpx.Request) -> httpx.Response:
+    if request.url.path.endswith("hyprland.conf"):
+        return httpx.Response(200, text=CONFIG)
+    if request.url.path.endswith("/commits"):
+        return httpx.Response(404)  # no head SHA, so nothing is served from the store
+    return httpx.Response(200, json={"name": "repo", "full_name": "duma799/repo"})
+
+
+async def main(duration: float = 5.0, highlighters: int = 4) -> None:
+    github_client._client = httpx.AsyncClient(transport=httpx.MockTransport(fake_github))
+    transport = httpx.ASGITransport(app=app)
+    stop = time.monotonic() + duration
+    latencies = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+        async def highlight_load() -> None:
+            while time.monotonic() < stop:
+                await client.get("/api/configs/duma799/repo/file/hyprland.conf")
+
+        async def probe() -> None:
+            while time.monotonic() < stop:
+                start = time.perf_counter()
+                await client.get("/api/github/repo/duma799/repo")
+                latencies.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(probe(), *(highlight_load() for _ in range(highlighters)))
+
+    cpu_pool.shutdown()
+    settings = get_settings()
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"pool={settings.cpu_pool_kind}x{settings.cpu_pool_size} probes={len(latencies)}")
+    print(f"/api/github/repo p50={statistics.median(latencies):.1f} ms p99={p99:.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,76 +5,98 @@ function keyboardViz() {
         loading: true,
         hoverInfo: { title: "Hover a key", desc: "Hover one of the highlighted keys to see the keybinding" },
         highlightedKeys: new Set(),
+        activeKeys: new Set(),
+        activeLayer: null,
+        // built server-side from KeyboardLayout: rows of keys with their binds attached
+        layout: { rows: [], layers: {}, categories: [], unmapped: [] },
+        widthClasses: { 1.25: "w-1", 1.75: "w-2", 2.25: "w-3", 6: "space" },
         
-        keyboardLayout: [
-            [{code:"esc",label:"Esc"},{code:"f1",label:"F1"},{code:"f2",label:"F2"},{code:"f3",label:"F3"},{code:"f4",label:"F4"},{code:"f5",label:"F5"},{code:"f6",label:"F6"},{code:"f7",label:"F7"},{code:"f8",label:"F8"},{code:"f9",label:"F9"},{code:"f10",label:"F10"},{code:"f11",label:"F11"},{code:"f12",label:"F12"},{code:"del",label:"Del"}],
-            [{code:"backtick",label:"`"},{code:"1",label:"1"},{code:"2",label:"2"},{code:"3",label:"3"},{code:"4",label:"4"},{code:"5",label:"5"},{code:"6",label:"6"},{code:"7",label:"7"},{code:"8",label:"8"},{code:"9",label:"9"},{code:"0",label:"0"},{code:"minus",label:"-"},{code:"equals",label:"="},{code:"backspace",label:"Bksp",width:"w-2"}],
-            [{code:"tab",label:"Tab",width:"w-1"},{code:"q",label:"Q"},{code:"w",label:"W"},{code:"e",label:"E"},{code:"r",label:"R"},{code:"t",label:"T"},{code:"y",label:"Y"},{code:"u",label:"U"},{code:"i",label:"I"},{code:"o",label:"O"},{code:"p",label:"P"},{code:"[",label:"["},{code:"]",label:"]"},{code:"\\",label:"\\"}],
-            [{code:"caps",label:"Caps",width:"w-2"},{code:"a",label:"A"},{code:"s",label:"S"},{code:"d",label:"D"},{code:"f",label:"F"},{code:"g",label:"G"},{code:"h",label:"H"},{code:"j",label:"J"},{code:"k",label:"K"},{code:"l",label:"L"},{code:";",label:";"},{code:"quote",label:"\""},{code:"enter",label:"Enter",width:"w-2"}],
-            [{code:"shift",label:"Shift",width:"w-3",modifier:true},{code:"z",label:"Z"},{code:"x",label:"X"},{code:"c",label:"C"},{code:"v",label:"V"},{code:"b",label:"B"},{code:"n",label:"N"},{code:"m",label:"M"},{code:",",label:","},{code:".",label:"."},{code:"/",label:"/"},{code:"shift-r",label:"Shift",width:"w-3",modifier:true}],
-            [{code:"fn",label:"fn",width:"w-1"},{code:"ctrl",label:"Ctrl",width:"w-1",modifier:true},{code:"opt",label:"Opt",width:"w-1",modifier:true},{code:"cmd",label:"Cmd",width:"w-1",modifier:true},{code:"space",label:"",width:"space"},{code:"cmd-r",label:"Cmd",width:"w-1",modifier:true},{code:"opt-r",label:"Opt",width:"w-1",modifier:true}],
-            [{code:"left",label:"\u2190"},{code:"up",label:"\u2191"},{code:"down",label:"\u2193"},{code:"right",label:"\u2192"}]
-        ],
+        get keyboardLayout() {
+            return this.layout.rows;
+        },
         
         async init() {
-            await this.fetchKeybinds();
+            await this.fetchLayout();
         },
         
         async switchPlatform(p) {
             this.platform = p;
+            this.activeLayer = null;
             history.pushState({}, "", "?platform=" + p);
-            await this.fetchKeybinds();
+            await this.fetchLayout();
         },
         
-        async fetchKeybinds() {
+        async fetchLayout() {
             this.loading = true;
             try {
-                const resp = await fetch("/api/keybinds/" + this.platform);
-                if (resp.ok) this.keybinds = await resp.json();
+                const resp = await fetch("/api/keybinds/" + this.platform + "/layout");
+                if (resp.ok) this.setLayout(await resp.json());
             } catch (e) { console.error(e); }
             this.loading = false;
         },
         
-        get groupedKeybinds() {
-            const groups = {};
-            this.keybinds.forEach(kb => {
-                if (!groups[kb.category]) groups[kb.category] = [];
-                groups[kb.category].push(kb);
-            });
-            return groups;
+        setLayout(layout) {
+            // the server omits default fields: no binds, 1u width, not a modifier
+            layout.rows.forEach(row => row.forEach(key => { key.keybinds = key.keybinds || []; }));
+            layout.unmapped = layout.unmapped || [];
+            this.layout = layout;
+            this.keybinds = layout.rows.flat().flatMap(key => key.keybinds).concat(layout.unmapped);
+            this.activeKeys = this.layerKeys(Object.keys(layout.layers));
         },
         
-        get activeKeys() {
+        layerKeys(layers) {
             const keys = new Set();
-            this.keybinds.forEach(kb => {
-                keys.add(kb.key.toLowerCase());
-                kb.modifiers.forEach(m => keys.add(m.toLowerCase()));
+            layers.forEach(layer => {
+                (this.layout.layers[layer] || []).forEach(code => keys.add(code));
+                layer.split("+").filter(Boolean).forEach(m => keys.add(m));
             });
             return keys;
         },
         
+        get layerNames() {
+            return Object.keys(this.layout.layers);
+        },
+        
+        selectLayer(layer) {
+            this.activeLayer = this.activeLayer === layer ? null : layer;
+            const layers = this.activeLayer === null ? this.layerNames : [this.activeLayer];
+            this.activeKeys = this.layerKeys(layers);
+        },
+        
+        formatLayer(layer) {
+            return layer ? layer.split("+").map(m => m.charAt(0).toUpperCase() + m.slice(1)).join(" + ") : "No modifier";
+        },
+        
+        get groupedKeybinds() {
+            const groups = {};
+            this.layout.categories.forEach(category => { groups[category] = []; });
+            this.keybinds.forEach(kb => groups[kb.category].push(kb));
+            return groups;
+        },
+        
         getKeyClasses(key) {
-            const classes = [key.width || ""];
-            if (key.modifier) classes.push("modifier");
-            else if (this.highlightedKeys.has(key.code) || this.highlightedKeys.has(key.code.replace("-r", ""))) {
+            const code = key.key_code;
+            const classes = [this.widthClasses[key.width || 1] || ""];
+            if (key.is_modifier) classes.push("modifier");
+            else if (this.highlightedKeys.has(code) || this.highlightedKeys.has(code.replace("-r", ""))) {
                 classes.push("active");
-            } else if (this.activeKeys.has(key.code) || this.activeKeys.has(key.code.replace("-r", ""))) {
+            } else if (this.activeKeys.has(code) || this.activeKeys.has(code.replace("-r", ""))) {
                 classes.push("active");
             }
             return classes.join(" ");
         },
         
         onKeyHover(key) {
-            const code = key.code.replace("-r", "");
-            const matching = this.keybinds.filter(kb => 
-                kb.key.toLowerCase() === code || kb.modifiers.includes(code)
-            );
+            const code = key.key_code.replace("-r", "");
+            const matching = key.is_modifier
+                ? this.keybinds.filter(kb => kb.modifiers.includes(code))
+                : key.keybinds;
             if (matching.length > 0) {
                 this.hoverInfo = {
                     title: matching.map(kb => this.formatKeybind(kb)).join(", "),
                     desc: matching.map(kb => kb.action).join(" | ")
                 };
-                this.highlightedKeys = new Set();
+                this.highlightedKeys = new Set([code]);
                 matching.forEach(kb => {
                     this.highlightedKeys.add(kb.key.toLowerCase());
                     kb.modifiers.forEach(m => this.highlightedKeys.add(m));
@@ -0,0 +1,52 @@
+import time
+
+from app.core.cache import LRUCache, ResponseCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache: LRUCache[int] = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.evictions == 1
+
+
+def test_response_cache_keeps_validators():
+    cache = ResponseCache(ttl=60, max_entries=10)
+    cache.store("repos", ["a"], etag='W/"1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    entry = cache.lookup("repos")
+    assert entry.data == ["a"]
+    assert entry.is_fresh
+    assert entry.validators() == {
+        "If-None-Match": 'W/"1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+    assert cache.lookup("missing") is None
+
+
+def test_response_cache_refresh_extends_stale_entry():
+    cache = ResponseCache(ttl=0, max_entries=10)
+    cache.store("repos", ["a"], etag='"1"')
+    entry = cache.lookup("repos")
+    assert not entry.is_fresh
+
+    cache.ttl = 60
+    assert cache.refresh("repos") is entry
+    assert entry.is_fresh
+    assert entry.expires_at > time.monotonic()
+    assert cache.revalidated == 1
+    assert cache.refresh("missing") is None
+
+
+def test_response_cache_invalidate_and_stats():
+    cache = ResponseCache(ttl=60, max_entries=1)
+    cache.store("a", 1)
+    cache.store("b", 2)
+    cache.invalidate("b")
+    cache.hits, cache.misses = 3, 1
+    stats = cache.stats()
+    assert stats["size"] == 0
+    assert stats["evictions"] == 1
+    assert stats["hit_ratio"] == 0.75
@@ -0,0 +1,108 @@
+import pytest
+
+from app.core.cache_backend import Invalidations, MemoryBackend, SQLiteBackend
+from app.core.github_client import github_client
+from app.models.compact import KeybindRecord
+from app.models.keybind import ConfigFile
+from app.services import config_service as config_module
+from app.services import github_service as github_module
+from app.services import keybind_service as keybind_module
+from app.services import refresh_service as refresh_module
+from app.services.config_service import HIGHLIGHT_TAG, ConfigService
+from app.services.github_service import GitHubService
+from app.services.keybind_service import KEYBINDS_KIND, KeybindService
+from app.services.refresh_service import RefreshService
+from app.services.search_service import SearchService
+
+
+@pytest.fixture
+async def workers(tmp_path):
+    """Two workers' backends over one SQLite file."""
+    first = SQLiteBackend(tmp_path / "cache.db", max_entries=10)
+    second = SQLiteBackend(tmp_path / "cache.db", max_entries=10)
+    await first.start()
+    await second.start()
+    yield first, second
+    await first.close()
+    await second.close()
+
+
+async def test_values_are_shared(workers):
+    first, second = workers
+    await first.set("github", "readme:me/dots", "# Dots")
+    assert await second.get("github", "readme:me/dots") == "# Dots"
+    assert await second.get("github", "missing") is None
+    assert second.stats()["hits"] == 1
+
+
+async def test_only_one_worker_holds_a_lease(workers):
+    first, second = workers
+    assert await first.acquire("refresh", ttl=60)
+    assert not await second.acquire("refresh", ttl=60)
+    # renewing your own lease always works; an expired one can be taken over
+    assert await first.acquire("refresh", ttl=-1)
+    assert await second.acquire("refresh", ttl=60)
+
+
+async def test_invalidations_reach_other_workers(workers):
+    first, second = workers
+    calls = []
+    publisher = Invalidations(first, "refresh")
+    follower = Invalidations(second, "refresh")
+    follower.subscribe(lambda: calls.append("sync"))
+    follower._seen = await second.generation("refresh")
+
+    await publisher.publish()
+    await follower.poll()
+    await follower.poll()
+    assert calls == ["sync"]
+
+
+async def test_memory_backend_is_not_shared():
+    backend = MemoryBackend(max_entries=10)
+    assert not backend.shared
+    assert await backend.acquire("refresh", ttl=60)
+
+
+async def test_follower_reads_only_shared_data(workers, monkeypatch):
+    leader, follower = workers
+    repo = "me/dots"
+    monkeypatch.setattr(refresh_module.settings, "repos", {"yabai": repo})
+    monkeypatch.setattr(refresh_module.settings, "config_files", {"yabai": ["yabairc"]})
+
+    async def no_github(*args, **kwargs):
+        raise AssertionError("a follower must not call GitHub")
+
+    for name in ("get_head_sha", "get_raw_file", "download_tarball", "get_readme"):
+        monkeypatch.setattr(github_client, name, no_github)
+
+    # what the refreshing worker shared
+    keybind = KeybindRecord("yabai", "Windows", ["opt"], "h", "Focus west")
+    await leader.set(KEYBINDS_KIND, "yabai", {"digest": "d1", "keybinds": [keybind.to_dict()]})
+    await leader.set("github", f"readme:{repo}", "# Dots\nA tiling setup")
+    config = ConfigFile(
+        repo=repo,
+        path="yabairc",
+        content="yabai -m config layout bsp",
+        highlighted_html="",
+        language="bash",
+    )
+    await leader.set(f"configs-{HIGHLIGHT_TAG}", f"{repo}:yabairc", config.model_dump(mode="json"))
+
+    search = SearchService()
+    keybinds, github, configs = KeybindService(), GitHubService(), ConfigService()
+    for mod in (keybind_module, github_module, config_module):
+        monkeypatch.setattr(mod, "cache_backend", follower)
+        monkeypatch.setattr(mod, "search_service", search)
+    monkeypatch.setattr(refresh_module, "keybind_service", keybinds)
+    monkeypatch.setattr(refresh_module, "github_service", github)
+    monkeypatch.setattr(refresh_module, "config_service", configs)
+
+    refresh = RefreshService()
+    await refresh.refresh_all(reload=False)
+    assert refresh.failures == 0
+    assert refresh.followed == 1
+    assert [kb.action for kb in await keybinds.get_keybinds("yabai")] == ["Focus west"]
+    assert search.search("focus")["total"] == 1
+    assert search.search("tiling")["total"] == 1
+    assert search.search("layout bsp")["total"] == 1
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from app.core.concurrency import SingleFlight
+
+
+async def test_concurrent_calls_share_one_fetch():
+    flight = SingleFlight()
+    started = 0
+
+    async def fetch():
+        nonlocal started
+        started += 1
+        await asyncio.sleep(0.01)
+        return started
+
+    results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)))
+    assert results == [1] * 5
+    assert started == 1
+    assert flight.stats() == {"calls": 5, "collapsed": 4, "in_flight": 0}
+
+    assert await flight.do("key", fetch) == 2
+
+
+async def test_different_keys_run_separately():
+    flight = SingleFlight()
+
+    async def fetch(value):
+        await asyncio.sleep(0)
+        return value
+
+    assert await asyncio.gather(
+        flight.do("a", lambda: fetch("a")), flight.do("b", lambda: fetch("b"))
+    ) == ["a", "b"]
+    assert flight.collapsed == 0
+
+
+async def test_errors_reach_every_caller_and_are_not_cached():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        flight.do("key", fail), flight.do("key", fail), return_exceptions=True
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.stats()["in_flight"] == 0
+
+
+async def test_cancelled_caller_does_not_cancel_the_fetch():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flight.do("key", fetch))
+    second = asyncio.create_task(flight.do("key", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    release.set()
+    assert await second == "done"
+
+
+async def test_start_runs_in_background_once():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    runs = 0
+
+    async def fetch():
+        nonlocal runs
+        runs += 1
+        await release.wait()
+
+    flight.start("key", fetch)
+    flight.start("key", fetch)
+    await asyncio.sleep(0)
+    assert runs == 1
+    assert flight.stats()["in_flight"] == 1
+    release.set()
+    await asyncio.sleep(0.01)
+    assert flight.stats()["in_flight"] == 0
+
+
+async def test_start_logs_background_errors(caplog):
+    flight = SingleFlight()
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    flight.start("key", fail)
+    await asyncio.sleep(0.01)
+    assert "background call 'key' failed" in caplog.text
@@ -0,0 +1,59 @@
+import json
+
+import httpx
+import pytest
+
+from app import export
+from app.export import MANIFEST_NAME, Exporter
+
+
+def client(failing=()):
+    def handler(request):
+        if request.url.path in failing:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"path": request.url.path})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://export")
+
+
+async def export_routes(out, routes, failing=(), incremental=True):
+    exporter = Exporter(out, incremental)
+    exporter.load_manifest()
+    async with client(failing) as c:
+        for route in routes:
+            await exporter.fetch(c, route)
+    exporter.remove_stale()
+    (out / MANIFEST_NAME).write_text(json.dumps(exporter.current))
+    return exporter
+
+
+async def test_failed_route_keeps_previous_file(tmp_path):
+    routes = ["/api/keybinds/yabai", "/api/github/readme/yabai"]
+    await export_routes(tmp_path, routes)
+    readme = tmp_path / "api/github/readme/yabai.json"
+    assert readme.exists()
+
+    exporter = await export_routes(tmp_path, routes, failing={"/api/github/readme/yabai"})
+    assert exporter.failed == [("/api/github/readme/yabai", 503)]
+    assert readme.exists() and readme.with_name("yabai.json.gz").exists()
+    assert "api/github/readme/yabai.json" in exporter.current
+
+    # and the one after that still knows about it
+    await export_routes(tmp_path, routes)
+    assert readme.exists()
+
+
+async def test_routes_no_longer_exported_are_removed(tmp_path):
+    await export_routes(tmp_path, ["/api/keybinds/yabai", "/api/keybinds/old"])
+    await export_routes(tmp_path, ["/api/keybinds/yabai"])
+    assert (tmp_path / "api/keybinds/yabai.json").exists()
+    assert not (tmp_path / "api/keybinds/old.json").exists()
+
+
+@pytest.mark.parametrize("flags, status", [([], 1), (["--allow-partial"], 0)])
+def test_failed_routes_fail_the_export(tmp_path, monkeypatch, flags, status):
+    async def run(self):
+        self.failed.append(("/api/github/readme/yabai", 503))
+
+    monkeypatch.setattr(Exporter, "run", run)
+    assert export.main(["--out", str(tmp_path), *flags]) == status
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from app.services.gallery_service import GalleryService, gallery_url
+
+
+@pytest.fixture
+def gallery(tmp_path):
+    (tmp_path / "yabai_desktop_screenshot-1.jpeg").write_bytes(b"one")
+    (tmp_path / "hyprland_desktop_tiling.png").write_bytes(b"two")
+    (tmp_path / "notes.txt").write_text("not media")
+    service = GalleryService(tmp_path, check_interval=0)
+    service.refresh(force=True)
+    return service
+
+
+def test_index_groups_items_by_platform(gallery):
+    assert {item.name for item in gallery.items()} == {
+        "yabai_desktop_screenshot-1.jpeg",
+        "hyprland_desktop_tiling.png",
+    }
+    (item,) = gallery.items("Yabai")
+    assert item.title == "Desktop"
+    assert item.description == "Screenshot 1"
+
+
+def test_unchanged_directory_is_not_rebuilt(gallery):
+    assert not gallery.refresh()
+    (gallery.directory / "notes.txt").write_text("still not media")
+    assert not gallery.refresh()
+
+
+def test_file_overwritten_in_place_rebuilds(gallery):
+    path = gallery.directory / "yabai_desktop_screenshot-1.jpeg"
+    seen = []
+    gallery.subscribe(seen.append)
+    before = gallery.items("yabai")[0].mtime
+    # same name, so the directory's own mtime doesn't move
+    path.write_bytes(b"new")
+    os.utime(path, ns=(0, int((before + 5) * 10**9)))
+
+    assert gallery.items("yabai")[0].mtime == path.stat().st_mtime
+    assert gallery.items("yabai")[0].mtime > before
+    assert len(seen) == 1
+
+
+def test_added_and_removed_files(gallery):
+    (gallery.directory / "yabai_bar_colors.webp").write_bytes(b"three")
+    (gallery.directory / "hyprland_desktop_tiling.png").unlink()
+    assert len(gallery.items("yabai")) == 2
+    assert gallery.items("hyprland") == []
+    assert gallery.stats()["rebuilds"] == 2
+
+
+def test_missing_directory_is_empty(tmp_path):
+    service = GalleryService(tmp_path / "missing", check_interval=0)
+    assert service.items() == []
+    assert service.page()["pages"] == 1
+
+
+def test_gallery_urls(gallery):
+    assert gallery_url() == "/gallery"
+    assert gallery_url("Yabai", 2) == "/gallery/yabai/page/2"
+    assert gallery.urls(["yabai", "hyprland"]) == [
+        "/gallery",
+        "/gallery/yabai",
+        "/gallery/hyprland",
+    ]
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from app.services import github_service as module
+from app.services.github_service import GitHubService
+
+
+class FlakyLoad:
+    def __init__(self, *values):
+        self.values = list(values)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        value = self.values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+@pytest.fixture
+def ttl(monkeypatch):
+    monkeypatch.setattr(module.settings, "github_cache_ttl", 60)
+    return 60
+
+
+async def test_stale_value_is_served_while_reloading(ttl):
+    service = GitHubService()
+    load = FlakyLoad("old", "new")
+    assert await service._cached(("readme", "me/repo"), load) == "old"
+
+    service._cache.set(("readme", "me/repo"), ("old", 0.0))
+    assert await service._cached(("readme", "me/repo"), load) == "old"
+    await asyncio.sleep(0.01)
+    assert load.calls == 2
+    assert await service._cached(("readme", "me/repo"), load) == "new"
+
+
+async def test_failed_reload_keeps_value_and_waits_a_ttl(ttl):
+    service = GitHubService()
+    load = FlakyLoad("old", RuntimeError("GitHub is down"))
+    await service._cached(("readme", "me/repo"), load)
+
+    service._cache.set(("readme", "me/repo"), ("old", 0.0))
+    for _ in range(3):
+        assert await service._cached(("readme", "me/repo"), load) == "old"
+        await asyncio.sleep(0.01)
+    assert load.calls == 2
+
+
+async def test_empty_reload_keeps_the_last_good_value(ttl):
+    service = GitHubService()
+    load = FlakyLoad("old", None)
+    await service._cached(("readme", "me/repo"), load)
+
+    service._cache.set(("readme", "me/repo"), ("old", 0.0))
+    await service._cached(("readme", "me/repo"), load)
+    await asyncio.sleep(0.01)
+    assert await service._cached(("readme", "me/repo"), load) == "old"
+
+
+async def test_changed_value_invalidates_github_pages(ttl, monkeypatch):
+    invalidated = []
+    monkeypatch.setattr(module.page_cache, "invalidate", invalidated.append)
+    service = GitHubService()
+    load = FlakyLoad("old", "old", "new")
+    await service._cached(("readme", "me/repo"), load)
+    assert invalidated == ["github"]
+
+    key = ("readme", "me/repo")
+    for _ in range(2):
+        service._cache.set(key, (service._cache.get(key)[0], 0.0))
+        await service._cached(key, load)
+        await asyncio.sleep(0.01)
+    assert invalidated == ["github", "github"]
@@ -0,0 +1,75 @@
+from app.parsers.hyprland_parser import HyprlandParser
+
+
+def parse(content: str, **options):
+    return HyprlandParser().parse(content, **options)
+
+
+def test_longest_variable_name_wins():
+    keybinds = parse(
+        "$mod = ALT\n"
+        "$mainMod = SUPER\n"
+        "bind = $mainMod, Q, killactive\n"
+        "bind = $mod SHIFT, W, togglefloating\n"
+    )
+    assert [kb.modifiers for kb in keybinds] == [("cmd",), ("opt", "shift")]
+    assert [kb.action for kb in keybinds] == ["Close window", "Toggle floating"]
+
+
+def test_variables_defined_from_other_variables():
+    keybinds = parse("$mod = SUPER\n$mainMod = $mod\nbind = $mainMod, Return, exec, kitty\n")
+    assert keybinds[0].modifiers == ("cmd",)
+    assert keybinds[0].key == "enter"
+    assert keybinds[0].action == "Run kitty"
+
+
+def test_bindd_uses_its_description():
+    (keybind,) = parse("bindd = SUPER, Return, Open a terminal, exec, kitty --single-instance\n")
+    assert keybind.action == "Open a terminal"
+    assert keybind.command == "exec, kitty --single-instance"
+    assert keybind.flags == ("d",)
+
+
+def test_bindd_without_dispatcher_is_skipped():
+    assert parse("bindd = SUPER, Return, Open a terminal\n") == []
+
+
+def test_nested_source_includes():
+    includes = {
+        "~/.config/hypr/binds.conf": (
+            "# Windows\n"
+            "bind = $mainMod, Q, killactive\n"
+            "source = ~/.config/hypr/workspaces.conf\n"
+        ),
+        "~/.config/hypr/workspaces.conf": "bind = $mainMod, 1, workspace, 1\n",
+    }
+    keybinds = parse(
+        "$mainMod = SUPER\n"
+        "source = ~/.config/hypr/binds.conf\n"
+        "bind = $mainMod, F, fullscreen\n",
+        includes=includes,
+    )
+    assert [kb.action for kb in keybinds] == [
+        "Close window",
+        "Go to workspace 1",
+        "Toggle fullscreen",
+    ]
+    assert all(kb.modifiers == ("cmd",) for kb in keybinds)
+    assert keybinds[0].category == "Windows"
+
+
+def test_source_cycles_stop_at_max_depth():
+    includes = {"a.conf": "bind = SUPER, A, killactive\nsource = a.conf\n"}
+    keybinds = parse("source = a.conf\n", includes=includes)
+    assert len(keybinds) == HyprlandParser.MAX_SOURCE_DEPTH
+
+
+def test_find_sources_and_repo_paths():
+    content = "source = ~/.config/hypr/binds.conf\n  source = ./colors.conf\n#source = x\n"
+    sources = HyprlandParser.find_sources(content)
+    assert sources == ["~/.config/hypr/binds.conf", "./colors.conf"]
+    assert [HyprlandParser.source_to_repo_path(s) for s in sources] == [
+        "binds.conf",
+        "colors.conf",
+    ]
+    assert HyprlandParser.source_to_repo_path("~/.config/hypr/conf.d/*.conf") is None
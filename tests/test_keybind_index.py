@@ -0,0 +1,62 @@
+import pytest
+
+from app.core.keybind_index import KeybindIndex, modifier_combo, parse_combo
+from app.models.compact import KeybindRecord
+
+
+def record(modifiers, key, action="Action", category="General"):
+    return KeybindRecord("yabai", category, modifiers, key, action)
+
+
+@pytest.fixture
+def index():
+    return KeybindIndex(
+        [
+            record(["opt"], "h", "Focus west", "Windows"),
+            record(["opt", "shift"], "h", "Swap west", "Windows"),
+            record(["cmd"], "enter", "Terminal", "Apps"),
+            record([], "f1", "Help"),
+        ]
+    )
+
+
+def test_modifier_combo_is_canonical_and_ordered():
+    assert modifier_combo(["shift", "alt", "super"]) == "cmd+opt+shift"
+    assert modifier_combo(["opt", "ctrl"]) == "ctrl+opt"
+
+
+@pytest.mark.parametrize(
+    "combo, expected",
+    [
+        ("opt+h", ("opt", "h")),
+        ("alt+h", ("opt", "h")),
+        ("Option+H", ("opt", "h")),
+        ("shift+opt+h", ("opt+shift", "h")),
+        ("cmd+Return", ("cmd", "enter")),
+        ("super", ("cmd", None)),
+        ("opt", ("opt", None)),
+        ("f1", ("", "f1")),
+    ],
+)
+def test_parse_combo(combo, expected):
+    assert parse_combo(combo) == expected
+
+
+@pytest.mark.parametrize("combo", ["opt+h", "alt+h", "lalt+H", "option+h"])
+def test_lookup_by_canonical_and_alias_names(index, combo):
+    assert [kb.action for kb in index.lookup(combo)] == ["Focus west"]
+
+
+def test_lookup_without_key_matches_modifiers(index):
+    assert [kb.action for kb in index.lookup("shift+opt")] == ["Swap west"]
+    assert [kb.action for kb in index.modifiers("opt")] == ["Focus west"]
+    assert index.modifiers("alt") == index.modifiers("opt")
+    assert [kb.action for kb in index.modifiers("command")] == ["Terminal"]
+
+
+def test_key_and_category_lookups(index):
+    assert [kb.action for kb in index.key("H")] == ["Focus west", "Swap west"]
+    assert [kb.action for kb in index.key("return")] == ["Terminal"]
+    assert index.categories == ["Windows", "Apps", "General"]
+    assert len(index.category("windows")) == 2
+    assert index.lookup("ctrl+h") == []
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from app.core.keybind_index import KeybindIndex
+from app.core.snapshots import Snapshot, git_blob_sha, object_path
+from app.core.store import ResultStore
+from app.services import keybind_service as module
+from app.services.keybind_service import KeybindService, SourceFiles
+from app.services.snapshot_service import SnapshotService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(module.settings, "github_cache_ttl", 60)
+    service = KeybindService()
+    service._cache["yabai"] = KeybindIndex([])
+    service._checked["yabai"] = 0.0
+    return service
+
+
+async def test_stale_index_is_served_while_checking(service, monkeypatch):
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_refresh(platform):
+        started.set()
+        await release.wait()
+        raise RuntimeError("GitHub is down")
+
+    monkeypatch.setattr(service, "_refresh_index", slow_refresh)
+    current = service._cache["yabai"]
+    assert await service.get_index("yabai") is current
+    await asyncio.wait_for(started.wait(), 1)
+
+    # a failed check is not retried on every request
+    release.set()
+    await asyncio.sleep(0.01)
+    started.clear()
+    assert await service.get_index("yabai") is current
+    await asyncio.sleep(0.01)
+    assert not started.is_set()
+
+
+KEYBINDS_MD = """## Windows
+| Keybind | Action |
+|---|---|
+| alt + h | Focus west |
+"""
+
+
+@pytest.fixture
+async def repo(monkeypatch, tmp_path):
+    """A yabai dotfiles repo whose commits are snapshots in tmp_path."""
+    monkeypatch.setattr(module.settings, "data_dir", tmp_path)
+    monkeypatch.setattr(module.settings, "repos", {"yabai": "me/dots"})
+    monkeypatch.setattr(module.settings, "snapshot_enabled", True)
+    monkeypatch.setattr(module.settings, "cpu_pool_size", 0)
+    snapshots = SnapshotService()
+    store = ResultStore(f"sqlite+aiosqlite:///{tmp_path / 'results.db'}")
+    await store.init()
+    monkeypatch.setattr(module, "snapshot_service", snapshots)
+    monkeypatch.setattr(module, "result_store", store)
+    head = {}
+
+    async def get_head_sha(repo):
+        return head["sha"]
+
+    monkeypatch.setattr(module.github_client, "get_head_sha", get_head_sha)
+
+    def commit(sha, files):
+        blobs = {}
+        for path, text in files.items():
+            blob = blobs[path] = git_blob_sha(text.encode())
+            target = object_path(snapshots.store.objects, blob)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(text.encode())
+        snapshots.store.write_tree(Snapshot("me/dots", sha, blobs))
+        head["sha"] = sha
+
+    yield commit
+    await store.close()
+
+
+async def test_commit_touching_other_files_reuses_the_parse(repo):
+    service = KeybindService()
+    repo("c1", {"Keybinds.md": KEYBINDS_MD, "README.md": "# Dots\n"})
+    (keybind,) = await service.refresh("yabai")
+    assert keybind.action == "Focus west"
+    index = service._cache["yabai"]
+
+    repo("c2", {"Keybinds.md": KEYBINDS_MD, "README.md": "# Dots, typo fixed\n"})
+    await service.refresh("yabai")
+    assert service.parsed == 1
+    assert service.reused == 1
+    assert service._cache["yabai"] is index
+
+    repo("c3", {"Keybinds.md": KEYBINDS_MD + "| alt + l | Focus east |\n", "README.md": ""})
+    assert len(await service.refresh("yabai")) == 2
+    assert service.parsed == 2
+
+
+async def test_stored_parse_survives_a_restart(repo):
+    repo("c1", {"Keybinds.md": KEYBINDS_MD})
+    await KeybindService().refresh("yabai")
+
+    restarted = KeybindService()
+    assert [kb.action for kb in await restarted.refresh("yabai")] == ["Focus west"]
+    assert restarted.parsed == 0
+    assert restarted.reused == 1
+
+
+async def test_source_digest_covers_missing_files(repo):
+    repo("c1", {"Keybinds.md": KEYBINDS_MD})
+    sources = SourceFiles("me/dots", "c1")
+    assert await sources.read("skhdrc") is None
+    await sources.read("/Keybinds.md")
+    assert sources.blobs["skhdrc"] is None
+    assert set(sources.blobs) == {"skhdrc", "Keybinds.md"}
+
+    reordered = SourceFiles("me/dots", "c1")
+    await reordered.read("Keybinds.md")
+    await reordered.read("skhdrc")
+    assert reordered.digest() == sources.digest()
@@ -0,0 +1,37 @@
+import pytest
+
+from app.core.metrics import Counter, Gauge, Histogram, Metric, Registry
+
+
+def test_metric_is_abstract():
+    with pytest.raises(TypeError):
+        Metric("portfolio_test", "Test.")
+
+
+def test_counter_and_gauge_render():
+    registry = Registry()
+    hits = registry.register(Counter("portfolio_hits_total", "Hits.", ("cache",)))
+    hits.inc("page")
+    hits.inc("page", amount=2)
+    gauge = registry.register(Gauge("portfolio_in_flight", "In flight."))
+    gauge.inc()
+
+    text = registry.render()
+    assert "# TYPE portfolio_hits_total counter" in text
+    assert 'portfolio_hits_total{cache="page"} 3' in text
+    assert "portfolio_in_flight 1" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("portfolio_seconds", "Time.", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "parse")
+    histogram.observe(0.5, "parse")
+    histogram.observe(5.0, "parse")
+    lines = list(histogram.lines())
+    assert lines == [
+        'portfolio_seconds_bucket{stage="parse",le="0.1"} 1',
+        'portfolio_seconds_bucket{stage="parse",le="1"} 2',
+        'portfolio_seconds_bucket{stage="parse",le="+Inf"} 3',
+        'portfolio_seconds_sum{stage="parse"} 5.55',
+        'portfolio_seconds_count{stage="parse"} 3',
+    ]
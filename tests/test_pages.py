@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from app.core import pages as module
+from app.core.pages import PageCache
+
+
+class Renderer:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return f"<p>{self.calls}</p>"
+
+
+@pytest.fixture
+def cache():
+    return PageCache(max_entries=8)
+
+
+async def test_pages_are_cached(cache):
+    render = Renderer()
+    first = await cache.get("/", render, ("github",))
+    assert await cache.get("/", render, ("github",)) is first
+    assert render.calls == 1
+
+
+async def test_invalidate_rerenders_tagged_pages(cache):
+    render, other = Renderer(), Renderer()
+    await cache.get("/", render, ("github",))
+    await cache.get("/about", other)
+    assert cache.invalidate("github") == 1
+    await asyncio.sleep(0.01)
+    assert render.calls == 2
+    assert other.calls == 1
+    assert (await cache.get("/", render, ("github",))).body == b"<p>2</p>"
+
+
+async def test_expired_tagged_page_is_served_while_rerendering(cache, monkeypatch):
+    monkeypatch.setattr(module.settings, "page_tagged_ttl", 0)
+    render, untagged = Renderer(), Renderer()
+    await cache.get("/", render, ("github",))
+    await cache.get("/about", untagged)
+
+    stale = await cache.get("/", render, ("github",))
+    assert stale.body == b"<p>1</p>"
+    await cache.get("/about", untagged)
+    await asyncio.sleep(0.01)
+    assert render.calls == 2
+    assert untagged.calls == 1
+    assert cache.stats()["expired"] == 1
@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+from app.config import get_settings
+from app.core.rate_limit import Priority, RateLimiter
+
+settings = get_settings()
+
+
+@pytest.fixture
+def limiter():
+    return RateLimiter("test")
+
+
+def test_not_rate_limited(limiter):
+    assert limiter.retry_delay(500, {}, 0, Priority.USER) is None
+    assert limiter.retry_delay(403, {"x-ratelimit-remaining": "12"}, 0, Priority.USER) is None
+    assert limiter.rate_limited == 0
+
+
+def test_secondary_limit_backs_off_exponentially(limiter):
+    first = limiter.retry_delay(429, {}, 0, Priority.BACKGROUND)
+    second = limiter.retry_delay(429, {}, 1, Priority.BACKGROUND)
+    base = settings.github_retry_base_delay
+    assert base <= first <= base * 1.5
+    assert base * 2 <= second <= base * 3
+    assert limiter.retries == 2
+
+
+def test_retry_after_is_honoured(limiter):
+    delay = limiter.retry_delay(403, {"retry-after": "2"}, 0, Priority.USER)
+    assert 2 <= delay <= 3
+
+
+def test_primary_limit_waits_for_reset(limiter):
+    headers = {"x-ratelimit-remaining": "0", "x-ratelimit-reset": str(int(time.time()) + 600)}
+    assert limiter.retry_delay(403, headers, 0, Priority.USER) is None
+    assert limiter.rate_limited == 1
+    assert limiter.retries == 0
+
+
+def test_long_wait_blocks_instead_of_retrying(limiter):
+    retry_after = str(int(settings.github_background_retry_max_wait) + 30)
+    assert limiter.retry_delay(429, {"retry-after": retry_after}, 0, Priority.BACKGROUND) is None
+    assert limiter.blocked_until > time.time()
+    assert not limiter.admit(Priority.USER)
+
+
+def test_gives_up_after_last_attempt(limiter):
+    attempt = settings.github_retry_attempts
+    assert limiter.retry_delay(429, {}, attempt, Priority.BACKGROUND) is None
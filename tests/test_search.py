@@ -0,0 +1,84 @@
+import pytest
+
+from app.core.search_index import InvertedIndex, SearchDocument, tokenize
+from app.models.compact import KeybindRecord
+from app.models.keybind import ConfigFile
+from app.services.search_service import SearchService
+
+
+def doc(id, text, kind="config", platform="yabai"):
+    return SearchDocument(id=id, kind=kind, title=id, url=f"/{id}", platform=platform, text=text)
+
+
+@pytest.fixture
+def index():
+    index = InvertedIndex()
+    index.replace_source("a", [(doc("a", "focus window west"), {"focus window west": 1.0})])
+    index.replace_source(
+        "b",
+        [(doc("b", "swap window", kind="keybind", platform="hyprland"), {"swap window": 3.0})],
+    )
+    return index
+
+
+def test_tokenize_splits_on_punctuation_and_underscores():
+    assert tokenize("Focus_Window-West, 2") == ["focus", "window", "west", "2"]
+
+
+def test_every_token_must_match(index):
+    assert [d.id for _, d in index.search("window")] == ["b", "a"]
+    assert [d.id for _, d in index.search("window west")] == ["a"]
+    assert index.search("window north") == []
+    assert index.search("   ") == []
+
+
+def test_prefixes_match_below_exact_terms(index):
+    index.replace_source("c", [(doc("c", "win"), {"win": 1.0})])
+    results = index.search("win")
+    assert {d.id for _, d in results} == {"a", "b", "c"}
+    assert results[0][1].id == "c"
+
+
+def test_filters(index):
+    assert [d.id for _, d in index.search("window", kind="config")] == ["a"]
+    assert [d.id for _, d in index.search("window", platform="hyprland")] == ["b"]
+
+
+def test_replace_source_swaps_documents(index):
+    assert not index.replace_source(
+        "a", [(doc("a", "focus window west"), {"focus window west": 1.0})]
+    )
+    assert index.replace_source("a", [(doc("a2", "resize"), {"resize": 1.0})])
+    assert index.search("west") == []
+    assert [d.id for _, d in index.search("resize")] == ["a2"]
+    assert index.stats() == {"documents": 2, "terms": 3, "sources": 2}
+
+
+def test_service_indexes_each_value_once():
+    service = SearchService()
+    keybinds = [KeybindRecord("yabai", "Windows", ["opt"], "h", "Focus west", "yabai -m")]
+    assert service.index_keybinds("yabai", keybinds)
+    # the same list again is skipped without fingerprinting it
+    assert not service.index_keybinds("yabai", keybinds)
+
+    result = service.search("focus opt")
+    assert result["total"] == 1
+    assert result["results"][0]["snippet"] == "opt + h"
+    assert result["results"][0]["keybind"]["action"] == "Focus west"
+
+
+def test_service_snippets_config_lines():
+    service = SearchService()
+    config = ConfigFile(
+        repo="me/dots",
+        path="yabairc",
+        content="#!/bin/sh\nyabai -m config layout bsp\n",
+        highlighted_html="",
+        language="bash",
+    )
+    service.index_config("yabai", config)
+    service.index_readme("yabai", "me/dots", "# Dots\nA tiling setup")
+    (result,) = service.search("layout")["results"]
+    assert result["snippet"] == "yabai -m config layout bsp"
+    assert service.search("tiling", kind="readme")["total"] == 1
+    assert service.search("tiling", platform="hyprland")["total"] == 0
@@ -0,0 +1,79 @@
+import pytest
+
+from app.core.snapshots import Snapshot, git_blob_sha, object_path
+from app.services import snapshot_service as module
+from app.services.snapshot_service import SnapshotService
+
+REPO = "me/dots"
+
+
+@pytest.fixture
+def raw_files(monkeypatch, tmp_path):
+    """Files served by the raw fallback; the snapshot store lives in tmp_path."""
+    monkeypatch.setattr(module.settings, "data_dir", tmp_path)
+    monkeypatch.setattr(module.settings, "repos", {"yabai": REPO})
+    monkeypatch.setattr(module.settings, "snapshot_enabled", True)
+    files = {}
+
+    async def get_raw_file(repo, path, branch="main"):
+        return files.get(path)
+
+    monkeypatch.setattr(module.github_client, "get_raw_file", get_raw_file)
+    return files
+
+
+def add_snapshot(service, sha, files):
+    blobs = {}
+    for path, text in files.items():
+        data = text.encode()
+        blob = blobs[path] = git_blob_sha(data)
+        target = object_path(service.store.objects, blob)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+    service.store.write_tree(Snapshot(REPO, sha, blobs))
+    return blobs
+
+
+async def test_reads_come_from_the_snapshot(raw_files):
+    service = SnapshotService()
+    blobs = add_snapshot(service, "c1", {"yabairc": "yabai\n"})
+    assert await service.read_blob(REPO, "yabairc", "c1") == (blobs["yabairc"], "yabai\n")
+    assert await service.read_blob(REPO, "missing", "c1") == (None, None)
+    assert service.store.read_ref(REPO) == "c1"
+    assert service.fallbacks == 0
+
+
+async def test_untracked_repos_read_raw_with_a_blob_sha(raw_files):
+    raw_files["README.md"] = "# Other\n"
+    service = SnapshotService()
+    blob, text = await service.read_blob("me/other", "README.md", "c1")
+    assert text == "# Other\n"
+    assert blob == git_blob_sha(b"# Other\n")
+    assert service.fallbacks == 1
+
+
+async def test_lost_object_falls_back_to_raw(raw_files):
+    service = SnapshotService()
+    blobs = add_snapshot(service, "c1", {"yabairc": "yabai\n"})
+    await service.snapshot(REPO, "c1")
+    object_path(service.store.objects, blobs["yabairc"]).unlink()
+    raw_files["yabairc"] = "yabai\n"
+
+    assert await service.read_blob(REPO, "yabairc", "c1") == (blobs["yabairc"], "yabai\n")
+    assert service.fallbacks == 1
+    # the incomplete snapshot is dropped, so the next read syncs a complete one again
+    assert REPO not in service.stats()["repos"]
+
+
+async def test_unchanged_compares_recorded_blobs(raw_files):
+    service = SnapshotService()
+    blobs = add_snapshot(service, "c1", {"Keybinds.md": "| a | b |\n", "README.md": "# v1\n"})
+    add_snapshot(service, "c2", {"Keybinds.md": "| a | b |\n", "README.md": "# v2\n"})
+    recorded = {"Keybinds.md": blobs["Keybinds.md"], "skhdrc": None}
+    assert await service.unchanged(REPO, "c2", recorded)
+
+    add_snapshot(service, "c3", {"Keybinds.md": "| a | c |\n"})
+    assert not await service.unchanged(REPO, "c3", recorded)
+    # a file that appeared counts as a change too
+    add_snapshot(service, "c4", {"Keybinds.md": "| a | b |\n", "skhdrc": "alt - h\n"})
+    assert not await service.unchanged(REPO, "c4", recorded)
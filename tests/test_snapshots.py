@@ -0,0 +1,112 @@
+import io
+import os
+import tarfile
+import time
+
+import pytest
+
+from app.core.snapshots import (
+    Snapshot,
+    SnapshotStore,
+    git_blob_sha,
+    object_path,
+    unpack_tarball,
+)
+
+
+def make_tarball(path, files):
+    with tarfile.open(path, "w:gz") as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return str(path)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(tmp_path / "snapshots")
+
+
+def test_git_blob_sha_matches_git():
+    # git hash-object of "hello\n"
+    assert git_blob_sha(b"hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+
+def test_unpack_strips_prefix_and_stores_by_content(tmp_path, store):
+    archive = make_tarball(
+        tmp_path / "repo.tar.gz",
+        {
+            "me-dots-abc/yabairc": b"yabai -m config\n",
+            "me-dots-abc/copy/yabairc": b"yabai -m config\n",
+            "me-dots-abc/big.bin": b"x" * 100,
+            "me-dots-abc/../../escape": b"nope",
+        },
+    )
+    files = unpack_tarball(archive, str(store.objects), max_file_size=50)
+    blob = git_blob_sha(b"yabai -m config\n")
+    assert files["yabairc"] == files["copy/yabairc"] == blob
+    assert "big.bin" not in files
+    assert store.read_object(blob) == b"yabai -m config\n"
+    # archive paths never become file system paths
+    assert not (tmp_path / "escape").exists()
+    assert sum(1 for p in store.objects.rglob("*") if p.is_file()) == 2
+
+
+def test_tree_needs_every_object(store):
+    store.objects.mkdir(parents=True)
+    snapshot = Snapshot("me/dots", "abc", {"yabairc": git_blob_sha(b"a")})
+    store.write_tree(snapshot)
+    assert store.read_tree("me/dots", "abc") is None
+
+    target = object_path(store.objects, git_blob_sha(b"a"))
+    target.parent.mkdir(parents=True)
+    target.write_bytes(b"a")
+    assert store.read_tree("me/dots", "abc").files == snapshot.files
+
+    store.write_ref("me/dots", "abc")
+    assert store.read_ref("me/dots") == "abc"
+    assert store.read_ref("me/other") is None
+
+
+def write_snapshot(store, sha, files, age):
+    blobs = {}
+    for path, data in files.items():
+        blob = git_blob_sha(data)
+        target = object_path(store.objects, blob)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        os.utime(target, (time.time() - age, time.time() - age))
+        blobs[path] = blob
+    store.write_tree(Snapshot("me/dots", sha, blobs))
+    tree = store._tree_path("me/dots", sha)
+    os.utime(tree, (time.time() - age, time.time() - age))
+    return blobs
+
+
+def test_prune_keeps_newest_trees_and_their_objects(store):
+    old = write_snapshot(store, "old", {"a": b"old"}, age=7200)
+    new = write_snapshot(store, "new", {"a": b"new"}, age=7000)
+    assert store.prune(["me/dots"], keep=1) == 1
+    assert store.read_object(old["a"]) is None
+    assert store.read_object(new["a"]) == b"new"
+    assert store.read_tree("me/dots", "old") is None
+
+
+def test_prune_spares_recent_objects(store):
+    write_snapshot(store, "tree", {"a": b"a"}, age=7200)
+    # unpacked by a sync that hasn't written its tree yet
+    pending = write_snapshot(store, "pending", {"b": b"b"}, age=0)
+    store._tree_path("me/dots", "pending").unlink()
+    assert store.prune(["me/dots"], keep=2) == 0
+    assert store.read_object(pending["b"]) == b"b"
+    assert store.prune(["me/dots"], keep=2, grace=0) == 1
+
+
+def test_unpack_refreshes_reused_objects(tmp_path, store):
+    blobs = write_snapshot(store, "tree", {"a": b"shared"}, age=7200)
+    store._tree_path("me/dots", "tree").unlink()
+    archive = make_tarball(tmp_path / "repo.tar.gz", {"me-dots-def/a": b"shared"})
+    unpack_tarball(archive, str(store.objects), max_file_size=1024)
+    assert store.prune(["me/dots"], keep=2) == 0
+    assert store.read_object(blobs["a"]) == b"shared"